@@ -1,15 +1,29 @@
 import json
 import os
+import threading
 import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Mapping, Optional
 
 try:
     import redis
 except ImportError:  # pragma: no cover
     redis = None
 
-from .config import REDIS_URL, CACHE_TTL_SECONDS
+from .config import (
+    CACHE_FALLBACK_MAX_ENTRIES,
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_L1_ENABLED,
+    CACHE_L1_MAX_ENTRIES,
+    CACHE_L1_POLICIES,
+    CACHE_TTL_SECONDS,
+    REDIS_URL,
+)
+
+# Keys per MGET / pipeline flush, so one huge batch cannot stall Redis.
+_BATCH_SIZE = 500
 
 # File-based storage for OAuth states to survive restarts
 _STORAGE_ROOT = Path(
@@ -54,10 +68,74 @@ def _save_oauth_states(states: dict[str, tuple[Optional[float], str]]) -> None:
         print(f"[OAuth File ERROR] Failed to save states: {e}")
 
 
+def _parse_l1_policies(raw: str) -> list[tuple[str, float, bool]]:
+    """ "prefix=ttl[:shared],..." -> [(prefix, ttl, shared)], longest prefix first."""
+    policies: list[tuple[str, float, bool]] = []
+    for item in (raw or "").split(","):
+        prefix, sep, setting = item.strip().rpartition("=")
+        if not sep or not prefix:
+            continue
+        ttl_text, _, mode = setting.partition(":")
+        try:
+            ttl = float(ttl_text)
+        except ValueError:
+            continue
+        if ttl > 0:
+            policies.append((prefix, ttl, mode.strip().lower() == "shared"))
+    return sorted(policies, key=lambda policy: len(policy[0]), reverse=True)
+
+
+class _LocalCache:
+    """Bounded per-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def discard_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class CacheClient:
     def __init__(self) -> None:
         self.redis: Optional["redis.Redis"] = None
-        self.fallback: dict[str, tuple[Optional[float], str]] = {}
+        # Used when Redis is unavailable; LRU-bounded by CACHE_FALLBACK_MAX_ENTRIES.
+        self.fallback: "OrderedDict[str, tuple[Optional[float], str]]" = OrderedDict()
+        self.l1 = _LocalCache(CACHE_L1_MAX_ENTRIES)
+        self._l1_policies = _parse_l1_policies(CACHE_L1_POLICIES) if CACHE_L1_ENABLED else []
+        self._instance_id = uuid.uuid4().hex
+        self._pubsub_thread = None
+        self._invalidation_listeners: list[Callable[[list[str]], None]] = []
         self.sessions: dict[str, tuple[str, Optional[float]]] = {}
         self.rate_limits: dict[str, tuple[int, Optional[float]]] = {}
         # Load persisted OAuth states on init
@@ -72,8 +150,17 @@ class CacheClient:
             self.redis = client
         except Exception:
             self.redis = None
+            return
+        self.l1.clear()
+        self._subscribe_invalidations()
 
     def disconnect(self) -> None:
+        if self._pubsub_thread is not None:
+            try:
+                self._pubsub_thread.stop()
+            except Exception:
+                pass
+            self._pubsub_thread = None
         if not self.redis:
             return
         try:
@@ -81,14 +168,117 @@ class CacheClient:
         finally:
             self.redis = None
 
+    # --- L1 (per-process) layer ---
+    def _l1_policy(self, key: str) -> Optional[tuple[float, bool]]:
+        for prefix, ttl, shared in self._l1_policies:
+            if key.startswith(prefix):
+                return ttl, shared
+        return None
+
+    def _l1_get(self, key: str) -> tuple[bool, Any]:
+        policy = self._l1_policy(key)
+        if policy is None:
+            return False, None
+        hit, value = self.l1.get(key)
+        if not hit:
+            return False, None
+        if policy[1]:
+            return True, value
+        try:
+            return True, json.loads(value)
+        except json.JSONDecodeError:
+            return False, None
+
+    def _l1_put(self, key: str, raw: str, decoded: Any) -> None:
+        policy = self._l1_policy(key)
+        if policy is not None:
+            self.l1.put(key, decoded if policy[1] else raw, policy[0])
+
+    def _l1_tracked(self, keys: Iterable[str]) -> list[str]:
+        return [key for key in keys if self._l1_policy(key) is not None]
+
+    def add_invalidation_listener(self, listener: Callable[[list[str]], None]) -> None:
+        """Call `listener(keys)` whenever keys are invalidated here or on another worker."""
+        self._invalidation_listeners.append(listener)
+
+    def _notify_listeners(self, keys: list[str]) -> None:
+        for listener in self._invalidation_listeners:
+            try:
+                listener(keys)
+            except Exception:
+                continue
+
+    def invalidate_keys(self, keys: Iterable[str]) -> None:
+        """Drop per-process copies of `keys` in every worker; Redis data is untouched."""
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return
+        self.l1.discard(unique)
+        self._notify_listeners(unique)
+        if self.redis:
+            try:
+                self.redis.publish(CACHE_INVALIDATION_CHANNEL, self._invalidation_message(unique))
+            except Exception:
+                pass
+
+    def _subscribe_invalidations(self) -> None:
+        if not (self._l1_policies or self._invalidation_listeners) or not self.redis:
+            return
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CACHE_INVALIDATION_CHANNEL: self._on_invalidation})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception:
+            self._pubsub_thread = None
+
+    def _on_invalidation(self, message: dict) -> None:
+        try:
+            payload = json.loads(message.get("data") or "{}")
+        except (TypeError, json.JSONDecodeError):
+            return
+        if payload.get("origin") == self._instance_id:
+            return
+        keys = payload.get("keys")
+        if isinstance(keys, list):
+            keys = [str(key) for key in keys]
+            self.l1.discard(keys)
+            self._notify_listeners(keys)
+        prefix = payload.get("prefix")
+        if isinstance(prefix, str):
+            self.l1.discard_prefix(prefix)
+
+    def _invalidation_message(self, keys: Iterable[str] = (), prefix: Optional[str] = None) -> str:
+        payload: dict[str, Any] = {"origin": self._instance_id}
+        if keys:
+            payload["keys"] = list(keys)
+        if prefix is not None:
+            payload["prefix"] = prefix
+        return json.dumps(payload)
+
+    def _fallback_put(self, key: str, expires_at: Optional[float], value: str) -> None:
+        self.fallback[key] = (expires_at, value)
+        self.fallback.move_to_end(key)
+        limit = max(1, CACHE_FALLBACK_MAX_ENTRIES)
+        if len(self.fallback) > limit:
+            now = time.time()
+            for stale in [k for k, (exp, _) in self.fallback.items() if exp is not None and exp < now]:
+                del self.fallback[stale]
+            while len(self.fallback) > limit:
+                self.fallback.popitem(last=False)
+
     def get_json(self, key: str) -> Optional[Any]:
+        hit, value = self._l1_get(key)
+        if hit:
+            return value
         raw = self.get(key)
         if raw is None:
             return None
         try:
-            return json.loads(raw)
+            decoded = json.loads(raw)
         except json.JSONDecodeError:
             return None
+        self._l1_put(key, raw, decoded)
+        return decoded
 
     def set_json(self, key: str, value: Any, ttl: int = CACHE_TTL_SECONDS) -> None:
         self.set(key, json.dumps(value), ttl)
@@ -103,16 +293,106 @@ class CacheClient:
         if expires_at is not None and expires_at < time.time():
             del self.fallback[key]
             return None
+        self.fallback.move_to_end(key)
         return payload
 
     def set(self, key: str, value: str, ttl: int = CACHE_TTL_SECONDS) -> None:
+        if self._l1_policy(key) is not None:
+            self.set_many({key: value}, ttl)
+            return
         if self.redis:
             self.redis.setex(key, ttl, value)
             return
         expires_at = time.time() + ttl if ttl else None
-        self.fallback[key] = (expires_at, value)
+        self._fallback_put(key, expires_at, value)
+
+    def get_many_json(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Decoded values for the keys that exist, fetched with MGET."""
+        decoded: dict[str, Any] = {}
+        remaining: list[str] = []
+        for key in dict.fromkeys(keys):
+            hit, value = self._l1_get(key)
+            if hit:
+                decoded[key] = value
+            else:
+                remaining.append(key)
+        for key, raw in self.get_many(remaining).items():
+            try:
+                decoded[key] = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            self._l1_put(key, raw, decoded[key])
+        return decoded
+
+    def set_many_json(self, items: Mapping[str, Any], ttl: int = CACHE_TTL_SECONDS) -> None:
+        # The same object is often stored under several aliases; encode it once.
+        encoded: dict[int, str] = {}
+        payloads: dict[str, str] = {}
+        for key, value in items.items():
+            marker = id(value)
+            if marker not in encoded:
+                encoded[marker] = json.dumps(value)
+            payloads[key] = encoded[marker]
+        self.set_many(payloads, ttl)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        found: dict[str, str] = {}
+        if self.redis:
+            for start in range(0, len(unique), _BATCH_SIZE):
+                batch = unique[start : start + _BATCH_SIZE]
+                for key, value in zip(batch, self.redis.mget(batch)):
+                    if value is not None:
+                        found[key] = value
+            return found
+        for key in unique:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Mapping[str, str], ttl: int = CACHE_TTL_SECONDS) -> None:
+        if not items:
+            return
+        tracked = self._l1_tracked(items)
+        self.l1.discard(tracked)
+        if self.redis:
+            pipe = self.redis.pipeline(transaction=False)
+            for index, (key, value) in enumerate(items.items(), start=1):
+                pipe.setex(key, ttl, value)
+                if index % _BATCH_SIZE == 0:
+                    pipe.execute()
+            if tracked:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, self._invalidation_message(tracked))
+            pipe.execute()
+            return
+        expires_at = time.time() + ttl if ttl else None
+        for key, value in items.items():
+            self._fallback_put(key, expires_at, value)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return
+        tracked = self._l1_tracked(unique)
+        self.l1.discard(tracked)
+        if self.redis:
+            pipe = self.redis.pipeline(transaction=False)
+            for start in range(0, len(unique), _BATCH_SIZE):
+                pipe.delete(*unique[start : start + _BATCH_SIZE])
+            if tracked:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, self._invalidation_message(tracked))
+            pipe.execute()
+            return
+        for key in unique:
+            self.fallback.pop(key, None)
 
     def delete(self, key: str) -> None:
+        if self._l1_policy(key) is not None:
+            self.delete_many((key,))
+            return
         if self.redis:
             self.redis.delete(key)
             return
@@ -120,6 +400,8 @@ class CacheClient:
 
     def delete_prefix(self, prefix: str) -> int:
         removed = 0
+        if self._l1_policies:
+            self.l1.discard_prefix(prefix)
         if self.redis:
             cursor = 0
             pattern = f"{prefix}*"
@@ -131,6 +413,11 @@ class CacheClient:
                         removed += len(keys)
                     if cursor == 0:
                         break
+                if self._l1_policies:
+                    self.redis.publish(
+                        CACHE_INVALIDATION_CHANNEL,
+                        self._invalidation_message(prefix=prefix),
+                    )
             except Exception:
                 return removed
             return removed
@@ -143,6 +430,7 @@ class CacheClient:
 
     def set_session(self, user_id: str, token: str, ttl: int) -> None:
         key = f"session:{user_id}"
+        self.invalidate_keys((key,))
         if self.redis:
             self.redis.setex(key, ttl, token)
             return
@@ -164,6 +452,7 @@ class CacheClient:
 
     def delete_session(self, user_id: str) -> None:
         key = f"session:{user_id}"
+        self.invalidate_keys((key,))
         if self.redis:
             self.redis.delete(key)
             return
@@ -182,6 +471,12 @@ class CacheClient:
         if expires_at is None or expires_at < now:
             current = 0
             expires_at = now + window_seconds
+            if len(self.rate_limits) >= CACHE_FALLBACK_MAX_ENTRIES:
+                self.rate_limits = {
+                    key: entry
+                    for key, entry in self.rate_limits.items()
+                    if entry[1] is not None and entry[1] >= now
+                }
         current += 1
         self.rate_limits[full_key] = (current, expires_at)
         return current <= limit
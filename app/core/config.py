@@ -207,12 +207,16 @@ STEAM_STORE_SEARCH_URL = os.getenv(
 )
 STEAM_CACHE_TTL_SECONDS = int(os.getenv("STEAM_CACHE_TTL_SECONDS", "3600"))
 STEAM_CATALOG_CACHE_TTL_SECONDS = int(os.getenv("STEAM_CATALOG_CACHE_TTL_SECONDS", "300"))
+STEAM_CATALOG_STALE_SECONDS = int(os.getenv("STEAM_CATALOG_STALE_SECONDS", "900"))
 STEAM_REQUEST_TIMEOUT_SECONDS = int(os.getenv("STEAM_REQUEST_TIMEOUT_SECONDS", "12"))
 STEAM_APPDETAILS_BATCH_SIZE = int(os.getenv("STEAM_APPDETAILS_BATCH_SIZE", "60"))
 LUA_FILES_DIR = os.getenv("LUA_FILES_DIR", "")
 STEAM_TRENDING_CACHE_TTL_SECONDS = int(os.getenv("STEAM_TRENDING_CACHE_TTL_SECONDS", "900"))
 STEAM_TRENDING_LIMIT = int(os.getenv("STEAM_TRENDING_LIMIT", "100"))
 STEAM_NEWS_MAX_COUNT = int(os.getenv("STEAM_NEWS_MAX_COUNT", "200"))
+STEAM_EXTENDED_DEADLINE_SECONDS = float(os.getenv("STEAM_EXTENDED_DEADLINE_SECONDS", "8"))
+STEAM_EXTENDED_MAX_WORKERS = int(os.getenv("STEAM_EXTENDED_MAX_WORKERS", "16"))
+STEAM_EXTENDED_SECTION_TTL_SECONDS = int(os.getenv("STEAM_EXTENDED_SECTION_TTL_SECONDS", "300"))
 GLOBAL_INDEX_V1 = os.getenv("GLOBAL_INDEX_V1", "true").lower() in (
     "1",
     "true",
@@ -298,6 +302,22 @@ STEAM_GLOBAL_INDEX_AUTOSYNC_TARGET_MIN_TITLES = int(
 STEAM_GLOBAL_INDEX_RUNNING_STALE_SECONDS = int(
     os.getenv("STEAM_GLOBAL_INDEX_RUNNING_STALE_SECONDS", "1800")
 )
+STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED = os.getenv(
+    "STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED", "true"
+).lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+# Every worker holds its own engine: it re-checks the table on this interval,
+# or sooner when another worker finishes an ingest.
+STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REFRESH_SECONDS = float(
+    os.getenv("STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REFRESH_SECONDS", "60")
+)
+STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REBUILD_SECONDS = float(
+    os.getenv("STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REBUILD_SECONDS", "21600")
+)
 STEAM_GO_CRAWLER_ENABLED = os.getenv("STEAM_GO_CRAWLER_ENABLED", "false").lower() in (
     "1",
     "true",
@@ -358,9 +378,43 @@ HF_TIMEOUT_SECONDS = int(os.getenv("HF_TIMEOUT_SECONDS", "120"))
 HF_CONNECT_TIMEOUT_SECONDS = int(os.getenv("HF_CONNECT_TIMEOUT_SECONDS", "10"))
 HF_MAX_RETRIES = int(os.getenv("HF_MAX_RETRIES", "3"))
 HF_RETRY_BACKOFF_SECONDS = float(os.getenv("HF_RETRY_BACKOFF_SECONDS", "1.25"))
+# Chunk proxy: "async" streams through a shared pooled httpx client, "sync" keeps
+# the requests-based path (one worker thread per transfer).
+HF_PROXY_MODE = os.getenv("HF_PROXY_MODE", "async").strip().lower()
+HF_PROXY_MAX_CONNECTIONS = int(os.getenv("HF_PROXY_MAX_CONNECTIONS", "128"))
+HF_PROXY_MAX_KEEPALIVE = int(os.getenv("HF_PROXY_MAX_KEEPALIVE", "64"))
+HF_PROXY_KEEPALIVE_SECONDS = float(os.getenv("HF_PROXY_KEEPALIVE_SECONDS", "90"))
+HF_PROXY_HTTP2 = os.getenv("HF_PROXY_HTTP2", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+HF_PROXY_COALESCE_MAX_BYTES = int(os.getenv("HF_PROXY_COALESCE_MAX_BYTES", str(8 * 1024 * 1024)))
+HF_PROXY_STREAM_BLOCK_BYTES = int(os.getenv("HF_PROXY_STREAM_BLOCK_BYTES", "65536"))
 
 REDIS_URL = os.getenv("REDIS_URL", "")
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "120"))
+# Per-process L1 in front of Redis. Policies are "prefix=ttl[:shared]"; "shared"
+# namespaces hand out the decoded object itself, so callers must not mutate it.
+CACHE_L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "4096"))
+CACHE_L1_POLICIES = os.getenv(
+    "CACHE_L1_POLICIES",
+    "steam:lua_appids=30:shared,steam:lua_workshop_appids=30:shared,"
+    "steam:summary:=60,manifest:=30",
+)
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "otoshi:cache:invalidate")
+CACHE_FALLBACK_MAX_ENTRIES = int(os.getenv("CACHE_FALLBACK_MAX_ENTRIES", "20000"))
+CACHE_SINGLE_FLIGHT_LOCK_SECONDS = float(os.getenv("CACHE_SINGLE_FLIGHT_LOCK_SECONDS", "30"))
+CACHE_SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("CACHE_SINGLE_FLIGHT_WAIT_SECONDS", "10"))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "10000"))
 RATE_LIMIT_DEFAULT_PER_MINUTE = int(os.getenv("RATE_LIMIT_DEFAULT_PER_MINUTE", "120"))
 RATE_LIMIT_LOGIN_PER_MINUTE = int(os.getenv("RATE_LIMIT_LOGIN_PER_MINUTE", "8"))
 RATE_LIMIT_STEAM_CATALOG_PER_MINUTE = int(
@@ -372,16 +426,48 @@ RATE_LIMIT_AI_WRITE_PER_MINUTE = int(
 RATE_LIMIT_PRIVACY_WRITE_PER_MINUTE = int(
     os.getenv("RATE_LIMIT_PRIVACY_WRITE_PER_MINUTE", "90")
 )
+# Share of the remaining window budget a worker may reserve from Redis and then
+# spend locally without a round trip (0 disables local grants).
+RATE_LIMIT_LOCAL_SHARE = float(os.getenv("RATE_LIMIT_LOCAL_SHARE", "0.1"))
+RATE_LIMIT_LOCAL_MAX_GRANT = int(os.getenv("RATE_LIMIT_LOCAL_MAX_GRANT", "20"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+RATE_LIMIT_REDIS_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", "0.25"))
 AI_WRITE_MAX_BODY_BYTES = int(os.getenv("AI_WRITE_MAX_BODY_BYTES", "131072"))
 AI_SEARCH_EVENTS_MAX_BATCH = int(os.getenv("AI_SEARCH_EVENTS_MAX_BATCH", "100"))
 
 LAUNCHER_CORE_PATH = os.getenv("LAUNCHER_CORE_PATH", "")
 MANIFEST_SOURCE_DIR = os.getenv("MANIFEST_SOURCE_DIR", "")
 MANIFEST_CACHE_DIR = os.getenv("MANIFEST_CACHE_DIR", ".manifests")
+# "fixed" or "cdc" (content-defined chunk boundaries for the Python builder).
+MANIFEST_CHUNKING = os.getenv("MANIFEST_CHUNKING", "fixed").strip().lower() or "fixed"
+# Optional native FastCDC boundary scan (native/c/fastcdc); falls back to Python.
+CDC_NATIVE_LIBRARY_PATH = os.getenv("CDC_NATIVE_LIBRARY_PATH", "")
+CDN_MANIFEST_INDEX_MAX_ENTRIES = int(os.getenv("CDN_MANIFEST_INDEX_MAX_ENTRIES", "64"))
+CDN_MANIFEST_INDEX_TTL_SECONDS = int(os.getenv("CDN_MANIFEST_INDEX_TTL_SECONDS", "60"))
+CDN_CHUNK_CACHE_ENABLED = os.getenv("CDN_CHUNK_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+CDN_CHUNK_CACHE_DIR = os.getenv("CDN_CHUNK_CACHE_DIR", "storage/chunk_cache")
+CDN_CHUNK_CACHE_MAX_BYTES = int(os.getenv("CDN_CHUNK_CACHE_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+# Upper bound on one worker's cross-process claim on a chunk fetch.
+CDN_CHUNK_FLIGHT_LOCK_SECONDS = float(os.getenv("CDN_CHUNK_FLIGHT_LOCK_SECONDS", "120"))
+INSTALL_DIGEST_CACHE_DIR = os.getenv("INSTALL_DIGEST_CACHE_DIR", "storage/digest_cache")
+HASH_MAX_WORKERS = int(os.getenv("HASH_MAX_WORKERS", str(min(8, os.cpu_count() or 4))))
+HASH_PARALLEL_MIN_BYTES = int(os.getenv("HASH_PARALLEL_MIN_BYTES", str(256 * 1024 * 1024)))
 
 WORKSHOP_STORAGE_DIR = os.getenv("WORKSHOP_STORAGE_DIR", "storage/workshop")
 SCREENSHOT_STORAGE_DIR = os.getenv("SCREENSHOT_STORAGE_DIR", "storage/screenshots")
 BUILD_STORAGE_DIR = os.getenv("BUILD_STORAGE_DIR", "storage/builds")
+DELTA_PATCH_DIR = os.getenv("DELTA_PATCH_DIR", "storage/patches")
+DELTA_MAX_WORKERS = int(os.getenv("DELTA_MAX_WORKERS", str(min(4, os.cpu_count() or 2))))
+# A patch larger than this fraction of the new file is dropped for a full download.
+DELTA_MAX_PATCH_RATIO = float(os.getenv("DELTA_MAX_PATCH_RATIO", "0.6"))
+DELTA_MIN_FILE_BYTES = int(os.getenv("DELTA_MIN_FILE_BYTES", str(4 * 1024 * 1024)))
+# xdelta3 allocates its source window (-B) up front: each worker holds up to this much.
+DELTA_SOURCE_WINDOW_BYTES = int(os.getenv("DELTA_SOURCE_WINDOW_BYTES", str(256 * 1024 * 1024)))
 WORKSHOP_STEAM_APP_ID = os.getenv("WORKSHOP_STEAM_APP_ID", "")
 WORKSHOP_STEAM_APP_IDS = os.getenv("WORKSHOP_STEAM_APP_IDS", "")
 WORKSHOP_STEAM_SOURCE = os.getenv("WORKSHOP_STEAM_SOURCE", "env").lower()
@@ -452,6 +538,11 @@ AI_FEATURE_ANTI_CHEAT_RISK = os.getenv("AI_FEATURE_ANTI_CHEAT_RISK", "true").low
 AI_SEARCH_DEFAULT_MODE = os.getenv("AI_SEARCH_DEFAULT_MODE", "lexical").strip().lower() or "lexical"
 AI_SEARCH_VECTOR_DIM = int(os.getenv("AI_SEARCH_VECTOR_DIM", "128"))
 AI_SEARCH_MAX_CANDIDATES = int(os.getenv("AI_SEARCH_MAX_CANDIDATES", "320"))
+AI_EMBEDDING_STORE_REFRESH_SECONDS = float(os.getenv("AI_EMBEDDING_STORE_REFRESH_SECONDS", "60"))
+AI_EMBEDDING_INDEX_DIR = os.getenv("AI_EMBEDDING_INDEX_DIR", "storage/embedding_index")
+AI_QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("AI_QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+AI_QUERY_USAGE_FLUSH_SECONDS = float(os.getenv("AI_QUERY_USAGE_FLUSH_SECONDS", "15"))
+AI_QUERY_USAGE_MAX_PENDING = int(os.getenv("AI_QUERY_USAGE_MAX_PENDING", "10000"))
 AI_PRIVACY_DEFAULT_DENY = os.getenv("AI_PRIVACY_DEFAULT_DENY", "true").lower() in (
     "1",
     "true",
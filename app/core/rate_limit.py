@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover
+    redis_asyncio = None
+
+from starlette.routing import Match
+
+from .config import (
+    RATE_LIMIT_LOCAL_MAX_GRANT,
+    RATE_LIMIT_LOCAL_SHARE,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+    REDIS_URL,
+)
+
+_UNMATCHED_ROUTE = "<unmatched>"
+_REDIS_RETRY_AFTER_SECONDS = 30.0
+_ROUTE_INDEX_LOCK = threading.Lock()
+
+# Sliding-window counter: the previous fixed window is weighted by how much of it
+# still overlaps the sliding window. On success `1 + grant` hits are recorded so
+# the caller may spend `grant` more requests locally until the window ends.
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local elapsed_ms = tonumber(ARGV[3])
+local share = tonumber(ARGV[4])
+local max_grant = tonumber(ARGV[5])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weighted = previous * (window_ms - elapsed_ms) / window_ms + current
+local available = limit - weighted
+if available < 1 then
+    return {0, 0, window_ms - elapsed_ms}
+end
+local grant = math.floor((available - 1) * share)
+if grant > max_grant then
+    grant = max_grant
+end
+if grant < 0 then
+    grant = 0
+end
+local total = redis.call('INCRBY', KEYS[1], 1 + grant)
+if total == 1 + grant then
+    redis.call('PEXPIRE', KEYS[1], window_ms * 2)
+end
+return {1, grant, window_ms - elapsed_ms}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after: int = 0
+
+
+def _first_segment(path: str) -> str:
+    return path.lstrip("/").split("/", 1)[0]
+
+
+class _RouteIndex:
+    """
+    The router's routes bucketed by their first path segment, so a request is
+    only matched against the routes that could fit it. Routes whose first
+    segment is a parameter (or that have no path) are checked for every request.
+    """
+
+    def __init__(self, routes: list[Any]) -> None:
+        self.size = len(routes)
+        buckets: dict[str, list[tuple[int, Any]]] = {}
+        wildcard: list[tuple[int, Any]] = []
+        for position, route in enumerate(routes):
+            route_path = getattr(route, "path", None) or getattr(route, "path_format", None)
+            segment = _first_segment(str(route_path)) if route_path else ""
+            if not segment or "{" in segment:
+                wildcard.append((position, route))
+            else:
+                buckets.setdefault(segment, []).append((position, route))
+        # Router order is kept so the first matching route wins, as in Starlette.
+        self._buckets = {
+            segment: [route for _, route in sorted(bucket + wildcard, key=lambda item: item[0])]
+            for segment, bucket in buckets.items()
+        }
+        self._wildcard = [route for _, route in wildcard]
+
+    def candidates(self, path: str) -> list[Any]:
+        return self._buckets.get(_first_segment(path), self._wildcard)
+
+
+_ROUTE_INDEXES: dict[int, _RouteIndex] = {}
+
+
+def _route_index(router: Any) -> _RouteIndex:
+    routes = getattr(router, "routes", None) or ()
+    index = _ROUTE_INDEXES.get(id(router))
+    if index is None or index.size != len(routes):
+        with _ROUTE_INDEX_LOCK:
+            index = _ROUTE_INDEXES[id(router)] = _RouteIndex(list(routes))
+    return index
+
+
+def route_template(scope: dict[str, Any]) -> str:
+    """
+    Route path template for a request ("/games/{game_id}") so rate-limit keys
+    do not grow with every id in the URL. Uses the route already matched for
+    the request when there is one, otherwise matches the request against the
+    router's routes that share its first path segment.
+    """
+    matched = scope.get("route")
+    route_path = getattr(matched, "path_format", None) or getattr(matched, "path", None)
+    if route_path:
+        return str(route_path)
+
+    router = getattr(scope.get("app"), "router", None)
+    if router is None:
+        return _UNMATCHED_ROUTE
+    partial: Optional[str] = None
+    for route in _route_index(router).candidates(str(scope.get("path") or "")):
+        try:
+            match, _ = route.matches(scope)
+        except Exception:
+            continue
+        route_path = getattr(route, "path", None) or getattr(route, "path_format", None)
+        if match == Match.FULL and route_path:
+            return str(route_path)
+        if match == Match.PARTIAL and route_path and partial is None:
+            partial = str(route_path)
+    return partial if partial is not None else _UNMATCHED_ROUTE
+
+
+class _LocalWindows:
+    """
+    Bounded per-process state: sliding-window counters for the no-Redis mode
+    and token grants reserved from Redis. Least recently used keys are dropped
+    once `max_keys` is reached.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max(1, int(max_keys))
+        self._lock = threading.Lock()
+        # key -> [window_index, current, previous]
+        self._counters: "OrderedDict[str, list[int]]" = OrderedDict()
+        # key -> [tokens, expires_at]
+        self._grants: "OrderedDict[str, list[float]]" = OrderedDict()
+
+    def _trim(self, entries: OrderedDict) -> None:
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    def take_grant(self, key: str) -> bool:
+        with self._lock:
+            grant = self._grants.get(key)
+            if grant is None:
+                return False
+            if grant[1] <= time.monotonic() or grant[0] < 1:
+                del self._grants[key]
+                return False
+            grant[0] -= 1
+            self._grants.move_to_end(key)
+            return True
+
+    def store_grant(self, key: str, tokens: int, ttl_seconds: float) -> None:
+        if tokens <= 0 or ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._grants[key] = [float(tokens), time.monotonic() + ttl_seconds]
+            self._grants.move_to_end(key)
+            self._trim(self._grants)
+
+    def hit(self, key: str, limit: int, window_seconds: int) -> RateLimitDecision:
+        now = time.time()
+        window_index = int(now // window_seconds)
+        elapsed = now - window_index * window_seconds
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                entry = [window_index, 0, 0]
+                self._counters[key] = entry
+            elif entry[0] != window_index:
+                entry[2] = entry[1] if entry[0] == window_index - 1 else 0
+                entry[1] = 0
+                entry[0] = window_index
+            self._counters.move_to_end(key)
+            self._trim(self._counters)
+            weighted = entry[2] * (window_seconds - elapsed) / window_seconds + entry[1]
+            if weighted + 1 > limit:
+                return RateLimitDecision(False, max(1, math.ceil(window_seconds - elapsed)))
+            entry[1] += 1
+            return RateLimitDecision(True)
+
+
+class RateLimiter:
+    """
+    Async sliding-window limiter. Redis (through redis.asyncio and an atomic
+    Lua script) is the shared source of truth; each worker keeps small token
+    grants so clients far below their limit skip the Redis hop. Without Redis,
+    or while it is failing, limits are enforced per process.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL) -> None:
+        self.redis_url = redis_url
+        self.local = _LocalWindows(RATE_LIMIT_MAX_KEYS)
+        self._redis = None
+        self._script = None
+        self._redis_down_until = 0.0
+
+    def _client(self):
+        if not self.redis_url or redis_asyncio is None:
+            return None
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            timeout = max(0.01, RATE_LIMIT_REDIS_TIMEOUT_SECONDS)
+            self._redis = redis_asyncio.Redis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+            )
+            self._script = self._redis.register_script(_SLIDING_WINDOW_SCRIPT)
+        return self._redis
+
+    async def hit(self, key: str, limit: int, window_seconds: int = 60) -> RateLimitDecision:
+        limit = max(1, int(limit))
+        window_seconds = max(1, int(window_seconds))
+        if self.local.take_grant(key):
+            return RateLimitDecision(True)
+
+        client = self._client()
+        if client is None:
+            return self.local.hit(key, limit, window_seconds)
+
+        window_ms = window_seconds * 1000
+        now_ms = int(time.time() * 1000)
+        window_index = now_ms // window_ms
+        try:
+            allowed, grant, remaining_ms = await self._script(
+                keys=[f"ratelimit:{key}:{window_index}", f"ratelimit:{key}:{window_index - 1}"],
+                args=[
+                    limit,
+                    window_ms,
+                    now_ms - window_index * window_ms,
+                    max(0.0, RATE_LIMIT_LOCAL_SHARE),
+                    max(0, RATE_LIMIT_LOCAL_MAX_GRANT),
+                ],
+            )
+        except Exception:
+            # Keep serving with per-process limits instead of failing requests.
+            self._redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER_SECONDS
+            return self.local.hit(key, limit, window_seconds)
+
+        remaining_seconds = max(0.0, int(remaining_ms) / 1000.0)
+        if not int(allowed):
+            return RateLimitDecision(False, max(1, math.ceil(remaining_seconds)))
+        self.local.store_grant(key, int(grant), remaining_seconds)
+        return RateLimitDecision(True)
+
+    async def close(self) -> None:
+        client, self._redis = self._redis, None
+        self._script = None
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from email.utils import formatdate
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+_READ_BLOCK_BYTES = 1024 * 1024
+_ZEROCOPY_EXTENSION = "http.response.zerocopy"
+
+
+def _parse_range(value: str, length: int) -> Optional[Tuple[int, int]]:
+    """
+    Single `bytes=` range -> inclusive (start, end) within `length`.
+    Returns None for an unsatisfiable range; multi-range requests raise
+    ValueError so the caller can fall back to the full body.
+    """
+    match = _RANGE_PATTERN.match(value.strip().replace(" ", ""))
+    if not match:
+        raise ValueError("unsupported range")
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError("unsupported range")
+    if not first:
+        suffix = int(last)
+        if suffix <= 0 or length <= 0:
+            return None
+        return max(0, length - suffix), length - 1
+    start = int(first)
+    end = int(last) if last else length - 1
+    if start >= length or end < start:
+        return None
+    return start, min(end, length - 1)
+
+
+class FileSliceResponse(Response):
+    """
+    Serve `length` bytes of a file starting at `offset` with Range,
+    Content-Length and strong ETag support. Uses the ASGI zero-copy extension
+    when the server advertises it and large positioned reads otherwise.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        offset: int = 0,
+        length: Optional[int] = None,
+        stat_result: Optional[os.stat_result] = None,
+        etag: Optional[str] = None,
+        media_type: str = "application/octet-stream",
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.path = path
+        self.offset = max(0, int(offset))
+        self.length = length
+        self.stat_result = stat_result
+        self.etag = etag
+        self.media_type = media_type
+        self.background = None
+        self.status_code = 200
+        self.init_headers(headers)
+
+    def _slice_etag(self, stat_result: os.stat_result, length: int) -> str:
+        if self.etag:
+            return self.etag if self.etag.startswith('"') else f'"{self.etag}"'
+        base = f"{stat_result.st_mtime_ns}-{stat_result.st_size}-{self.offset}-{length}"
+        return f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        stat_result = self.stat_result
+        if stat_result is None:
+            stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+        available = max(0, stat_result.st_size - self.offset)
+        length = available if self.length is None else max(0, min(int(self.length), available))
+        etag = self._slice_etag(stat_result, length)
+
+        request_headers = Headers(scope=scope)
+        self.headers["etag"] = etag
+        self.headers["accept-ranges"] = "bytes"
+        self.headers.setdefault("last-modified", formatdate(stat_result.st_mtime, usegmt=True))
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+            self.status_code = 304
+            del self.headers["content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = 0, length - 1
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (not if_range or if_range.strip() == etag):
+            try:
+                requested = _parse_range(range_header, length)
+            except ValueError:
+                requested = (0, length - 1)
+            else:
+                if requested is None:
+                    self.headers["content-range"] = f"bytes */{length}"
+                    self.headers["content-length"] = "0"
+                    await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {requested[0]}-{requested[1]}/{length}"
+            start, end = requested
+
+        count = max(0, end - start + 1)
+        self.headers["content-length"] = str(count)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        position = self.offset + start
+        if _ZEROCOPY_EXTENSION in (scope.get("extensions") or {}):
+            handle = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send(
+                    {
+                        "type": _ZEROCOPY_EXTENSION,
+                        "file": handle,
+                        "offset": position,
+                        "count": count,
+                        "more_body": False,
+                    }
+                )
+            finally:
+                await anyio.to_thread.run_sync(handle.close)
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as handle:
+            await handle.seek(position)
+            remaining = count
+            while remaining > 0:
+                data = await handle.read(min(_READ_BLOCK_BYTES, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                await send({"type": "http.response.body", "body": data, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from .cache import CacheClient, cache_client
+from .config import (
+    CACHE_SINGLE_FLIGHT_LOCK_SECONDS,
+    CACHE_SINGLE_FLIGHT_WAIT_SECONDS,
+)
+
+_LOCK_PREFIX = "singleflight:"
+_LOCAL_TOKEN = "local"
+_POLL_INTERVAL_SECONDS = 0.25
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Cluster-wide request coalescing for cached computations. One caller per
+    key computes while holding a Redis lock (`SET NX PX`); other workers wait
+    for the fill notification on the cache invalidation channel, polling as a
+    fallback, and read the result from the cache. Values are stored with a
+    freshness deadline so stale entries are served while a single background
+    refresh runs. Without Redis, coalescing is per process.
+
+    Per-key lock and waiter state only exists while a caller is using it.
+    """
+
+    def __init__(
+        self,
+        cache: CacheClient,
+        lock_seconds: float = CACHE_SINGLE_FLIGHT_LOCK_SECONDS,
+        wait_seconds: float = CACHE_SINGLE_FLIGHT_WAIT_SECONDS,
+        refresh_workers: int = 2,
+    ) -> None:
+        self.cache = cache
+        self.lock_ms = max(1, int(lock_seconds * 1000))
+        self.wait_seconds = max(0.0, float(wait_seconds))
+        self._guard = threading.Lock()
+        self._locks: dict[str, list[Any]] = {}
+        self._waiters: dict[str, list[Any]] = {}
+        self._refreshing: set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, refresh_workers),
+            thread_name_prefix="single-flight",
+        )
+        cache.add_invalidation_listener(self._on_filled)
+
+    # --- per-process bookkeeping (refcounted, removed when idle) ---
+    @contextmanager
+    def _local_lock(self, key: str) -> Iterator[None]:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    self._locks.pop(key, None)
+
+    @contextmanager
+    def _waiter(self, key: str) -> Iterator[threading.Event]:
+        with self._guard:
+            entry = self._waiters.setdefault(key, [threading.Event(), 0])
+            entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    self._waiters.pop(key, None)
+
+    def _on_filled(self, keys: list[str]) -> None:
+        with self._guard:
+            events = [self._waiters[key][0] for key in keys if key in self._waiters]
+        for event in events:
+            event.set()
+
+    # --- Redis lock ---
+    def _acquire(self, key: str) -> Optional[str]:
+        client = self.cache.redis
+        if client is None:
+            return _LOCAL_TOKEN
+        token = uuid.uuid4().hex
+        try:
+            if client.set(f"{_LOCK_PREFIX}{key}", token, nx=True, px=self.lock_ms):
+                return token
+            return None
+        except Exception:
+            return _LOCAL_TOKEN
+
+    def _release(self, key: str, token: str) -> None:
+        client = self.cache.redis
+        if client is None or token == _LOCAL_TOKEN:
+            return
+        try:
+            client.eval(_RELEASE_SCRIPT, 1, f"{_LOCK_PREFIX}{key}", token)
+        except Exception:
+            pass
+
+    # --- cache envelope ---
+    def _read(self, key: str) -> Optional[tuple[float, Any]]:
+        envelope = self.cache.get_json(key)
+        if not isinstance(envelope, dict) or "value" not in envelope:
+            return None
+        try:
+            fresh_until = float(envelope.get("fresh_until") or 0)
+        except (TypeError, ValueError):
+            fresh_until = 0.0
+        return fresh_until, envelope["value"]
+
+    def _store(self, key: str, value: Any, ttl: int, stale_ttl: int) -> None:
+        envelope = {"fresh_until": time.time() + ttl, "value": value}
+        self.cache.set_json(key, envelope, ttl=max(1, ttl + stale_ttl))
+        # Wakes waiters here and, through the invalidation channel, elsewhere.
+        self.cache.invalidate_keys((key,))
+
+    def _compute_and_store(self, key: str, compute: Callable[[], Any], ttl: int, stale_ttl: int) -> Any:
+        value = compute()
+        self._store(key, value, ttl, stale_ttl)
+        return value
+
+    # --- public API ---
+    def fetch(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int,
+        stale_ttl: int = 0,
+    ) -> Any:
+        """
+        Cached value for `key`, computing it at most once cluster-wide on a
+        miss. Entries older than `ttl` but within `ttl + stale_ttl` are
+        returned as-is while one background refresh replaces them. `compute`
+        must not depend on request-scoped resources when `stale_ttl` is set.
+        """
+        cached = self._read(key)
+        if cached is not None:
+            if cached[0] <= time.time():
+                self._refresh_in_background(key, compute, ttl, stale_ttl)
+            return cached[1]
+
+        with self._local_lock(key):
+            cached = self._read(key)
+            if cached is not None:
+                return cached[1]
+
+            deadline = time.monotonic() + self.wait_seconds
+            with self._waiter(key) as filled:
+                while True:
+                    token = self._acquire(key)
+                    if token is not None:
+                        try:
+                            return self._compute_and_store(key, compute, ttl, stale_ttl)
+                        finally:
+                            self._release(key, token)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    filled.wait(min(_POLL_INTERVAL_SECONDS, remaining))
+                    filled.clear()
+                    cached = self._read(key)
+                    if cached is not None:
+                        return cached[1]
+
+        # The holder is too slow (or gone without releasing): answer this
+        # request ourselves rather than fail it.
+        return self._compute_and_store(key, compute, ttl, stale_ttl)
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any], ttl: int, stale_ttl: int) -> None:
+        with self._guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        token = self._acquire(key)
+        if token is None:
+            with self._guard:
+                self._refreshing.discard(key)
+            return
+
+        def _run() -> None:
+            try:
+                self._compute_and_store(key, compute, ttl, stale_ttl)
+            except Exception as exc:
+                print(f"[SingleFlight] Refresh failed for {key}: {exc}")
+            finally:
+                self._release(key, token)
+                with self._guard:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(_run)
+
+
+single_flight = SingleFlight(cache_client)
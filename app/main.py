@@ -7,7 +7,6 @@ from datetime import datetime, timezone
 from urllib.parse import unquote
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 import threading
 from sqlalchemy.exc import OperationalError
 
@@ -30,6 +29,8 @@ from .core.config import (
     STEAM_GLOBAL_INDEX_AUTOSYNC_REQUIRE_API_KEY,
     STEAM_GLOBAL_INDEX_AUTOSYNC_TARGET_MIN_TITLES,
     STEAM_GLOBAL_INDEX_RUNNING_STALE_SECONDS,
+    STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED,
+    STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REFRESH_SECONDS,
     STEAM_WEB_API_KEY,
     STEAMGRIDDB_PREWARM_CONCURRENCY,
     STEAMGRIDDB_PREWARM_ENABLED,
@@ -37,17 +38,23 @@ from .core.config import (
 )
 from .core.denuvo import DENUVO_APP_ID_SET
 from .core.cache import cache_client
+from .core.rate_limit import rate_limiter
 from .db import Base, engine, SessionLocal
 from .models import ChatMessage, IngestJob
 from .migrations import ensure_schema
 from .seed import seed_games
+from .services.embedding_store import embedding_store
+from .services.query_embeddings import query_usage_recorder
 from .services.steam_catalog import get_lua_appids
-from .services.ai_observability import record_http_request, should_track_request
 from .services.steamgriddb import prewarm_steamgriddb_cache
+from .services.huggingface import close_async_client as close_huggingface_client
 from .services.steam_global_index import (
     get_ingest_status,
     ingest_full_catalog,
     ingest_global_catalog,
+    refresh_catalog_search_engine,
+    wait_for_catalog_search_change,
+    warm_catalog_search_engine,
 )
 from .routes import (
     auth,
@@ -101,7 +108,12 @@ from fastapi import WebSocket, WebSocketDisconnect, status, HTTPException
 from fastapi.responses import JSONResponse, Response
 from jose import jwt, JWTError
 from .core.config import SECRET_KEY, ALGORITHM
-from .middleware import AuthMiddleware, RateLimitMiddleware
+from .middleware import (
+    AuthMiddleware,
+    ObservabilityMiddleware,
+    RateLimitMiddleware,
+    SelectiveGZipMiddleware,
+)
 
 app = FastAPI(title="Otoshi Launcher API", version="0.1.0")
 
@@ -154,7 +166,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 # Note: Middleware is executed in REVERSE order of addition.
 # AuthMiddleware must be added LAST so it runs AFTER CORSMiddleware adds headers.
-# Order of execution: AuthMiddleware -> RateLimitMiddleware -> CORSMiddleware -> GZipMiddleware
+# Order of execution: AuthMiddleware -> RateLimitMiddleware -> CORSMiddleware -> SelectiveGZipMiddleware
 app.add_middleware(AuthMiddleware)
 app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
@@ -166,34 +178,9 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
-
-
-@app.middleware("http")
-async def ai_observability_middleware(request: Request, call_next):
-    path = str(request.url.path or "")
-    should_track = should_track_request(path)
-    if not should_track:
-        return await call_next(request)
-
-    started = time.perf_counter()
-    status_code = 500
-    try:
-        response = await call_next(request)
-        status_code = int(getattr(response, "status_code", 500) or 500)
-        return response
-    except Exception:
-        status_code = 500
-        raise
-    finally:
-        latency_ms = (time.perf_counter() - started) * 1000.0
-        record_http_request(
-            path=path,
-            method=request.method,
-            status_code=status_code,
-            latency_ms=latency_ms,
-            query_params=dict(request.query_params),
-        )
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000, exclude_paths=("/cdn/chunks",))
+# Added last, so it wraps every other layer and its latency covers the whole stack.
+app.add_middleware(ObservabilityMiddleware)
 
 
 def _ensure_storage_dirs() -> None:
@@ -396,6 +383,30 @@ def _autosync_global_index_loop() -> None:
         time.sleep(interval_seconds)
 
 
+def _warm_catalog_search_engine() -> None:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        size = warm_catalog_search_engine(db)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        print(f"Catalog search engine ready (titles={size}, build_ms={elapsed_ms:.0f})")
+    except Exception as exc:
+        print(f"Catalog search engine warmup failed: {exc}")
+    finally:
+        db.close()
+
+    # Ingest may run in any worker; each one keeps its own engine current.
+    while True:
+        wait_for_catalog_search_change(STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REFRESH_SECONDS)
+        db = SessionLocal()
+        try:
+            refresh_catalog_search_engine(db)
+        except Exception as exc:
+            print(f"Catalog search engine refresh failed: {exc}")
+        finally:
+            db.close()
+
+
 def _should_seed_sample_games() -> bool:
     """Seed demo/sample games only when explicitly enabled in packaged builds."""
     raw = os.getenv("SEED_SAMPLE_GAMES")
@@ -414,6 +425,8 @@ def on_startup() -> None:
 
     # Sync lua files in background to avoid blocking startup/port scan
     threading.Thread(target=_start_lua_sync, daemon=True).start()
+    if GLOBAL_INDEX_V1 and STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED:
+        threading.Thread(target=_warm_catalog_search_engine, daemon=True).start()
     if GLOBAL_INDEX_V1 and STEAM_GLOBAL_INDEX_BOOTSTRAP_ENABLED:
         threading.Thread(target=_bootstrap_global_index_if_needed, daemon=True).start()
     if GLOBAL_INDEX_V1 and STEAM_GLOBAL_INDEX_AUTOSYNC_ENABLED:
@@ -444,8 +457,12 @@ def on_startup() -> None:
 
 
 @app.on_event("shutdown")
-def on_shutdown() -> None:
+async def on_shutdown() -> None:
     cache_client.disconnect()
+    await close_huggingface_client()
+    await rate_limiter.close()
+    embedding_store.persist()
+    query_usage_recorder.flush()
 
 
 @app.get("/health")
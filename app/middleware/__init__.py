@@ -1,4 +1,11 @@
 from .auth import AuthMiddleware
+from .compression import SelectiveGZipMiddleware
+from .observability import ObservabilityMiddleware
 from .rate_limit import RateLimitMiddleware
 
-__all__ = ["AuthMiddleware", "RateLimitMiddleware"]
+__all__ = [
+    "AuthMiddleware",
+    "ObservabilityMiddleware",
+    "RateLimitMiddleware",
+    "SelectiveGZipMiddleware",
+]
@@ -1,50 +1,63 @@
-from fastapi import Request, status
-from jose import JWTError, jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
 import logging
+from typing import Any, Optional
 
-from ..core.config import ALGORITHM, SECRET_KEY, CORS_ORIGINS
-
-logger = logging.getLogger(__name__)
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from ..core.config import ALGORITHM, SECRET_KEY
 
-def _add_cors_headers(response: JSONResponse, request: Request) -> JSONResponse:
-    """Add CORS headers to error responses."""
-    origin = request.headers.get("origin", "")
-    if origin in CORS_ORIGINS or "*" in CORS_ORIGINS:
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Allow-Methods"] = "*"
-        response.headers["Access-Control-Allow-Headers"] = "*"
-    return response
+logger = logging.getLogger(__name__)
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+def decode_request_token(scope: Scope, token: str) -> Optional[dict[str, Any]]:
+    """
+    JWT claims for `token`, decoded at most once per request: the result is kept
+    in scope["state"] so AuthMiddleware and the auth dependencies share it.
+    Returns None when the token does not verify.
+    """
+    state = scope.setdefault("state", {})
+    if state.get("access_token") == token and "token_claims" in state:
+        return state["token_claims"]
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        state["token_error"] = None
+    except JWTError as exc:
+        claims = None
+        state["token_error"] = str(exc)
+    state["access_token"] = token
+    state["token_claims"] = claims
+    return claims
+
+
+class AuthMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip authentication for preflight OPTIONS requests
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
-        auth_header = request.headers.get("Authorization", "")
-        request.state.user_id = None
-        request.state.token_error = None
+        state = scope.setdefault("state", {})
+        state["user_id"] = None
+        state["token_error"] = None
 
+        auth_header = Headers(scope=scope).get("authorization", "")
         if auth_header.startswith("Bearer "):
             token = auth_header.split(" ", 1)[1]
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                if payload.get("type") not in (None, "access"):
-                    # Invalid token type - log but don't block
-                    # Route-level auth will handle this
-                    request.state.token_error = "Invalid token type"
-                    logger.debug("Invalid token type received")
-                else:
-                    request.state.user_id = payload.get("sub")
-            except JWTError as exc:
+            payload = decode_request_token(scope, token)
+            if payload is None:
                 # Invalid/expired token - log but don't block
                 # Route-level auth will handle this via get_current_user dependency
-                request.state.token_error = str(exc)
-                logger.debug(f"JWT decode error: {exc}")
-
-        return await call_next(request)
+                logger.debug(f"JWT decode error: {state.get('token_error')}")
+            elif payload.get("type") not in (None, "access"):
+                # Invalid token type - log but don't block
+                # Route-level auth will handle this
+                state["token_error"] = "Invalid token type"
+                logger.debug("Invalid token type received")
+            else:
+                state["user_id"] = payload.get("sub")
+
+        await self.app(scope, receive, send)
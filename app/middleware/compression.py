@@ -0,0 +1,83 @@
+from typing import Iterable
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Payloads that are already compressed (or must not be buffered) are sent as-is.
+_INCOMPRESSIBLE_MEDIA_PREFIXES = (
+    "application/octet-stream",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/x-zstd",
+    "application/zstd",
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "text/event-stream",
+)
+_COMPRESSIBLE_IMAGE_TYPES = ("image/svg+xml",)
+
+
+def _is_incompressible(headers: Headers, status_code: int) -> bool:
+    if status_code == 206 or "content-range" in headers:
+        return True
+    media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if media_type in _COMPRESSIBLE_IMAGE_TYPES:
+        return False
+    return any(media_type.startswith(prefix) for prefix in _INCOMPRESSIBLE_MEDIA_PREFIXES)
+
+
+class _SelectiveGZipResponder(GZipResponder):
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.bypass = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.bypass = _is_incompressible(headers, int(message.get("status", 200)))
+        if self.bypass:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+
+class SelectiveGZipMiddleware:
+    """
+    GZip for API payloads only: excluded path prefixes, range requests and
+    binary/archive content types pass through untouched, so chunk downloads
+    never pay for recompressing data that is already compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int = 9,
+        exclude_paths: Iterable[str] = (),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = str(scope.get("path") or "")
+        headers = Headers(scope=scope)
+        if (
+            "gzip" not in headers.get("accept-encoding", "")
+            or "range" in headers
+            or any(path.startswith(prefix) for prefix in self.exclude_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+        responder = _SelectiveGZipResponder(self.app, self.minimum_size, self.compresslevel)
+        await responder(scope, receive, send)
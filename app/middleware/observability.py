@@ -0,0 +1,45 @@
+import time
+
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.ai_observability import record_http_request, should_track_request
+
+
+class ObservabilityMiddleware:
+    """Records status and time-to-response-start for tracked API paths."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = str(scope.get("path") or "")
+        if not should_track_request(path):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        outcome = {"status": 500, "latency_ms": None}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                outcome["status"] = int(message.get("status") or 500)
+                outcome["latency_ms"] = (time.perf_counter() - started) * 1000.0
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = outcome["latency_ms"]
+            if latency_ms is None:
+                latency_ms = (time.perf_counter() - started) * 1000.0
+            record_http_request(
+                path=path,
+                method=str(scope.get("method") or ""),
+                status_code=int(outcome["status"]),
+                latency_ms=latency_ms,
+                query_params=dict(QueryParams(scope.get("query_string") or b"")),
+            )
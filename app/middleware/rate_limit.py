@@ -1,8 +1,7 @@
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from ..core.cache import cache_client
 from ..core.config import (
     AI_WRITE_MAX_BODY_BYTES,
     CORS_ORIGINS,
@@ -12,6 +11,7 @@ from ..core.config import (
     RATE_LIMIT_PRIVACY_WRITE_PER_MINUTE,
     RATE_LIMIT_STEAM_CATALOG_PER_MINUTE,
 )
+from ..core.rate_limit import rate_limiter, route_template
 
 _WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
 _AI_WRITE_PATHS = (
@@ -41,9 +41,9 @@ def _resolve_limit(method: str, path: str) -> int:
     return RATE_LIMIT_DEFAULT_PER_MINUTE
 
 
-def _add_cors_headers(response: JSONResponse, request: Request) -> JSONResponse:
+def _add_cors_headers(response: JSONResponse, headers: Headers) -> JSONResponse:
     """Add CORS headers to error responses."""
-    origin = request.headers.get("origin", "")
+    origin = headers.get("origin", "")
     if origin in CORS_ORIGINS or "*" in CORS_ORIGINS:
         response.headers["Access-Control-Allow-Origin"] = origin
         response.headers["Access-Control-Allow-Credentials"] = "true"
@@ -52,19 +52,25 @@ def _add_cors_headers(response: JSONResponse, request: Request) -> JSONResponse:
     return response
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip rate limiting for preflight OPTIONS requests
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["type"] != "http" or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        path = request.url.path
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        method = scope["method"]
+        path = scope.get("path") or ""
+        headers = Headers(scope=scope)
 
         # Fast reject oversized AI write payloads before reading request body.
         if _is_ai_write_request(method, path):
-            raw_length = request.headers.get("content-length", "").strip()
+            raw_length = headers.get("content-length", "").strip()
             if raw_length:
                 try:
                     content_length = int(raw_length)
@@ -75,21 +81,23 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                         status_code=413,
                         content={"detail": "Payload too large"},
                     )
-                    return _add_cors_headers(response, request)
+                    await _add_cors_headers(response, headers)(scope, receive, send)
+                    return
 
         limit = _resolve_limit(method, path)
 
-        allowed = cache_client.check_rate_limit(
-            f"{client_ip}:{method}:{path}",
+        decision = await rate_limiter.hit(
+            f"{client_ip}:{method}:{route_template(scope)}",
             limit,
             window_seconds=60,
         )
-        if not allowed:
+        if not decision.allowed:
             response = JSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests"},
             )
-            response.headers["Retry-After"] = "60"
-            return _add_cors_headers(response, request)
+            response.headers["Retry-After"] = str(decision.retry_after or 60)
+            await _add_cors_headers(response, headers)(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -2,6 +2,15 @@ from sqlalchemy import inspect, text
 
 from .core.config import AI_SEARCH_VECTOR_DIM
 from .db import engine
+from .models import CatalogPriorityRank
+from .services.catalog_search_index import (
+    ALIAS_FTS_TABLE,
+    FTS_ROWID_COLUMN,
+    TITLE_FTS_TABLE,
+    build_title_search_fields,
+    build_title_type_rank,
+    mark_catalog_search_schema_changed,
+)
 from .services.vector_store import mark_pgvector_schema_changed
 
 
@@ -128,6 +137,47 @@ def ensure_schema() -> None:
                 alters.append(f"ALTER TABLE games ADD COLUMN updated_at {timestamp_type}")
         _apply_alters(alters)
 
+    if "steam_titles" in tables:
+        columns = {col["name"] for col in inspector.get_columns("steam_titles")}
+        alters = []
+        if "compact_name" not in columns:
+            alters.append("ALTER TABLE steam_titles ADD COLUMN compact_name VARCHAR(300)")
+            alters.append(
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_compact_name ON steam_titles (compact_name)"
+            )
+        if "name_initials" not in columns:
+            alters.append("ALTER TABLE steam_titles ADD COLUMN name_initials VARCHAR(64)")
+            alters.append(
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_name_initials ON steam_titles (name_initials)"
+            )
+        if "type_rank" not in columns:
+            alters.append("ALTER TABLE steam_titles ADD COLUMN type_rank INTEGER")
+            alters.append(
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_type_rank ON steam_titles (type_rank)"
+            )
+        alters.extend(
+            [
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_rank_name "
+                "ON steam_titles (type_rank, name, app_id)",
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_rank_updated "
+                "ON steam_titles (type_rank, updated_at DESC, app_id DESC)",
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_rank_app_id "
+                "ON steam_titles (type_rank, app_id)",
+                "CREATE INDEX IF NOT EXISTS ix_steam_titles_updated_at ON steam_titles (updated_at)",
+            ]
+        )
+        _apply_alters(alters)
+        _backfill_title_search_fields()
+        _backfill_title_type_rank()
+
+    if "steam_title_aliases" in tables:
+        _apply_alters(
+            [
+                "CREATE INDEX IF NOT EXISTS ix_steam_title_aliases_updated_at "
+                "ON steam_title_aliases (updated_at)"
+            ]
+        )
+
     if "user_profiles" in tables:
         columns = {col["name"] for col in inspector.get_columns("user_profiles")}
         alters = []
@@ -261,7 +311,25 @@ def ensure_schema() -> None:
                 )
             )
 
+    if "chunk_store" in tables:
+        columns = {col["name"] for col in inspector.get_columns("chunk_store")}
+        alters = []
+        if "file_size" not in columns:
+            alters.append(f"ALTER TABLE chunk_store ADD COLUMN file_size {bytes_type}")
+        if "file_mtime_ns" not in columns:
+            alters.append(f"ALTER TABLE chunk_store ADD COLUMN file_mtime_ns {bytes_type}")
+        _apply_alters(alters)
+
+    if "catalog_priority_ranks" in tables:
+        primary_key = inspector.get_pk_constraint("catalog_priority_ranks").get("constrained_columns") or []
+        if "version" not in primary_key:
+            # Derived data, rebuilt on the next catalog query.
+            with engine.begin() as connection:
+                connection.execute(text("DROP TABLE catalog_priority_ranks"))
+                CatalogPriorityRank.__table__.create(bind=connection)
+
     _ensure_pgvector_schema(max(16, int(AI_SEARCH_VECTOR_DIM or 128)))
+    _ensure_catalog_search_schema()
 
 
 def _apply_alters(statements: list[str]) -> None:
@@ -351,3 +419,185 @@ def _backfill_pgvector_column(connection, table_name: str, dimension: int) -> No
         ),
         {"dimension": int(dimension)},
     )
+
+
+def _backfill_title_search_fields(batch_size: int = 2000) -> None:
+    select_statement = text(
+        "SELECT id, normalized_name FROM steam_titles "
+        "WHERE normalized_name IS NOT NULL AND (compact_name IS NULL OR name_initials IS NULL) "
+        "LIMIT :batch_size"
+    )
+    update_statement = text(
+        "UPDATE steam_titles SET compact_name = :compact_name, name_initials = :name_initials "
+        "WHERE id = :row_id"
+    )
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(select_statement, {"batch_size": batch_size}).all()
+            if not rows:
+                return
+            params = []
+            for row_id, normalized_name in rows:
+                compact_name, name_initials = build_title_search_fields(normalized_name)
+                params.append(
+                    {
+                        "row_id": row_id,
+                        "compact_name": compact_name,
+                        "name_initials": name_initials,
+                    }
+                )
+            connection.execute(update_statement, params)
+        if len(rows) < batch_size:
+            return
+
+
+def _backfill_title_type_rank(batch_size: int = 2000) -> None:
+    select_statement = text(
+        "SELECT id, title_type, normalized_name FROM steam_titles "
+        "WHERE type_rank IS NULL LIMIT :batch_size"
+    )
+    update_statement = text("UPDATE steam_titles SET type_rank = :type_rank WHERE id = :row_id")
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(select_statement, {"batch_size": batch_size}).all()
+            if not rows:
+                return
+            connection.execute(
+                update_statement,
+                [
+                    {
+                        "row_id": row_id,
+                        "type_rank": build_title_type_rank(title_type, normalized_name),
+                    }
+                    for row_id, title_type, normalized_name in rows
+                ],
+            )
+        if len(rows) < batch_size:
+            return
+
+
+def _ensure_catalog_search_schema() -> None:
+    tables = set(inspect(engine).get_table_names())
+    if not {"steam_titles", "steam_title_aliases"}.issubset(tables):
+        return
+    if engine.dialect.name == "postgresql":
+        _ensure_pg_trigram_indexes()
+    elif engine.dialect.name == "sqlite":
+        _ensure_sqlite_fts_tables(tables)
+    mark_catalog_search_schema_changed()
+
+
+def _ensure_pg_trigram_indexes() -> None:
+    # GIN trigram indexes let ILIKE '%term%' predicates in search_catalog use an
+    # index instead of scanning the whole title table.
+    index_specs = (
+        ("ix_steam_titles_normalized_name_trgm", "steam_titles", "normalized_name"),
+        ("ix_steam_titles_compact_name_trgm", "steam_titles", "compact_name"),
+        ("ix_steam_titles_name_initials_trgm", "steam_titles", "name_initials"),
+        ("ix_steam_titles_app_id_trgm", "steam_titles", "app_id"),
+        ("ix_steam_title_aliases_normalized_alias_trgm", "steam_title_aliases", "normalized_alias"),
+    )
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for index_name, table_name, column_name in index_specs:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} "
+                        f"ON {table_name} USING gin ({column_name} gin_trgm_ops)"
+                    )
+                )
+    except Exception:
+        # Managed Postgres may refuse CREATE EXTENSION; search falls back to sequential scans.
+        return
+
+
+def _ensure_sqlite_fts_rowid(connection, table_name: str) -> None:
+    # A stable integer key for the FTS rows: the implicit rowid of a table
+    # with a string primary key may be renumbered by VACUUM.
+    columns = {col["name"] for col in inspect(connection).get_columns(table_name)}
+    if FTS_ROWID_COLUMN not in columns:
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {FTS_ROWID_COLUMN} INTEGER"))
+    offset = connection.execute(text(f"SELECT COALESCE(MAX({FTS_ROWID_COLUMN}), 0) FROM {table_name}")).scalar()
+    connection.execute(
+        text(f"UPDATE {table_name} SET {FTS_ROWID_COLUMN} = rowid + :offset WHERE {FTS_ROWID_COLUMN} IS NULL"),
+        {"offset": int(offset or 0)},
+    )
+    connection.execute(
+        text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{table_name}_{FTS_ROWID_COLUMN} "
+            f"ON {table_name} ({FTS_ROWID_COLUMN})"
+        )
+    )
+
+
+def _sqlite_fts_triggers(fts_table: str, content_table: str, columns: list[str]) -> list[str]:
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    key = FTS_ROWID_COLUMN
+    return [
+        f"""
+        CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            UPDATE {content_table}
+            SET {key} = (SELECT COALESCE(MAX({key}), 0) + 1 FROM {content_table})
+            WHERE rowid = new.rowid AND {key} IS NULL;
+            INSERT INTO {fts_table}(rowid, {column_list})
+            SELECT {key}, {column_list} FROM {content_table} WHERE rowid = new.rowid;
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list})
+            VALUES ('delete', old.{key}, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts_table}_au
+        AFTER UPDATE OF {column_list} ON {content_table} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list})
+            VALUES ('delete', old.{key}, {old_values});
+            INSERT INTO {fts_table}(rowid, {column_list})
+            VALUES (new.{key}, {new_values});
+        END
+        """,
+    ]
+
+
+def _ensure_sqlite_fts_tables(tables: set[str]) -> None:
+    # External-content FTS5 tables kept in sync by triggers, so every ingest
+    # write (ORM or raw SQL) maintains the index without extra application code.
+    # Rows are keyed by FTS_ROWID_COLUMN; tables from before it existed (keyed
+    # by the implicit rowid) are dropped and rebuilt.
+    specs = (
+        (TITLE_FTS_TABLE, "steam_titles", ["normalized_name", "compact_name", "name_initials"]),
+        (ALIAS_FTS_TABLE, "steam_title_aliases", ["normalized_alias"]),
+    )
+    try:
+        with engine.begin() as connection:
+            for fts_table, content_table, columns in specs:
+                _ensure_sqlite_fts_rowid(connection, content_table)
+                for suffix in ("ai", "ad", "au"):
+                    connection.execute(text(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}"))
+                if fts_table in tables:
+                    definition = connection.execute(
+                        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {"name": fts_table},
+                    ).scalar()
+                    if f"content_rowid='{FTS_ROWID_COLUMN}'" not in str(definition or ""):
+                        connection.execute(text(f"DROP TABLE {fts_table}"))
+                        tables = tables - {fts_table}
+                if fts_table not in tables:
+                    connection.execute(
+                        text(
+                            f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+                            f"{', '.join(columns)}, content='{content_table}', "
+                            f"content_rowid='{FTS_ROWID_COLUMN}', tokenize='trigram')"
+                        )
+                    )
+                    connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+                for statement in _sqlite_fts_triggers(fts_table, content_table, columns):
+                    connection.execute(text(statement))
+    except Exception:
+        # SQLite builds without FTS5/trigram support (< 3.34) keep the LIKE-based search path.
+        return
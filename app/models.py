@@ -9,9 +9,11 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     ForeignKey,
+    Index,
     JSON,
     Text,
     UniqueConstraint,
+    desc,
 )
 from sqlalchemy.orm import relationship
 
@@ -241,12 +243,23 @@ class SteamGridDBCache(Base):
 
 class SteamTitle(Base):
     __tablename__ = "steam_titles"
+    # Composite keys backing keyset pagination of the global catalog sorts.
+    __table_args__ = (
+        Index("ix_steam_titles_rank_name", "type_rank", "name", "app_id"),
+        Index("ix_steam_titles_rank_updated", "type_rank", desc("updated_at"), desc("app_id")),
+        Index("ix_steam_titles_rank_app_id", "type_rank", "app_id"),
+        # Incremental search engine refreshes read rows changed since a watermark.
+        Index("ix_steam_titles_updated_at", "updated_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_id)
     app_id = Column(String(20), unique=True, index=True, nullable=False)
     name = Column(String(300), nullable=False)
     normalized_name = Column(String(300), index=True, nullable=True)
+    compact_name = Column(String(300), index=True, nullable=True)
+    name_initials = Column(String(64), index=True, nullable=True)
     title_type = Column(String(30), nullable=True)
+    type_rank = Column(Integer, index=True, nullable=True)
     release_date = Column(String(64), nullable=True)
     developer = Column(String(200), nullable=True)
     publisher = Column(String(200), nullable=True)
@@ -336,11 +349,43 @@ class SteamTitleAlias(Base):
     locale = Column(String(12), default="en")
     source = Column(String(30), default="steam")
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     title = relationship("SteamTitle", back_populates="aliases")
 
 
+class CatalogPriorityRank(Base):
+    """Materialized priority index, joined by catalog queries for ranking."""
+
+    __tablename__ = "catalog_priority_ranks"
+    __table_args__ = (Index("ix_catalog_priority_ranks_version_rank", "version", "rank"),)
+
+    # Keyed by index version: workers can briefly hold different indexes.
+    version = Column(String(32), primary_key=True)
+    app_id = Column(String(20), primary_key=True)
+    rank = Column(Integer, nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class StoredChunk(Base):
+    """First known location of each content chunk, shared by all games and builds."""
+
+    __tablename__ = "chunk_store"
+
+    chunk_hash = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    game_id = Column(String(36), nullable=False, index=True)
+    slug = Column(String(120), nullable=False)
+    content_id = Column(String(32), nullable=False)
+    file_path = Column(Text, nullable=False)
+    offset = Column(BigInteger, nullable=False, default=0)
+    # Stat of the source file when the row was recorded; a mismatch means the
+    # tree was replaced since and the bytes at `offset` are no longer this chunk.
+    file_size = Column(BigInteger, nullable=True)
+    file_mtime_ns = Column(BigInteger, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class SteamDbEnrichment(Base):
     __tablename__ = "steamdb_enrichment"
     __table_args__ = (UniqueConstraint("steam_title_id", name="uq_steamdb_enrichment_title_id"),)
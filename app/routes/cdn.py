@@ -1,32 +1,39 @@
+import os
+import stat
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 
 from ..core.cache import cache_client
-from ..core.config import MANIFEST_SOURCE_DIR
+from ..core.responses import FileSliceResponse
+from ..core.config import HF_PROXY_MODE, HF_TIMEOUT_SECONDS, MANIFEST_SOURCE_DIR
 from ..db import get_db
 from ..models import Game
+from ..services.chunk_cache import ChunkCacheWriter, ChunkFlight, chunk_disk_cache, normalize_chunk_hash
+from ..services.chunk_store import find_chunk_source
 from ..services.manifest import build_manifest
+from ..services.manifest_index import ManifestIndex, manifest_index_cache
 from ..services.huggingface import HuggingFaceChunkError, huggingface_fetcher
 
 router = APIRouter()
 _MANIFEST_CACHE_TTL_SECONDS = 24 * 60 * 60
+_TEE_FLUSH_BYTES = 4 * 1024 * 1024
 
 
-def _find_file_entry(manifest: dict, file_id: str) -> Optional[dict]:
-    for file in manifest.get("files", []):
-        if file.get("file_id") == file_id:
-            return file
-    return None
+def _hydrate_manifest_cache(game_id: str, db: Session) -> Optional[ManifestIndex]:
+    index = manifest_index_cache.get(game_id)
+    if index is not None:
+        return index
 
-
-def _hydrate_manifest_cache(game_id: str, db: Session) -> Optional[dict]:
     cached = cache_client.get_json(f"manifest:{game_id}")
     if isinstance(cached, dict):
-        return cached
+        return manifest_index_cache.put(game_id, cached)
 
     game = db.query(Game).filter(Game.id == game_id).first()
     if not game:
@@ -36,102 +43,243 @@ def _hydrate_manifest_cache(game_id: str, db: Session) -> Optional[dict]:
     if not isinstance(manifest, dict):
         return None
 
-    cache_client.set_json(
-        f"manifest:{game_id}",
-        manifest,
-        ttl=_MANIFEST_CACHE_TTL_SECONDS,
-    )
+    to_cache = {f"manifest:{game_id}": manifest}
     slug = str(manifest.get("slug") or game.slug or "").strip()
     if slug:
-        cache_client.set_json(
-            f"manifest:{slug}",
-            manifest,
-            ttl=_MANIFEST_CACHE_TTL_SECONDS,
-        )
+        to_cache[f"manifest:{slug}"] = manifest
+    cache_client.set_many_json(to_cache, ttl=_MANIFEST_CACHE_TTL_SECONDS)
+
+    return manifest_index_cache.put(game_id, manifest)
+
+
+def _cached_chunk_response(path: Path, chunk_hash: str) -> FileSliceResponse:
+    return FileSliceResponse(path, etag=chunk_hash, headers={"X-Chunk-Cache": "hit"})
+
+
+def _stat_regular_file(path: Path) -> Optional[os.stat_result]:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return None
+    return stat_result if stat.S_ISREG(stat_result.st_mode) else None
+
+
+def _shared_chunk_source(
+    db: Session, chunk_hash: str, size: int
+) -> Optional[tuple[Path, int, os.stat_result]]:
+    source = find_chunk_source(db, MANIFEST_SOURCE_DIR, chunk_hash, size)
+    if source is None:
+        return None
+    stat_result = _stat_regular_file(source[0])
+    if stat_result is None or stat_result.st_size < source[1] + size:
+        return None
+    return source[0], source[1], stat_result
+
+
+def _write_and_commit(writer: ChunkCacheWriter, tail: bytearray) -> bool:
+    if tail:
+        writer.write(tail)
+    return writer.commit()
+
 
-    return manifest
+async def _tee_async(blocks, writer: Optional[ChunkCacheWriter], flight: Optional[ChunkFlight]):
+    cached = False
+    # Blocks are buffered so the cache write costs one threadpool hop per
+    # _TEE_FLUSH_BYTES (typically once per chunk) rather than one per block.
+    pending = bytearray()
+    try:
+        async for block in blocks:
+            if writer is not None:
+                pending += block
+                if len(pending) >= _TEE_FLUSH_BYTES:
+                    flushing, pending = pending, bytearray()
+                    await run_in_threadpool(writer.write, flushing)
+            yield block
+        if writer is not None:
+            cached = await run_in_threadpool(_write_and_commit, writer, pending)
+    finally:
+        if writer is not None and not cached:
+            writer.abort()
+        if flight is not None:
+            flight.end(cached)
+
+
+def _tee_sync(response, writer: Optional[ChunkCacheWriter], flight: Optional[ChunkFlight]):
+    cached = False
+    try:
+        for block in response.iter_content(chunk_size=65536):
+            if block:
+                if writer is not None:
+                    writer.write(block)
+                yield block
+        if writer is not None:
+            cached = writer.commit()
+    finally:
+        response.close()
+        if writer is not None and not cached:
+            writer.abort()
+        if flight is not None:
+            flight.end(cached)
+
+
+async def _after_response(flight: Optional[ChunkFlight], close) -> None:
+    """
+    Runs once the response is over, even when the client left before reading
+    the body and the tee never ran: the flight (a no-op if the tee ended it)
+    and the upstream connection are released with the response.
+    """
+    if flight is not None:
+        flight.end(False)
+    await close()
 
 
 @router.get("/chunks/{game_id}/{file_id}/{chunk_index}")
-def get_chunk(
+async def get_chunk(
     game_id: str,
     file_id: str,
     chunk_index: int,
     size: int = Query(..., gt=0, le=2 * 1024 * 1024 * 1024),
     db: Session = Depends(get_db),
 ):
-    manifest = _hydrate_manifest_cache(game_id, db)
-    if not manifest:
+    # Hot path stays on the event loop; only cache misses touch Redis/DB in a worker.
+    manifest_index = manifest_index_cache.get(game_id)
+    if manifest_index is None:
+        manifest_index = await run_in_threadpool(_hydrate_manifest_cache, game_id, db)
+    if not manifest_index:
         raise HTTPException(status_code=404, detail=f"Manifest not found for game_id={game_id}")
 
-    file_entry = None
-    if manifest:
-        file_entry = _find_file_entry(manifest, file_id)
-    if not file_entry:
-        cache_client.delete(f"manifest:{game_id}")
-        manifest = _hydrate_manifest_cache(game_id, db)
-        if manifest:
-            file_entry = _find_file_entry(manifest, file_id)
+    file_entry = manifest_index.find_file(file_id)
     if not file_entry:
+        await run_in_threadpool(cache_client.delete, f"manifest:{game_id}")
+        manifest_index_cache.invalidate(game_id)
+        manifest_index = await run_in_threadpool(_hydrate_manifest_cache, game_id, db)
+        if manifest_index:
+            file_entry = manifest_index.find_file(file_id)
+    if not file_entry or not manifest_index:
         raise HTTPException(
             status_code=404,
             detail=f"Chunk file not found in manifest (game_id={game_id}, file_id={file_id})",
         )
 
-    file_path = file_entry.get("path") if file_entry else None
-    source_path = None
-    if file_entry:
-        source_path = file_entry.get("source_path") or file_path
+    file_path = file_entry.get("path")
+    source_path = file_entry.get("source_path") or file_path
 
-    if file_path and MANIFEST_SOURCE_DIR and manifest:
-        slug = manifest.get("slug") if manifest else None
+    if file_path and MANIFEST_SOURCE_DIR:
+        slug = manifest_index.slug
         if slug:
             local_source_path = Path(MANIFEST_SOURCE_DIR) / slug / file_path
-            if local_source_path.exists():
-                offset = chunk_index * manifest.get("chunk_size", 1024 * 1024)
-
-                def file_stream():
-                    with local_source_path.open("rb") as handle:
-                        handle.seek(offset)
-                        remaining = size
-                        while remaining > 0:
-                            data = handle.read(min(65536, remaining))
-                            if not data:
-                                break
-                            remaining -= len(data)
-                            yield data
-
-                return StreamingResponse(file_stream(), media_type="application/octet-stream")
-
-    if source_path and manifest:
-        slug = manifest.get("slug") or ""
-        chunk_size = int(manifest.get("chunk_size") or 1024 * 1024)
-        try:
-            response = huggingface_fetcher.get_chunk_response(
+            stat_result = await run_in_threadpool(_stat_regular_file, local_source_path)
+            if stat_result is not None:
+                chunk_entry = manifest_index.find_chunk(file_entry, chunk_index)
+                # Content-defined chunks carry their own offset.
+                offset = chunk_index * manifest_index.chunk_size
+                if chunk_entry and chunk_entry.get("offset") is not None:
+                    offset = int(chunk_entry["offset"])
+                return FileSliceResponse(
+                    local_source_path,
+                    offset=offset,
+                    length=size,
+                    stat_result=stat_result,
+                    etag=normalize_chunk_hash(chunk_entry.get("hash") if chunk_entry else None),
+                )
+
+    if not source_path:
+        raise HTTPException(
+            status_code=502,
+            detail=(
+                "Chunk source unavailable "
+                f"(game_id={game_id}, file_id={file_id}, chunk_index={chunk_index})"
+            ),
+        )
+
+    chunk_entry = manifest_index.find_chunk(file_entry, chunk_index)
+    # Content-defined chunks carry their own offset; the range fallback needs it too.
+    chunk_offset: Optional[int] = None
+    if chunk_entry and chunk_entry.get("offset") is not None:
+        chunk_offset = int(chunk_entry["offset"])
+    chunk_hash: Optional[str] = None
+    if chunk_disk_cache.enabled:
+        chunk_hash = normalize_chunk_hash(chunk_entry.get("hash") if chunk_entry else None)
+    writer: Optional[ChunkCacheWriter] = None
+    flight: Optional[ChunkFlight] = None
+    if chunk_hash:
+        if not chunk_disk_cache.loaded:
+            await run_in_threadpool(chunk_disk_cache.warm)
+        cached_path = chunk_disk_cache.lookup(chunk_hash, size)
+        if cached_path is not None:
+            return _cached_chunk_response(cached_path, chunk_hash)
+        if MANIFEST_SOURCE_DIR:
+            # Identical bytes may already be on disk under another game's build.
+            shared = await run_in_threadpool(_shared_chunk_source, db, chunk_hash, size)
+            if shared is not None:
+                shared_path, shared_offset, stat_result = shared
+                return FileSliceResponse(
+                    shared_path,
+                    offset=shared_offset,
+                    length=size,
+                    stat_result=stat_result,
+                    etag=chunk_hash,
+                    headers={"X-Chunk-Source": "dedup"},
+                )
+        # Another request, here or in another worker, may already be fetching these bytes.
+        flight, cached_path = await chunk_disk_cache.claim(chunk_hash, size, timeout=max(1, HF_TIMEOUT_SECONDS))
+        if cached_path is not None:
+            return _cached_chunk_response(cached_path, chunk_hash)
+        if flight is not None:
+            writer = chunk_disk_cache.open_writer(chunk_hash, size)
+
+    streaming = False
+    try:
+        if HF_PROXY_MODE == "async":
+            stream = await huggingface_fetcher.open_chunk_stream(
+                game_id=game_id,
+                slug=manifest_index.slug,
+                file_id=file_id,
+                file_path=source_path,
+                chunk_index=chunk_index,
+                size=size,
+                chunk_size=manifest_index.chunk_size,
+                offset=chunk_offset,
+            )
+            if stream is not None:
+                streaming = True
+                return StreamingResponse(
+                    _tee_async(stream.iter_bytes(), writer, flight),
+                    media_type="application/octet-stream",
+                    headers=stream.headers,
+                    background=BackgroundTask(_after_response, flight, stream.aclose),
+                )
+        else:
+            response = await run_in_threadpool(
+                huggingface_fetcher.get_chunk_response,
                 game_id=game_id,
-                slug=slug,
+                slug=manifest_index.slug,
                 file_id=file_id,
                 file_path=source_path,
                 chunk_index=chunk_index,
                 size=size,
-                chunk_size=chunk_size,
+                chunk_size=manifest_index.chunk_size,
+                offset=chunk_offset,
             )
-        except HuggingFaceChunkError as exc:
-            raise HTTPException(status_code=502, detail=str(exc)) from exc
-
-        if response is not None:
-            def hf_stream():
-                try:
-                    for block in response.iter_content(chunk_size=65536):
-                        if block:
-                            yield block
-                finally:
-                    response.close()
-
-            headers = {}
-            if response.headers.get("Content-Length"):
-                headers["Content-Length"] = response.headers["Content-Length"]
-            return StreamingResponse(hf_stream(), media_type="application/octet-stream", headers=headers)
+            if response is not None:
+                headers = {}
+                if response.headers.get("Content-Length"):
+                    headers["Content-Length"] = response.headers["Content-Length"]
+                streaming = True
+                return StreamingResponse(
+                    _tee_sync(response, writer, flight),
+                    media_type="application/octet-stream",
+                    headers=headers,
+                    background=BackgroundTask(_after_response, flight, partial(run_in_threadpool, response.close)),
+                )
+    except HuggingFaceChunkError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+    finally:
+        if not streaming:
+            if writer is not None:
+                writer.abort()
+            if flight is not None:
+                flight.end(False)
 
     raise HTTPException(
         status_code=502,
@@ -1,65 +1,129 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Optional
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
 
-from ..core.config import SECRET_KEY, ALGORITHM, ADMIN_API_KEY
+from ..core.config import ADMIN_API_KEY
 from ..core.cache import cache_client
 from ..db import get_db
+from ..middleware.auth import decode_request_token
+from ..services.user_identity_cache import user_identity_cache
 from ..models import User
 from ..utils.admin import is_admin_identity
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+# Only reads may be served from the identity cache; writes always see the current row.
+_CACHEABLE_METHODS = {"GET", "HEAD"}
+
+
+@dataclass(frozen=True)
+class AuthClaims:
+    user_id: str
+    token: str
+    claims: dict[str, Any]
+
+
+def _session_matches(user_id: str, token: str) -> bool:
+    if user_identity_cache.session_token(user_id) == token:
+        return True
+    session_token = cache_client.get_session(user_id)
+    return not (session_token and session_token != token)
+
+
+def _resolve_user(connection: HTTPConnection, db: Session, user_id: str, token: str) -> Optional[User]:
+    if connection.scope.get("method") in _CACHEABLE_METHODS:
+        cached = user_identity_cache.attach(db, user_id, token)
+        if cached is not None:
+            return cached
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        user_identity_cache.put(user, token)
+    return user
 
 
 def get_current_user(
+    connection: HTTPConnection,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        token_type = payload.get("type")
-        if token_type not in (None, "access"):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    except JWTError as exc:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    payload = decode_request_token(connection.scope, token)
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    token_type = payload.get("type")
+    if token_type not in (None, "access"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    session_token = cache_client.get_session(user_id)
-    if session_token and session_token != token:
+    if not _session_matches(user_id, token):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _resolve_user(connection, db, user_id, token)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
 
 def get_current_user_optional(
+    connection: HTTPConnection,
     token: str = Depends(oauth2_scheme_optional),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     if not token:
         return None
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        token_type = payload.get("type")
-        if token_type not in (None, "access"):
-            return None
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
+    payload = decode_request_token(connection.scope, token)
+    if payload is None:
         return None
-    session_token = cache_client.get_session(user_id)
-    if session_token and session_token != token:
+    token_type = payload.get("type")
+    if token_type not in (None, "access"):
+        return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    if not _session_matches(user_id, token):
         return None
 
-    return db.query(User).filter(User.id == user_id).first()
+    return _resolve_user(connection, db, user_id, token)
+
+
+def _user_is_active(db: Session, user_id: str, token: str) -> bool:
+    user = user_identity_cache.get(user_id, token)
+    if user is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return False
+        user_identity_cache.put(user, token)
+    return user.is_active is not False
+
+
+def get_current_claims(
+    connection: HTTPConnection,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> AuthClaims:
+    """
+    Authenticated user id from the access token and session. That the user
+    still exists and is active comes from the identity cache, so a warm
+    request does not query the database. For routes that only need
+    `current_user.id`.
+    """
+    payload = decode_request_token(connection.scope, token)
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if payload.get("type") not in (None, "access"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if not _session_matches(str(user_id), token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
+    if not _user_is_active(db, str(user_id), token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return AuthClaims(user_id=str(user_id), token=token, claims=payload)
 
 
 def require_admin_user(current_user: User = Depends(get_current_user)) -> User:
@@ -127,10 +127,10 @@ def _update_version_override(app_id: str, version: Optional[str]) -> dict:
         cleaned[slug] = version
     else:
         cleaned.pop(slug, None)
-    cache_client.delete(f"manifest:{slug}")
-    cache_client.delete(f"manifest:{slug}:latest")
+    stale_keys = [f"manifest:{slug}", f"manifest:{slug}:latest"]
     if version:
-        cache_client.delete(f"manifest:{slug}:{version}")
+        stale_keys.append(f"manifest:{slug}:{version}")
+    cache_client.delete_many(stale_keys)
     return cleaned
 
 
@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models import DownloadTask, Game, User
-from ..routes.deps import get_current_user
+from ..routes.deps import AuthClaims, get_current_claims, get_current_user
 from ..services.download_options import build_download_options
 from ..services.steam_catalog import get_catalog_page, get_steam_detail, get_steam_summary
 from ..services.v2_runtime import runtime_v2
@@ -276,17 +276,17 @@ def control_download_session_v2(
 def get_download_session_state_v2(
     session_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    claims: AuthClaims = Depends(get_current_claims),
 ):
     session = runtime_v2.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Download session not found")
-    if session.get("user_id") and session["user_id"] != current_user.id:
+    if session.get("user_id") and session["user_id"] != claims.user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
     task = (
         db.query(DownloadTask)
-        .filter(DownloadTask.id == session["download_id"], DownloadTask.user_id == current_user.id)
+        .filter(DownloadTask.id == session["download_id"], DownloadTask.user_id == claims.user_id)
         .first()
     )
     if task and task.status == "completed":
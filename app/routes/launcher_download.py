@@ -7,7 +7,6 @@ from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from pydantic import BaseModel
 from pathlib import Path
 import os
-import hashlib
 import re
 import zipfile
 import json
@@ -20,6 +19,7 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models import LauncherArtifactRecord
+from ..services.file_hashing import sha256_file
 
 router = APIRouter()
 
@@ -83,11 +83,7 @@ class LauncherArtifactPublishIn(BaseModel):
 
 def get_file_hash(filepath: Path) -> str:
     """Calculate SHA256 hash of file"""
-    sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+    return sha256_file(filepath)
 
 
 def find_installer_file() -> Path | None:
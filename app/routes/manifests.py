@@ -15,6 +15,7 @@ from ..services.download_source_policy import (
     is_vip_identity,
 )
 from ..services.manifest import build_manifest
+from ..services.manifest_index import manifest_index_cache
 from ..core.cache import cache_client
 from ..core.config import MANIFEST_REMOTE_ONLY
 from ..services.remote_game_data import get_manifest_from_server
@@ -116,6 +117,17 @@ def _with_source_policy(
             source_policy["requested_method"] = method
     return rewritten
 
+
+def _cache_manifest(manifest: dict, cache_key: str, slug: str, game_id: Optional[str]) -> None:
+    keys = [cache_key, f"manifest:{slug}"]
+    if game_id:
+        keys.append(f"manifest:{game_id}")
+    cache_client.set_many_json(
+        {key: manifest for key in keys},
+        ttl=_MANIFEST_CACHE_TTL_SECONDS,
+    )
+
+
 @router.get("/{slug}")
 def get_manifest(
     slug: str,
@@ -137,12 +149,13 @@ def get_manifest(
                 )
             return _with_source_policy(cached, current_user=current_user, method=method)
         # Drop stale/incompatible cache payloads from older builds.
-        cache_client.delete(cache_key)
-        cache_client.delete(f"manifest:{slug}")
+        stale_keys = [cache_key, f"manifest:{slug}"]
         if isinstance(cached, dict):
             cached_game_id = cached.get("game_id")
             if cached_game_id:
-                cache_client.delete(f"manifest:{cached_game_id}")
+                stale_keys.append(f"manifest:{cached_game_id}")
+                manifest_index_cache.invalidate(str(cached_game_id))
+        cache_client.delete_many(stale_keys)
 
     if MANIFEST_REMOTE_ONLY:
         remote_manifest = get_manifest_from_server(slug)
@@ -152,19 +165,7 @@ def get_manifest(
                 remote_manifest = get_manifest_from_server(game.id)
         if remote_manifest is None:
             raise HTTPException(status_code=503, detail="Manifest unavailable from remote server")
-        cache_client.set_json(cache_key, remote_manifest, ttl=_MANIFEST_CACHE_TTL_SECONDS)
-        cache_client.set_json(
-            f"manifest:{slug}",
-            remote_manifest,
-            ttl=_MANIFEST_CACHE_TTL_SECONDS,
-        )
-        game_id = remote_manifest.get("game_id")
-        if game_id:
-            cache_client.set_json(
-                f"manifest:{game_id}",
-                remote_manifest,
-                ttl=_MANIFEST_CACHE_TTL_SECONDS,
-            )
+        _cache_manifest(remote_manifest, cache_key, slug, remote_manifest.get("game_id"))
         return _with_source_policy(remote_manifest, current_user=current_user, method=method)
 
     # Fallback to database
@@ -172,15 +173,5 @@ def get_manifest(
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     manifest = build_manifest(game)
-    cache_client.set_json(cache_key, manifest, ttl=_MANIFEST_CACHE_TTL_SECONDS)
-    cache_client.set_json(
-        f"manifest:{slug}",
-        manifest,
-        ttl=_MANIFEST_CACHE_TTL_SECONDS,
-    )
-    cache_client.set_json(
-        f"manifest:{game.id}",
-        manifest,
-        ttl=_MANIFEST_CACHE_TTL_SECONDS,
-    )
+    _cache_manifest(manifest, cache_key, slug, game.id)
     return _with_source_policy(manifest, current_user=current_user, method=method)
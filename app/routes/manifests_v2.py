@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models import Game
-from ..services.manifest import build_manifest
+from ..services.manifest import build_manifest, get_manifest_build_progress
 from ..services.v2_runtime import _stable_sha256
 
 router = APIRouter(prefix="/v2/manifests", tags=["v2-manifests"])
@@ -30,6 +30,12 @@ class ManifestV2Out(BaseModel):
     manifest: dict
 
 
+@router.get("/{slug}/build-progress")
+def get_manifest_build_progress_v2(slug: str) -> dict:
+    progress = get_manifest_build_progress(slug)
+    return {"slug": slug, "building": progress is not None, "progress": progress}
+
+
 @router.get("/{slug}", response_model=ManifestV2Out)
 def get_manifest_v2(
     slug: str,
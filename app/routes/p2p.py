@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from ..db import get_db
 from ..models import P2PPeer, User
-from ..routes.deps import get_current_user
+from ..routes.deps import AuthClaims, get_current_claims, get_current_user
 from ..schemas import (
     P2PPeerHeartbeatIn,
     P2PPeerHeartbeatOut,
@@ -82,12 +82,12 @@ def register_peer(
 def peer_heartbeat(
     payload: P2PPeerHeartbeatIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    claims: AuthClaims = Depends(get_current_claims),
 ):
     now = datetime.utcnow()
     peer = (
         db.query(P2PPeer)
-        .filter(P2PPeer.id == payload.peer_id, P2PPeer.user_id == current_user.id)
+        .filter(P2PPeer.id == payload.peer_id, P2PPeer.user_id == claims.user_id)
         .first()
     )
     if not peer:
@@ -113,11 +113,11 @@ def list_online_peers(
     game_id: Optional[str] = Query(default=None),
     peer_id: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    claims: AuthClaims = Depends(get_current_claims),
 ):
     # game_id is reserved for future filtering and peer availability indexing.
     _ = game_id
-    _ = current_user
+    _ = claims
     cutoff = datetime.utcnow() - timedelta(seconds=DEFAULT_ONLINE_TTL_S)
     query = db.query(P2PPeer).filter(
         P2PPeer.share_enabled.is_(True),
@@ -4,7 +4,6 @@ Game Properties API - Steam-level operations for install, verify, move, cloud sy
 
 from __future__ import annotations
 
-import hashlib
 import json
 import os
 import re
@@ -23,6 +22,8 @@ from sqlalchemy.orm import Session
 from ..db import Base, engine, get_db
 from ..models import SaveSyncEvent, SaveSyncState, User
 from ..routes.deps import get_current_user, get_current_user_optional
+from ..services.file_hashing import sha256_file
+from ..services.install_digest_cache import InstallDigestCache, load_install_digest_cache
 from ..services.steam_catalog import get_steam_summary
 from ..services.steam_extended import get_steam_dlc
 
@@ -152,17 +153,6 @@ def _normalize_name(value: str) -> str:
     return " ".join(_NAME_CLEAN.sub(" ", (value or "").lower()).split())
 
 
-def _sha256_file(path: Path) -> str:
-    hasher = hashlib.sha256()
-    with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(1024 * 1024)
-            if not chunk:
-                break
-            hasher.update(chunk)
-    return hasher.hexdigest()
-
-
 def _find_steam_libraries() -> list[str]:
     candidates: list[str] = []
     steam_root_candidates = [
@@ -366,6 +356,7 @@ def _verify_expected_hashes(
     install_path: Path,
     expected_hashes: dict[str, str],
     max_mismatches: int,
+    digest_cache: InstallDigestCache,
 ) -> list[HashMismatchOut]:
     mismatches: list[HashMismatchOut] = []
     for rel_path, expected in expected_hashes.items():
@@ -381,7 +372,7 @@ def _verify_expected_hashes(
             )
         elif file_path.is_file():
             try:
-                actual = _sha256_file(file_path).lower()
+                actual = digest_cache.digest(file_path, "sha256", sha256_file).lower()
             except OSError:
                 mismatches.append(
                     HashMismatchOut(
@@ -471,7 +462,7 @@ def _build_local_save_snapshot(locations: list[Path]) -> dict[str, dict]:
                     snapshot[rel] = {
                         "size": int(stat.st_size),
                         "mtime": float(stat.st_mtime),
-                        "hash": _sha256_file(file_path),
+                        "hash": sha256_file(file_path),
                     }
                 except OSError:
                     continue
@@ -525,10 +516,11 @@ def verify_game(app_id: str, payload: VerifyRequest):
 
     total, readable, corrupted = _count_and_verify_readable(install_path)
     mismatches: list[HashMismatchOut] = []
+    digest_cache = load_install_digest_cache(install_path)
 
     expected_hashes = _read_checksums_manifest(install_path)
     if expected_hashes:
-        mismatches = _verify_expected_hashes(install_path, expected_hashes, payload.max_mismatches)
+        mismatches = _verify_expected_hashes(install_path, expected_hashes, payload.max_mismatches, digest_cache)
     else:
         resolved_version, manifest_payload = _load_chunk_manifest_payload(app_id, payload.manifest_version)
         if manifest_payload:
@@ -541,9 +533,12 @@ def verify_game(app_id: str, payload: VerifyRequest):
                 if path and digest:
                     chunk_hashes[path] = digest
             if chunk_hashes:
-                mismatches = _verify_expected_hashes(install_path, chunk_hashes, payload.max_mismatches)
+                mismatches = _verify_expected_hashes(
+                    install_path, chunk_hashes, payload.max_mismatches, digest_cache
+                )
             if resolved_version and not payload.manifest_version:
                 payload.manifest_version = resolved_version
+    digest_cache.save()
 
     missing_files = sum(1 for entry in mismatches if entry.reason == "missing")
     corrupted_files = corrupted + sum(1 for entry in mismatches if entry.reason in {"hash_mismatch", "unreadable"})
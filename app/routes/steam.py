@@ -1,6 +1,4 @@
 import logging
-from contextlib import nullcontext
-from threading import Lock
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -10,6 +8,7 @@ from ..core.config import (
     AI_SEARCH_DEFAULT_MODE,
     GLOBAL_INDEX_V1,
     STEAM_CATALOG_CACHE_TTL_SECONDS,
+    STEAM_CATALOG_STALE_SECONDS,
 )
 from ..db import get_db
 from ..models import User
@@ -47,9 +46,11 @@ from ..services.steam_extended import (
     get_steam_player_count,
     get_steam_reviews_summary,
 )
+from ..services.steam_game_extended import CACHE_PREFIX as EXTENDED_CACHE_PREFIX, get_game_extended
 from ..services.steam_news_enhanced import fetch_news_enhanced
 from ..core.config import STEAM_NEWS_MAX_COUNT
 from ..core.cache import cache_client
+from ..core.single_flight import single_flight
 from .deps import get_current_user_optional
 
 logger = logging.getLogger(__name__)
@@ -85,12 +86,10 @@ _LOCALIZED_DETAIL_FIELDS = (
     "dlc_count",
 )
 
-_CATALOG_SEARCH_ROUTE_CACHE_VERSION = 1
+_CATALOG_SEARCH_ROUTE_CACHE_VERSION = 2
 _CATALOG_SEARCH_CACHE_WINDOW = 120
 _CATALOG_SEARCH_MAX_WINDOW = 240
 _CATALOG_PRICE_BACKFILL_MAX_FETCH = 6
-_CATALOG_ROUTE_LOCK_GUARD = Lock()
-_CATALOG_ROUTE_LOCKS: Dict[str, Lock] = {}
 
 
 def _resolve_catalog_search_window(limit: int, offset: int) -> int:
@@ -120,13 +119,50 @@ def _build_catalog_search_route_cache_key(
     )
 
 
-def _get_catalog_route_lock(key: str) -> Lock:
-    with _CATALOG_ROUTE_LOCK_GUARD:
-        lock = _CATALOG_ROUTE_LOCKS.get(key)
-        if lock is None:
-            lock = Lock()
-            _CATALOG_ROUTE_LOCKS[key] = lock
-        return lock
+def _search_catalog_items(
+    db: Session | None,
+    search: str,
+    appids: List[str],
+    limit: int,
+    offset: int,
+    sort: str | None,
+    mode: str,
+    user_id: str | None = None,
+    explain: bool = False,
+) -> tuple[List[dict], int]:
+    if mode == "lexical":
+        payload = search_catalog(search, appids, limit, offset, sort)
+    else:
+        payload = search_catalog_ai(
+            db=db,
+            query=search,
+            allowed_appids=appids,
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            mode=mode,
+            user_id=user_id,
+            explain=explain,
+        )
+    items = payload.get("items") or []
+    # If Lua-scoped lexical search misses, query global Steam store without Lua filter.
+    if not items and mode == "lexical" and offset == 0:
+        store_results = search_store(search)
+        if store_results:
+            candidate_ids = [
+                str(item.get("app_id"))
+                for item in store_results
+                if str(item.get("app_id") or "").strip().isdigit()
+            ]
+            if candidate_ids:
+                candidate_ids = candidate_ids[:limit]
+                items = get_catalog_page(candidate_ids) or store_results[:limit]
+            else:
+                items = store_results[:limit]
+            payload["total"] = max(int(payload.get("total") or 0), len(store_results))
+
+    items = _backfill_missing_prices(items, max_fetch=_resolve_price_backfill_fetch(limit))
+    return items, int(payload.get("total") or len(items))
 
 
 def _resolve_content_locale(preferred: str | None) -> str:
@@ -429,73 +465,50 @@ def catalog(
         route_cache_key: str | None = None
         if enable_route_cache:
             route_cache_key = _build_catalog_search_route_cache_key(search, effective_mode, sort, appids)
-        route_lock = _get_catalog_route_lock(route_cache_key) if route_cache_key else None
-
-        with (route_lock or nullcontext()):
-            if route_cache_key:
-                cached_payload = cache_client.get_json(route_cache_key)
-                if isinstance(cached_payload, dict):
-                    cached_items = cached_payload.get("items")
-                    if isinstance(cached_items, list):
-                        paged_items = cached_items[offset : offset + limit]
-                        paged_items = _inject_artwork(paged_items, art_mode, thumb_w)
-                        return {
-                            "total": int(cached_payload.get("total") or len(cached_items)),
-                            "offset": offset,
-                            "limit": limit,
-                            "items": paged_items,
-                        }
-
-            search_limit = _resolve_catalog_search_window(limit, offset) if enable_route_cache else limit
-            search_offset = 0 if enable_route_cache else offset
-            if effective_mode == "lexical":
-                payload = search_catalog(search, appids, search_limit, search_offset, sort)
-            else:
-                payload = search_catalog_ai(
-                    db=db,
-                    query=search,
-                    allowed_appids=appids,
-                    limit=search_limit,
-                    offset=search_offset,
-                    sort=sort,
-                    mode=effective_mode,
-                    user_id=current_user.id if current_user else None,
-                    explain=explain,
-                )
-            items = payload.get("items") or []
-            # If Lua-scoped lexical search misses, query global Steam store without Lua filter.
-            if not items and effective_mode == "lexical" and search_offset == 0:
-                store_results = search_store(search)
-                if store_results:
-                    candidate_ids = [
-                        str(item.get("app_id"))
-                        for item in store_results
-                        if str(item.get("app_id") or "").strip().isdigit()
-                    ]
-                    if candidate_ids:
-                        candidate_ids = candidate_ids[:search_limit]
-                        items = get_catalog_page(candidate_ids) or store_results[:search_limit]
-                    else:
-                        items = store_results[:search_limit]
-                    payload["total"] = max(int(payload.get("total") or 0), len(store_results))
-
-            items = _backfill_missing_prices(items, max_fetch=_resolve_price_backfill_fetch(search_limit))
-            total = int(payload.get("total") or len(items))
-            if route_cache_key:
-                cache_client.set_json(
-                    route_cache_key,
-                    {"total": total, "items": items},
-                    ttl=STEAM_CATALOG_CACHE_TTL_SECONDS,
+
+        if route_cache_key:
+            # Anonymous traffic is always lexical here, so the computation is
+            # request-independent and safe to refresh in the background.
+            search_limit = _resolve_catalog_search_window(limit, offset)
+
+            def _compute_route_payload() -> dict:
+                items, total = _search_catalog_items(
+                    None, search, appids, search_limit, 0, sort, effective_mode
                 )
-                items = items[offset : offset + limit]
-            items = _inject_artwork(items, art_mode, thumb_w)
+                return {"total": total, "items": items}
+
+            cached_payload = single_flight.fetch(
+                route_cache_key,
+                _compute_route_payload,
+                ttl=STEAM_CATALOG_CACHE_TTL_SECONDS,
+                stale_ttl=STEAM_CATALOG_STALE_SECONDS,
+            )
+            cached_items = cached_payload.get("items") or []
             return {
-                "total": total,
+                "total": int(cached_payload.get("total") or len(cached_items)),
                 "offset": offset,
                 "limit": limit,
-                "items": items,
+                "items": _inject_artwork(cached_items[offset : offset + limit], art_mode, thumb_w),
             }
 
+        items, total = _search_catalog_items(
+            db,
+            search,
+            appids,
+            limit,
+            offset,
+            sort,
+            effective_mode,
+            user_id=current_user.id if current_user else None,
+            explain=explain,
+        )
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": _inject_artwork(items, art_mode, thumb_w),
+        }
+
     page_ids = appids[offset : offset + limit]
     items = get_catalog_page(page_ids)
     items = _backfill_missing_prices(items, max_fetch=_resolve_price_backfill_fetch(limit))
@@ -644,98 +657,7 @@ def game_extended(
     news_all: bool = Query(False),
 ):
     """Get all extended data for a Steam game (DLC, achievements, news, players, reviews)"""
-    from concurrent.futures import ThreadPoolExecutor, TimeoutError
-    from ..core.cache import cache_client
-    
-    DLC_TIMEOUT_SECONDS = 25
-    
-    # Check if we have cached the entire response
-    cache_key = f"steam:game:extended:v5:{app_id}:{news_count}:{int(news_all)}"
-    cached_response = cache_client.get_json(cache_key)
-    if cached_response is not None:
-        return cached_response
-    
-    # Wrap functions with timeouts
-    def safe_call(func, *args, **kwargs):
-        try:
-            result = func(*args, **kwargs)
-            return result
-        except Exception as e:
-            logger.error(f"Error in {func.__name__}: {e}")
-            return None
-    
-    # Use thread pool to fetch data in parallel
-    dlc_result = None
-    achievements_result = None
-    news_result = None
-    player_count_result = None
-    reviews_result = None
-    
-    try:
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            # Submit all tasks
-            dlc_future = executor.submit(safe_call, get_steam_dlc, app_id)
-            ach_future = executor.submit(safe_call, get_steam_achievements, app_id)
-            resolved_news_count = 0 if news_all else news_count
-            news_future = executor.submit(safe_call, fetch_news_enhanced, app_id, resolved_news_count)
-            player_future = executor.submit(safe_call, get_steam_player_count, app_id)
-            review_future = executor.submit(safe_call, get_steam_reviews_summary, app_id)
-            
-            # Get results with timeout
-            try:
-                dlc_result = dlc_future.result(timeout=DLC_TIMEOUT_SECONDS)
-            except TimeoutError:
-                logger.warning(f"DLC fetch timeout for {app_id}")
-                
-            try:
-                achievements_result = ach_future.result(timeout=10)
-            except TimeoutError:
-                logger.warning(f"Achievements fetch timeout for {app_id}")
-                
-            try:
-                news_result = news_future.result(timeout=10)
-            except TimeoutError:
-                logger.warning(f"News fetch timeout for {app_id}")
-                
-            try:
-                player_count_result = player_future.result(timeout=5)
-            except TimeoutError:
-                logger.warning(f"Player count fetch timeout for {app_id}")
-                
-            try:
-                reviews_result = review_future.result(timeout=10)
-            except TimeoutError:
-                logger.warning(f"Reviews fetch timeout for {app_id}")
-                
-    except Exception as e:
-        logger.error(f"ThreadPoolExecutor error: {e}")
-
-    # Build response with fallbacks
-    dlc = dlc_result or []
-    achievements = achievements_result or []
-    news = news_result or []
-    player_count = player_count_result
-    reviews = reviews_result or {
-        "total_positive": 0,
-        "total_negative": 0,
-        "total_reviews": 0,
-        "review_score": 0,
-        "review_score_desc": "No reviews",
-    }
-
-    response = {
-        "app_id": app_id,
-        "dlc": {"items": dlc, "total": len(dlc)},
-        "achievements": {"items": achievements, "total": len(achievements)},
-        "news": {"items": news, "total": len(news)},
-        "player_count": player_count,
-        "reviews": reviews,
-    }
-    
-    # Cache the entire response for 5 minutes
-    cache_client.set_json(cache_key, response, ttl=300)
-    
-    return response
+    return get_game_extended(app_id, 0 if news_all else news_count)
 
 
 @router.post("/games/{app_id}/cache/clear")
@@ -749,6 +671,7 @@ def clear_game_cache(app_id: str):
         f"steam:game:extended:v3:{app_id}:",
         f"steam:game:extended:v4:{app_id}:",
         f"steam:game:extended:v5:{app_id}:",
+        f"{EXTENDED_CACHE_PREFIX}:{app_id}:",
     ]
     exact_keys = [
         f"steam:players:{app_id}",
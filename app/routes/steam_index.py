@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..db import get_db
@@ -31,6 +31,8 @@ from ..services.steam_extended import (
     get_steam_reviews_summary,
 )
 from ..services.steam_global_index import (
+    decode_catalog_cursor,
+    encode_catalog_cursor,
     get_catalog_coverage,
     get_ingest_status,
     get_title_classification,
@@ -38,7 +40,7 @@ from ..services.steam_global_index import (
     enforce_catalog_completeness,
     ingest_full_catalog,
     ingest_global_catalog,
-    list_catalog,
+    list_catalog_page,
     list_top_ranked,
     prefetch_assets,
     prefetch_assets_force_visible,
@@ -146,17 +148,22 @@ def steam_index_catalog(
     offset: int = Query(0, ge=0),
     sort: str | None = Query(None),
     scope: str = Query("all", pattern="^(all|library|owned)$"),
+    cursor: str | None = Query(None),
     db: Session = Depends(get_db),
 ):
     library_appids = get_lua_appids() if scope in {"library", "owned"} else None
-    total, items = list_catalog(
-        db=db,
-        limit=limit,
-        offset=offset,
-        sort=sort,
-        scope=scope,
-        library_appids=library_appids,
-    )
+    try:
+        total, items, next_cursor = list_catalog_page(
+            db,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            sort=sort,
+            scope=scope,
+            library_appids=library_appids,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     if total <= 0:
         # Fallback before first ingest: keep endpoint useful by serving legacy
         # catalog data from Lua-backed appids.
@@ -166,11 +173,13 @@ def steam_index_catalog(
         page_ids = fallback_ids[offset : offset + limit]
         items = get_catalog_page(page_ids) if page_ids else []
         total = len(fallback_ids)
+        next_cursor = None
     return {
         "total": total,
         "offset": offset,
         "limit": limit,
         "items": items,
+        "next_cursor": next_cursor,
     }
 
 
@@ -183,6 +192,7 @@ def steam_index_search(
     include_dlc: str | None = Query(None),
     ranking_mode: str | None = Query(None),
     must_have_artwork: str | bool | None = Query(False),
+    cursor: str | None = Query(None),
     db: Session = Depends(get_db),
 ):
     include_dlc_flag = (
@@ -192,6 +202,17 @@ def steam_index_search(
     )
     ranking_mode_value = _normalize_ranking_mode(ranking_mode)
     must_have_artwork_flag = _parse_boolish(must_have_artwork, False)
+    # The offset a cursor carries is only meaningful for the same result set.
+    cursor_kind = (
+        f"search:{q.strip().lower()}:{include_dlc_flag}:{ranking_mode_value}:"
+        f"{int(must_have_artwork_flag)}"
+    )
+    try:
+        cursor_state = decode_catalog_cursor(cursor, cursor_kind)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if cursor_state:
+        offset = int(cursor_state["o"])
 
     total, items = search_catalog(
         db=db,
@@ -217,11 +238,17 @@ def steam_index_search(
         else:
             total = 0
             items = []
+    next_cursor = (
+        encode_catalog_cursor(cursor_kind, offset + len(items))
+        if items and offset + len(items) < total
+        else None
+    )
     return {
         "total": total,
         "offset": offset,
         "limit": limit,
         "items": items,
+        "next_cursor": next_cursor,
     }
 
 
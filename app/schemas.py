@@ -240,6 +240,7 @@ class SteamCatalogOut(BaseModel):
     offset: int
     limit: int
     items: List[SteamCatalogItemOut]
+    next_cursor: Optional[str] = None
 
 
 class SteamIndexAssetOut(BaseModel):
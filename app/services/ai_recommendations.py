@@ -1,21 +1,20 @@
 from __future__ import annotations
 
 from collections import Counter
-from typing import Optional
+from typing import Mapping, Optional
 
 from sqlalchemy.orm import Session
 
 from ..models import (
     Game,
-    GameEmbedding,
     LibraryEntry,
     RecommendationFeedback,
     RecommendationImpression,
     SearchInteraction,
 )
-from .ai_gateway import cosine_similarity, hash_embedding
-from .steam_catalog import get_catalog_page, get_hot_appids, get_lua_appids
-from .vector_store import sync_vector_column
+from .embedding_store import embedding_store
+from .priority_index import get_priority_index
+from .steam_catalog import get_catalog_page, get_lua_appids
 
 _POSITIVE_FEEDBACK = {"click", "play", "install", "open", "liked", "favorite"}
 _NEGATIVE_FEEDBACK = {"skip", "dismiss", "dislike", "hide"}
@@ -83,12 +82,11 @@ def create_recommendation_feedback(
     return row
 
 
-def _hot_rank() -> dict[str, int]:
-    hot_ids = get_hot_appids()
-    return {app_id: index for index, app_id in enumerate(hot_ids)}
+def _hot_rank() -> Mapping[str, int]:
+    return get_priority_index().hot_ranks
 
 
-def _popularity_score(app_id: str, rank_map: dict[str, int]) -> float:
+def _popularity_score(app_id: str, rank_map: Mapping[str, int]) -> float:
     if not rank_map:
         return 0.0
     if app_id not in rank_map:
@@ -166,53 +164,6 @@ def _load_recent_search_apps(db: Session, user_id: Optional[str]) -> Counter:
     return counter
 
 
-def _embedding_for_app(
-    db: Session,
-    app_id: str,
-    *,
-    fallback_text: str = "",
-    dimension: int = 128,
-) -> list[float]:
-    model_name = f"hash-{dimension}"
-    row = (
-        db.query(GameEmbedding)
-        .filter(
-            GameEmbedding.app_id == app_id,
-            GameEmbedding.model == model_name,
-            GameEmbedding.source == "steam",
-        )
-        .first()
-    )
-    if row and isinstance(row.vector, list) and len(row.vector) == dimension:
-        return [float(value or 0.0) for value in row.vector]
-
-    vector = hash_embedding(fallback_text or app_id, dimension=dimension)
-    game = db.query(Game).filter(Game.slug == f"steam-{app_id}").first()
-    if row is None:
-        row = GameEmbedding(
-            game_id=game.id if game else None,
-            app_id=app_id,
-            model=model_name,
-            source="steam",
-            vector=vector,
-            dimension=dimension,
-        )
-        db.add(row)
-    else:
-        row.game_id = game.id if game else row.game_id
-        row.vector = vector
-        row.dimension = dimension
-    db.flush()
-    sync_vector_column(
-        db,
-        table_name="game_embeddings",
-        row_id=row.id,
-        vector=vector,
-        dimension=dimension,
-    )
-    return vector
-
-
 def _build_user_vector(
     db: Session,
     positive_apps: set[str],
@@ -220,9 +171,8 @@ def _build_user_vector(
 ) -> list[float]:
     if not positive_apps:
         return [0.0] * dimension
-    vectors: list[list[float]] = []
-    for app_id in positive_apps:
-        vectors.append(_embedding_for_app(db, app_id, dimension=dimension))
+    embedding_store.ensure(db, {app_id: app_id for app_id in positive_apps}, dimension)
+    vectors = embedding_store.vectors(positive_apps, dimension)
     if not vectors:
         return [0.0] * dimension
     combined = [0.0] * dimension
@@ -269,7 +219,7 @@ def recommend_v2(
 
     candidate_ids: list[str] = []
     seen: set[str] = set()
-    for app_id in get_hot_appids():
+    for app_id in get_priority_index().hot:
         if app_id in seen or app_id not in allowed_set:
             continue
         seen.add(app_id)
@@ -295,6 +245,14 @@ def recommend_v2(
     has_user_profile = bool(genre_pref or feedback_counter or search_counter or positive_apps)
     scored: list[tuple[float, dict]] = []
 
+    embedding_texts: dict[str, str] = {}
+    for item in summaries:
+        app_id = str(item.get("app_id") or "").strip()
+        if app_id and app_id not in negative_apps:
+            embedding_texts.setdefault(app_id, f"{item.get('name') or ''} {item.get('short_description') or ''}")
+    embedding_store.ensure(db, embedding_texts, dimension=128)
+    semantic_cos_map = embedding_store.similarities(user_vector, embedding_texts, dimension=128)
+
     for item in summaries:
         app_id = str(item.get("app_id") or "").strip()
         if not app_id or app_id in negative_apps:
@@ -312,13 +270,7 @@ def recommend_v2(
             100.0,
             float(search_counter.get(app_id, 0)) * 15.0 + float(feedback_counter.get(app_id, 0)) * 8.0,
         )
-        item_vector = _embedding_for_app(
-            db,
-            app_id,
-            fallback_text=f"{item.get('name') or ''} {item.get('short_description') or ''}",
-            dimension=128,
-        )
-        semantic_score = max(0.0, min(100.0, (cosine_similarity(user_vector, item_vector) + 1.0) * 50.0))
+        semantic_score = max(0.0, min(100.0, (semantic_cos_map.get(app_id, 0.0) + 1.0) * 50.0))
 
         if has_user_profile:
             total_score = (
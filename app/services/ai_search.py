@@ -2,17 +2,19 @@ from __future__ import annotations
 
 import hashlib
 from collections import Counter
-from datetime import datetime
-from typing import Optional
+from typing import Mapping, Optional
 
 from sqlalchemy.orm import Session
 
 from ..core.config import AI_SEARCH_MAX_CANDIDATES, AI_SEARCH_VECTOR_DIM
-from ..models import Game, GameEmbedding, LibraryEntry, QueryEmbeddingCache, SearchInteraction
-from .ai_gateway import cosine_similarity, hash_embedding
-from .steam_catalog import get_catalog_page, get_hot_appids, search_store
+from ..models import LibraryEntry, SearchInteraction
+from .catalog_search_engine import search_catalog_appids
+from .embedding_store import embedding_store
+from .query_embeddings import query_embedding_memo, query_usage_recorder
+from .priority_index import get_priority_index
+from .steam_catalog import get_catalog_page, search_store
 from .steam_search import normalize_text, score_candidate, search_catalog
-from .vector_store import semantic_search_game_embeddings, sync_vector_column
+from .vector_store import semantic_search_game_embeddings
 
 _SUPPORTED_MODES = {"lexical", "hybrid", "semantic"}
 
@@ -29,39 +31,11 @@ def _query_hash(query: str, model: str) -> str:
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
-def _resolve_query_embedding(db: Session, query: str, dimension: int) -> list[float]:
+def _resolve_query_embedding(query: str, dimension: int) -> list[float]:
     model_name = f"hash-{dimension}"
-    query_hash = _query_hash(query, model_name)
-    row = db.query(QueryEmbeddingCache).filter(QueryEmbeddingCache.query_hash == query_hash).first()
-    if row and isinstance(row.vector, list) and len(row.vector) == dimension:
-        row.last_used_at = datetime.utcnow()
-        db.flush()
-        return [float(value or 0.0) for value in row.vector]
-
-    vector = hash_embedding(query, dimension=dimension)
-    if row is None:
-        row = QueryEmbeddingCache(
-            query_hash=query_hash,
-            query_text=query,
-            model=model_name,
-            vector=vector,
-            dimension=dimension,
-        )
-        db.add(row)
-    else:
-        row.query_text = query
-        row.model = model_name
-        row.vector = vector
-        row.dimension = dimension
-    db.flush()
-    sync_vector_column(
-        db,
-        table_name="query_embedding_cache",
-        row_id=row.id,
-        vector=vector,
-        dimension=dimension,
-    )
-    return vector
+    # Usage is persisted in the background; searches never write on this path.
+    query_usage_recorder.record(_query_hash(query, model_name), query, model_name, dimension)
+    return query_embedding_memo.get(query, dimension)
 
 
 def _build_game_text(item: dict) -> str:
@@ -78,52 +52,6 @@ def _build_game_text(item: dict) -> str:
     ).strip()
 
 
-def _resolve_game_embedding(db: Session, item: dict, dimension: int) -> list[float]:
-    app_id = str(item.get("app_id") or "").strip()
-    if not app_id:
-        return [0.0] * dimension
-
-    model_name = f"hash-{dimension}"
-    row = (
-        db.query(GameEmbedding)
-        .filter(
-            GameEmbedding.app_id == app_id,
-            GameEmbedding.model == model_name,
-            GameEmbedding.source == "steam",
-        )
-        .first()
-    )
-    if row and isinstance(row.vector, list) and len(row.vector) == dimension:
-        return [float(value or 0.0) for value in row.vector]
-
-    text = _build_game_text(item)
-    vector = hash_embedding(text, dimension=dimension)
-    game = db.query(Game).filter(Game.slug == f"steam-{app_id}").first()
-    if row is None:
-        row = GameEmbedding(
-            game_id=game.id if game else None,
-            app_id=app_id,
-            model=model_name,
-            source="steam",
-            vector=vector,
-            dimension=dimension,
-        )
-        db.add(row)
-    else:
-        row.game_id = game.id if game else row.game_id
-        row.vector = vector
-        row.dimension = dimension
-    db.flush()
-    sync_vector_column(
-        db,
-        table_name="game_embeddings",
-        row_id=row.id,
-        vector=vector,
-        dimension=dimension,
-    )
-    return vector
-
-
 def _build_user_label_preferences(db: Session, user_id: Optional[str]) -> Counter:
     if not user_id:
         return Counter()
@@ -176,7 +104,7 @@ def _personalization_score(item: dict, label_pref: Counter, app_pref: Counter) -
     return min(100.0, score)
 
 
-def _popularity_score(app_id: str, hot_rank: dict[str, int], hot_count: int) -> float:
+def _popularity_score(app_id: str, hot_rank: Mapping[str, int], hot_count: int) -> float:
     if hot_count <= 0:
         return 0.0
     if app_id not in hot_rank:
@@ -228,34 +156,38 @@ def search_catalog_ai(
     lexical_payload = search_catalog(query, allowed_appids, candidate_limit, 0, sort)
     lexical_candidates = list(lexical_payload.get("items") or [])
 
-    # If lexical candidates are sparse, include extra candidates from store search.
+    # If lexical candidates are sparse, include extra candidates from the in-process
+    # catalog engine, or from store search while the engine is not built yet.
     if len(lexical_candidates) < 24:
         allowed_set = set(allowed_appids)
         extra_items: dict[str, dict] = {}
-        for item in search_store(query):
-            app_id = str(item.get("app_id") or "").strip()
-            if app_id and app_id in allowed_set:
-                extra_items[app_id] = item
-            if len(extra_items) >= 120:
-                break
-        if extra_items:
-            details = get_catalog_page(list(extra_items.keys()))
-            for detail in details:
+        engine_ids = search_catalog_appids(query, limit=120, allowed=allowed_set)
+        if engine_ids is None:
+            for item in search_store(query):
+                app_id = str(item.get("app_id") or "").strip()
+                if app_id and app_id in allowed_set:
+                    extra_items[app_id] = item
+                if len(extra_items) >= 120:
+                    break
+        detail_ids = engine_ids if engine_ids is not None else list(extra_items.keys())
+        if detail_ids:
+            for detail in get_catalog_page(detail_ids):
                 app_id = str(detail.get("app_id") or "").strip()
                 if app_id:
                     extra_items[app_id] = detail
+        if extra_items:
             existing = {str(item.get("app_id") or "").strip() for item in lexical_candidates}
             for app_id, item in extra_items.items():
                 if app_id not in existing:
                     lexical_candidates.append(item)
                     existing.add(app_id)
 
-    hot_ids = get_hot_appids()
-    hot_rank = {app_id: index for index, app_id in enumerate(hot_ids)}
-    hot_count = len(hot_ids)
+    priority_index = get_priority_index()
+    hot_rank = priority_index.hot_ranks
+    hot_count = len(priority_index.hot)
     dimension = max(16, int(AI_SEARCH_VECTOR_DIM or 128))
     model_name = f"hash-{dimension}"
-    query_vector = _resolve_query_embedding(db, query, dimension)
+    query_vector = _resolve_query_embedding(query, dimension)
     allowed_set = set(allowed_appids)
     semantic_hits = semantic_search_game_embeddings(
         db,
@@ -296,14 +228,23 @@ def search_catalog_ai(
     user_label_pref = _build_user_label_preferences(db, user_id)
     user_app_pref = _build_user_app_preferences(db, user_id)
 
+    embedding_texts: dict[str, str] = {}
+    for item in lexical_candidates:
+        app_id = str(item.get("app_id") or "").strip()
+        if app_id and semantic_score_map.get(app_id, 0.0) <= 0.0:
+            embedding_texts.setdefault(app_id, _build_game_text(item))
+    semantic_cos_map: dict[str, float] = {}
+    if embedding_texts:
+        embedding_store.ensure(db, embedding_texts, dimension)
+        semantic_cos_map = embedding_store.similarities(query_vector, embedding_texts, dimension)
+
     scored_items: list[tuple[float, dict]] = []
     for item in lexical_candidates:
         app_id = str(item.get("app_id") or "").strip()
         lexical_score = float(score_candidate(query, item, hot_rank))
         semantic_score = semantic_score_map.get(app_id, 0.0)
         if semantic_score <= 0.0:
-            embedding = _resolve_game_embedding(db, item, dimension)
-            semantic_cos = cosine_similarity(query_vector, embedding)
+            semantic_cos = semantic_cos_map.get(app_id, 0.0)
             semantic_score = max(0.0, min(100.0, (semantic_cos + 1.0) * 50.0))
         popularity_value = _popularity_score(app_id, hot_rank, hot_count)
         personalization_value = _personalization_score(item, user_label_pref, user_app_pref)
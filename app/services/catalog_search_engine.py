@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from .catalog_search_index import FTS_MIN_TERM_LENGTH, build_compact_name, build_name_initials
+from .steam_search import compact_text, normalize_text
+
+_PREFIX_END = "\uffff"
+_GRAM = FTS_MIN_TERM_LENGTH
+_INITIALS_MIN_LETTERS = 2
+_INITIALS_MAX_LETTERS = 8
+
+
+@dataclass(frozen=True)
+class CatalogSearchDoc:
+    app_id: str
+    normalized_name: str
+    aliases: tuple[str, ...] = ()
+    type_rank: int = 1
+    noise: int = 0
+    is_dlc: bool = False
+    updated_ts: float = 0.0
+    # Display name; the SQL path scores `lower(name)` and breaks ties on it.
+    name: str = ""
+
+
+def _prefix_bounds(keys: list[str], prefix: str) -> tuple[int, int]:
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + _PREFIX_END)
+
+
+def _grams(value: str) -> set[str]:
+    return {value[start : start + _GRAM] for start in range(len(value) - _GRAM + 1)}
+
+
+def _like_prefix(pattern: str):
+    # `LIKE 'pattern%'` for a literal pattern that may itself hold % and _.
+    parts = []
+    for char in pattern:
+        if char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.DOTALL)
+
+
+class CatalogSearchEngine:
+    """
+    Immutable, array-backed title search structure with the candidate set and
+    relevance of steam_global_index.search_catalog's SQL path. Substring terms
+    go through trigram postings (CSR form, built over names, compact names and
+    aliases) and are verified against the field, like the FTS5 / pg_trgm
+    indexes the SQL path uses; initials substrings are a bisect range over
+    every suffix of every title's initials.
+    """
+
+    def __init__(self, docs: Iterable[CatalogSearchDoc], version: int = 0) -> None:
+        ordered = sorted(docs, key=lambda doc: doc.app_id)
+        self.version = version
+        self.size = len(ordered)
+        self._app_ids = [doc.app_id for doc in ordered]
+        self._names = [doc.normalized_name for doc in ordered]
+        self._display_names = [doc.name or doc.normalized_name for doc in ordered]
+        self._lowered_names = [name.lower() for name in self._display_names]
+        self._compact_names = [build_compact_name(doc.normalized_name) for doc in ordered]
+        self._aliases = [doc.aliases for doc in ordered]
+        self._type_rank = array("b", (max(-128, min(127, int(doc.type_rank))) for doc in ordered))
+        self._noise = array("b", (1 if doc.noise else 0 for doc in ordered))
+        self._dlc = array("b", (1 if doc.is_dlc else 0 for doc in ordered))
+        self._name_length = array("H", (min(65535, len(doc.normalized_name)) for doc in ordered))
+        self._updated = array("d", (float(doc.updated_ts or 0.0) for doc in ordered))
+        self._initials = [build_name_initials(doc.normalized_name) for doc in ordered]
+
+        # Every suffix of every title's initials, so a bisect prefix range is a
+        # substring match on name_initials (what the SQL candidate filter does).
+        initials_entries: list[tuple[str, int]] = []
+        postings: dict[str, list[int]] = {}
+        for index, doc in enumerate(ordered):
+            doc_grams = _grams(doc.normalized_name) | _grams(self._compact_names[index])
+            for alias in doc.aliases:
+                doc_grams |= _grams(alias)
+            for gram in doc_grams:
+                postings.setdefault(gram, []).append(index)
+            initials = self._initials[index]
+            initials_entries.extend((initials[start:], index) for start in range(len(initials)))
+
+        initials_entries.sort()
+        self._initials_keys = [entry[0] for entry in initials_entries]
+        self._initials_docs = array("i", (entry[1] for entry in initials_entries))
+
+        self._gram_offsets: dict[str, tuple[int, int]] = {}
+        self._gram_postings = array("i")
+        for gram, gram_docs in postings.items():
+            start = len(self._gram_postings)
+            self._gram_postings.extend(gram_docs)
+            self._gram_offsets[gram] = (start, len(self._gram_postings))
+
+    def _gram_candidates(self, term: str) -> Iterable[int]:
+        # Docs holding the term's rarest trigram; callers verify the substring.
+        # A term shorter than a trigram scans every doc, like its plain ILIKE.
+        if len(term) < _GRAM:
+            return range(self.size)
+        best: Optional[tuple[int, int]] = None
+        for gram in _grams(term):
+            bounds = self._gram_offsets.get(gram)
+            if bounds is None:
+                return array("i")
+            if best is None or bounds[1] - bounds[0] < best[1] - best[0]:
+                best = bounds
+        return self._gram_postings[best[0] : best[1]]
+
+    def _candidates(self, query: str, normalized: str, compact: str, letters: str) -> set[int]:
+        matched: set[int] = set()
+        if query.isdigit():
+            start, end = _prefix_bounds(self._app_ids, query)
+            matched.update(range(start, end))
+        if normalized:
+            names = self._names
+            aliases = self._aliases
+            matched.update(
+                doc
+                for doc in self._gram_candidates(normalized)
+                if normalized in names[doc] or any(normalized in alias for alias in aliases[doc])
+            )
+        if compact:
+            compact_names = self._compact_names
+            matched.update(doc for doc in self._gram_candidates(compact) if compact in compact_names[doc])
+        if letters:
+            start, end = _prefix_bounds(self._initials_keys, letters)
+            matched.update(self._initials_docs[start:end])
+        return matched
+
+    def _relevance(
+        self,
+        doc: int,
+        query: str,
+        normalized: str,
+        compact: str,
+        name_colon: re.Pattern,
+        app_id_prefix: re.Pattern,
+        initials: Optional[re.Pattern],
+    ) -> int:
+        # The SQL relevance is a CASE, so the first condition that holds wins.
+        app_id = self._app_ids[doc]
+        name = self._names[doc]
+        if app_id == query:
+            return 900
+        if self._lowered_names[doc] == query.lower():
+            return 800
+        if name == normalized:
+            return 780
+        if name_colon.match(self._lowered_names[doc]):
+            return 760
+        if name.startswith(f"{normalized} "):
+            return 740
+        if name.startswith(normalized):
+            return 720
+        if app_id_prefix.match(app_id):
+            return 700
+        if any(normalized in alias for alias in self._aliases[doc]):
+            return 520
+        if normalized in name:
+            return 500
+        if compact and compact != normalized:
+            compact_name = self._compact_names[doc]
+            if compact_name == compact:
+                return 750
+            if compact_name.startswith(compact):
+                return 735
+            if compact in compact_name:
+                return 680
+        if initials is not None:
+            # name_initials LIKE 'g%t%a%', then LIKE '_%g%t%a%'. The digit
+            # qualified 740 / 735 conditions follow these two in the SQL CASE
+            # and can never be reached, so they are not mirrored.
+            if initials.match(self._initials[doc]):
+                return 730
+            if initials.search(self._initials[doc], 1):
+                return 720
+        return 0
+
+    def search(
+        self,
+        query: str,
+        *,
+        window: int,
+        include_dlc: Optional[bool] = None,
+        allowed: Optional[set[str]] = None,
+        priority: Optional[frozenset[str]] = None,
+        order: str = "relevance",
+    ) -> tuple[int, list[str]]:
+        """
+        Return (total matches, best `window` app_ids). Matching and ordering
+        mirror the SQL path in steam_global_index.search_catalog.
+        """
+        raw = (query or "").strip()
+        normalized = normalize_text(raw)
+        compact = compact_text(raw)
+        if not normalized and not compact:
+            return 0, []
+
+        letters = "".join(char for char in compact if char.isalpha())
+        initials = None
+        if " " not in raw and compact and _INITIALS_MIN_LETTERS <= len(letters) <= _INITIALS_MAX_LETTERS:
+            initials = re.compile(".*".join(letters), re.DOTALL)
+        else:
+            letters = ""
+
+        candidates = self._candidates(raw, normalized, compact, letters)
+        if include_dlc is False:
+            candidates = {doc for doc in candidates if not self._dlc[doc]}
+        if allowed is not None:
+            candidates = {doc for doc in candidates if self._app_ids[doc] in allowed}
+        total = len(candidates)
+        if not total or window <= 0:
+            return total, []
+
+        name_colon = _like_prefix(f"{raw.lower()}:")
+        app_id_prefix = _like_prefix(raw.lower())
+        scores = {
+            doc: self._relevance(doc, raw, normalized, compact, name_colon, app_id_prefix, initials)
+            for doc in candidates
+        }
+
+        priority_ids = priority or frozenset()
+        app_ids = self._app_ids
+        display_names = self._display_names
+
+        if order == "recent":
+            def sort_key(doc: int):
+                return (
+                    0 if app_ids[doc] in priority_ids else 1,
+                    -self._updated[doc],
+                    -scores[doc],
+                    self._type_rank[doc],
+                    self._noise[doc],
+                    self._name_length[doc],
+                    display_names[doc],
+                )
+        else:
+            def sort_key(doc: int):
+                return (
+                    0 if app_ids[doc] in priority_ids else 1,
+                    -scores[doc],
+                    self._type_rank[doc],
+                    self._noise[doc],
+                    self._name_length[doc],
+                    -self._updated[doc],
+                    display_names[doc],
+                )
+
+        ranked = heapq.nsmallest(window, scores, key=sort_key)
+        return total, [app_ids[doc] for doc in ranked]
+
+
+_ENGINE_LOCK = threading.Lock()
+_BUILD_LOCK = threading.Lock()
+_ENGINE: Optional[CatalogSearchEngine] = None
+_DOCS: dict[str, CatalogSearchDoc] = {}
+_WATERMARK: Optional[datetime] = None
+# Alias row count the docs were built from; a drop means aliases were deleted.
+_ALIAS_ROWS: Optional[int] = None
+_FULL_BUILD_AT = 0.0
+
+
+def get_catalog_search_engine() -> Optional[CatalogSearchEngine]:
+    return _ENGINE
+
+
+def catalog_search_watermark() -> Optional[datetime]:
+    return _WATERMARK
+
+
+def catalog_search_alias_rows() -> Optional[int]:
+    return _ALIAS_ROWS
+
+
+def catalog_search_full_build_age() -> float:
+    """Seconds since the engine was last rebuilt from the full title table."""
+    return time.monotonic() - _FULL_BUILD_AT if _ENGINE is not None else float("inf")
+
+
+def count_new_catalog_search_docs(app_ids: Iterable[str]) -> int:
+    """How many of `app_ids` the engine does not hold yet."""
+    return sum(1 for app_id in set(app_ids) if app_id not in _DOCS)
+
+
+def install_catalog_search_docs(
+    docs: Iterable[CatalogSearchDoc],
+    *,
+    watermark: Optional[datetime],
+    replace: bool,
+    alias_rows: Optional[int] = None,
+) -> CatalogSearchEngine:
+    """
+    Compile a new engine from `docs` and swap it in. With replace=False the docs
+    are merged over the current set so an ingest only has to reload the titles
+    it touched.
+    """
+    global _ENGINE, _WATERMARK, _ALIAS_ROWS, _FULL_BUILD_AT
+    with _BUILD_LOCK:
+        merged = {} if replace else dict(_DOCS)
+        for doc in docs:
+            merged[doc.app_id] = doc
+        version = (_ENGINE.version + 1) if _ENGINE is not None else 1
+        compiled = CatalogSearchEngine(merged.values(), version=version)
+        with _ENGINE_LOCK:
+            _DOCS.clear()
+            _DOCS.update(merged)
+            _ENGINE = compiled
+            if replace:
+                _WATERMARK = watermark
+                _FULL_BUILD_AT = time.monotonic()
+            elif watermark is not None and (_WATERMARK is None or watermark > _WATERMARK):
+                _WATERMARK = watermark
+            if alias_rows is not None:
+                _ALIAS_ROWS = alias_rows
+        return compiled
+
+
+def search_catalog_appids(
+    query: str,
+    *,
+    limit: int,
+    allowed: Optional[set[str]] = None,
+    include_dlc: Optional[bool] = None,
+) -> Optional[list[str]]:
+    """Ranked app_ids from the in-process engine, or None when it is not built yet."""
+    engine = _ENGINE
+    if engine is None or not engine.size:
+        return None
+    _, app_ids = engine.search(query, window=max(0, int(limit)), allowed=allowed, include_dlc=include_dlc)
+    return app_ids
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import column, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from ..models import SteamTitle
+
+# SQLite FTS5 tables (trigram tokenizer) mirroring the searchable title/alias columns.
+TITLE_FTS_TABLE = "steam_title_search"
+ALIAS_FTS_TABLE = "steam_title_alias_search"
+# Integer key the FTS rows point at. steam_titles/steam_title_aliases have
+# string primary keys, so their implicit rowid can be renumbered by VACUUM.
+FTS_ROWID_COLUMN = "search_rowid"
+# Trigram tokenizers cannot answer substring queries shorter than one trigram.
+FTS_MIN_TERM_LENGTH = 3
+INITIALS_MAX_LENGTH = 64
+
+# Catalog ordering buckets persisted as steam_titles.type_rank: game-like titles
+# first, tools/media last, everything unclassified in between.
+GAME_LIKE_TITLE_TYPES = ("game", "dlc", "demo", "mod")
+TOOL_LIKE_TITLE_TYPES = (
+    "application",
+    "tool",
+    "software",
+    "video",
+    "movie",
+    "hardware",
+    "driver",
+    "episode",
+    "series",
+    "guide",
+    "advertising",
+)
+TOOL_NAME_HINTS = (
+    " dedicated server",
+    " sdk",
+    " benchmark",
+    " level editor",
+    " test server",
+    " mod tools",
+)
+
+_STATUS_LOCK = threading.Lock()
+_STATUS_CACHE: dict[str, tuple[float, bool]] = {}
+_STATUS_TTL_SECONDS = 60.0
+
+
+def build_compact_name(normalized_name: Optional[str]) -> str:
+    return "".join(ch for ch in str(normalized_name or "") if ch.isalnum())
+
+
+def build_name_initials(normalized_name: Optional[str]) -> str:
+    """
+    Initials of every token of an already-normalized title. Numeric tokens are
+    kept whole so "fifa 23" indexes as "f23" and "grand theft auto 5" as "gta5".
+    """
+    parts: list[str] = []
+    for token in str(normalized_name or "").split(" "):
+        if not token:
+            continue
+        parts.append(token if token.isdigit() else token[0])
+    return "".join(parts)[:INITIALS_MAX_LENGTH]
+
+
+def build_title_search_fields(normalized_name: Optional[str]) -> tuple[str, str]:
+    return build_compact_name(normalized_name), build_name_initials(normalized_name)
+
+
+def build_title_type_rank(title_type: Optional[str], normalized_name: Optional[str]) -> int:
+    kind = str(title_type or "")
+    if kind in GAME_LIKE_TITLE_TYPES:
+        return 0
+    name = str(normalized_name or "")
+    if kind in TOOL_LIKE_TITLE_TYPES or any(hint in name for hint in TOOL_NAME_HINTS):
+        return 3
+    return 1
+
+
+def _cache_key(db: Session) -> str:
+    bind = db.get_bind()
+    url = str(getattr(bind, "url", "unknown"))
+    dialect = str(getattr(getattr(bind, "dialect", None), "name", "unknown"))
+    return f"{dialect}:{url}"
+
+
+def is_catalog_fts_ready(db: Session) -> bool:
+    bind = db.get_bind()
+    dialect = str(getattr(getattr(bind, "dialect", None), "name", "")).lower()
+    if dialect != "sqlite":
+        return False
+
+    key = _cache_key(db)
+    now = time.time()
+    with _STATUS_LOCK:
+        cached = _STATUS_CACHE.get(key)
+        if cached and (now - cached[0]) <= _STATUS_TTL_SECONDS:
+            return bool(cached[1])
+
+    ready = False
+    try:
+        rows = db.execute(
+            text(
+                "SELECT sql FROM sqlite_master "
+                "WHERE type = 'table' AND name IN (:title_table, :alias_table)"
+            ),
+            {"title_table": TITLE_FTS_TABLE, "alias_table": ALIAS_FTS_TABLE},
+        ).all()
+        # Tables still keyed by the implicit rowid are not trusted.
+        ready = len(rows) >= 2 and all(f"content_rowid='{FTS_ROWID_COLUMN}'" in str(row[0]) for row in rows)
+    except Exception:
+        ready = False
+
+    with _STATUS_LOCK:
+        _STATUS_CACHE[key] = (now, ready)
+    return ready
+
+
+def mark_catalog_search_schema_changed() -> None:
+    with _STATUS_LOCK:
+        _STATUS_CACHE.clear()
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + str(value or "").replace('"', '""') + '"'
+
+
+def fts_terms_usable(terms: Iterable[str]) -> bool:
+    return all(len(str(term or "")) >= FTS_MIN_TERM_LENGTH for term in terms)
+
+
+def fts_title_match_subquery(column_terms: dict[str, str]):
+    """
+    Select steam_titles rowids whose FTS columns contain the given substrings.
+    `column_terms` maps FTS column name -> substring; clauses are OR-ed together.
+    """
+    expression = " OR ".join(
+        f"{column_name} : {_fts_phrase(term)}"
+        for column_name, term in column_terms.items()
+        if term
+    )
+    fts_table = table(TITLE_FTS_TABLE, column("rowid"))
+    return select(fts_table.c.rowid).where(
+        text(f"{TITLE_FTS_TABLE} MATCH :title_fts_query").bindparams(title_fts_query=expression)
+    )
+
+
+def fts_alias_title_ids_subquery(term: str):
+    fts_table = table(ALIAS_FTS_TABLE, column("rowid"))
+    alias_table = table("steam_title_aliases", column(FTS_ROWID_COLUMN), column("steam_title_id"))
+    matched_rowids = select(fts_table.c.rowid).where(
+        text(f"{ALIAS_FTS_TABLE} MATCH :alias_fts_query").bindparams(
+            alias_fts_query=f"normalized_alias : {_fts_phrase(term)}"
+        )
+    )
+    return select(alias_table.c.steam_title_id).where(alias_table.c[FTS_ROWID_COLUMN].in_(matched_rowids))
+
+
+def title_rowid_column():
+    return literal_column(f"{SteamTitle.__tablename__}.{FTS_ROWID_COLUMN}")
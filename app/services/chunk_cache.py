@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from ..core.cache import cache_client
+from ..core.config import (
+    CDN_CHUNK_CACHE_DIR,
+    CDN_CHUNK_CACHE_ENABLED,
+    CDN_CHUNK_CACHE_MAX_BYTES,
+    CDN_CHUNK_FLIGHT_LOCK_SECONDS,
+)
+from ..core.file_lock import file_lock
+
+_HASH_PATTERN = re.compile(r"[0-9a-f]{32,128}")
+_PART_SUFFIX = ".part"
+_LOCK_NAME = ".evict.lock"
+# Entries hit at least this often get a second chance before eviction.
+_PROTECTED_HITS = 2
+_MAX_HITS = 15
+# Bytes a worker may add before rescanning the directory, as a share of the cap.
+_SCAN_SLACK = 0.02
+_LOW_WATERMARK = 0.9
+# Files written or hit this recently are never evicted (another worker may be serving them).
+_EVICT_GRACE_SECONDS = 60.0
+_TOUCH_INTERVAL_SECONDS = 30.0
+_STALE_PART_SECONDS = 3600.0
+_FLIGHT_PREFIX = "chunkflight:"
+_FLIGHT_LOCK_MS = max(1000, int(CDN_CHUNK_FLIGHT_LOCK_SECONDS * 1000))
+_LOCAL_TOKEN = "local"
+_POLL_INTERVAL_SECONDS = 0.25
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def normalize_chunk_hash(value: Optional[str]) -> Optional[str]:
+    candidate = str(value or "").strip().lower()
+    if ":" in candidate:
+        candidate = candidate.split(":", 1)[1]
+    return candidate if _HASH_PATTERN.fullmatch(candidate) else None
+
+
+class ChunkCacheWriter:
+    """
+    Tee target for one chunk being streamed from an origin. Write failures
+    only disable caching; the client stream is never interrupted by them.
+    """
+
+    def __init__(self, cache: "ChunkDiskCache", chunk_hash: str, expected_size: int) -> None:
+        self.cache = cache
+        self.chunk_hash = chunk_hash
+        self.expected_size = expected_size
+        self.written = 0
+        self.failed = False
+        self._digest = hashlib.sha256() if len(chunk_hash) == 64 else None
+        self._path = cache.path_for(chunk_hash)
+        self._part = self._path.with_name(f"{self._path.name}.{uuid.uuid4().hex}{_PART_SUFFIX}")
+        self._handle = None
+
+    def write(self, block: bytes) -> None:
+        if self.failed:
+            return
+        try:
+            if self._handle is None:
+                self._part.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = self._part.open("wb")
+            self._handle.write(block)
+            if self._digest is not None:
+                self._digest.update(block)
+            self.written += len(block)
+        except OSError:
+            self.abort()
+
+    def commit(self) -> bool:
+        if self.failed or self._handle is None:
+            self.abort()
+            return False
+        try:
+            self._handle.close()
+            self._handle = None
+            if self.written != self.expected_size:
+                raise ValueError("size mismatch")
+            if self._digest is not None and self._digest.hexdigest() != self.chunk_hash:
+                raise ValueError("hash mismatch")
+            os.replace(self._part, self._path)
+        except (OSError, ValueError) as exc:
+            print(f"[ChunkCache] Discarding {self.chunk_hash}: {exc}")
+            self.abort()
+            return False
+        self.cache._record(self.chunk_hash, self.written)
+        return True
+
+    def abort(self) -> None:
+        self.failed = True
+        handle, self._handle = self._handle, None
+        try:
+            if handle is not None:
+                handle.close()
+            self._part.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class ChunkFlight:
+    """
+    A leader's claim on fetching one chunk. `end` resolves it exactly once,
+    so the response can release an abandoned fetch without touching a flight
+    a later request has started for the same hash.
+    """
+
+    def __init__(self, cache: "ChunkDiskCache", chunk_hash: str) -> None:
+        self.cache = cache
+        self.chunk_hash = chunk_hash
+        self._lock = threading.Lock()
+        self._ended = False
+
+    def end(self, cached: bool) -> None:
+        with self._lock:
+            if self._ended:
+                return
+            self._ended = True
+        self.cache.end_flight(self.chunk_hash, cached)
+
+
+class ChunkDiskCache:
+    """
+    Content-addressed chunk store (<root>/<aa>/<bb>/<hash>) shared by every
+    worker on the host and capped at `max_bytes` as a whole. The directory
+    is the source of truth: a worker's index only remembers what it has seen
+    and its hit counts. Enforcement scans the directory under a lock file
+    once a worker has written `max_bytes * _SCAN_SLACK` since its last scan,
+    and evicts by file mtime, which hits refresh. Frequently hit chunks get
+    a second chance, so one-off scans do not flush the hot set. Concurrent
+    misses for one hash share a single upstream fetch: per process through
+    a future, across workers through a Redis lock.
+    """
+
+    def __init__(self, root: str, max_bytes: int, enabled: bool = True) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.enabled = bool(enabled and root and self.max_bytes > 0)
+        self._lock = threading.Lock()
+        # hash -> [size, hits, last mtime refresh (monotonic)]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._written_since_scan = 0
+        self._loaded = False
+        self._flights: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._remote_tokens: dict[str, str] = {}
+        self._remote_waiters: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._release_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-flight")
+        cache_client.add_invalidation_listener(self._on_filled)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def path_for(self, chunk_hash: str) -> Path:
+        return self.root / chunk_hash[:2] / chunk_hash[2:4] / chunk_hash
+
+    def warm(self) -> None:
+        """Index chunks already on disk and enforce the cap; call off the event loop."""
+        if self._loaded:
+            return
+        self._enforce_cap()
+        self._loaded = True
+
+    def lookup(self, chunk_hash: str, size: int) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        path = self.path_for(chunk_hash)
+        try:
+            st = path.stat()
+        except OSError:
+            self._forget(chunk_hash)
+            return None
+        if st.st_size != size:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(chunk_hash)
+            if entry is None:
+                # Written by another worker.
+                entry = self._entries[chunk_hash] = [size, 0, 0.0]
+            entry[1] = min(_MAX_HITS, entry[1] + 1)
+            self._entries.move_to_end(chunk_hash)
+            touch = now - entry[2] >= _TOUCH_INTERVAL_SECONDS
+            if touch:
+                entry[2] = now
+        if touch:
+            # The mtime is the recency every worker's eviction scan sees.
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return path
+
+    def open_writer(self, chunk_hash: str, size: int) -> Optional[ChunkCacheWriter]:
+        if not self.enabled or size > self.max_bytes:
+            return None
+        return ChunkCacheWriter(self, chunk_hash, size)
+
+    def _record(self, chunk_hash: str, size: int) -> None:
+        with self._lock:
+            self._entries.pop(chunk_hash, None)
+            self._entries[chunk_hash] = [size, 1, time.monotonic()]
+            self._written_since_scan += size
+            due = self._written_since_scan >= self.max_bytes * _SCAN_SLACK
+        if due:
+            self._enforce_cap()
+
+    def _forget(self, chunk_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(chunk_hash, None)
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        found: list[tuple[float, str, int]] = []
+        if not self.root.is_dir():
+            return found
+        stale_before = time.time() - _STALE_PART_SECONDS
+        for path in self.root.glob("*/*/*"):
+            try:
+                stat = path.stat()
+                if path.name.endswith(_PART_SUFFIX):
+                    # Other workers may still be writing their parts.
+                    if stat.st_mtime < stale_before:
+                        path.unlink(missing_ok=True)
+                    continue
+                if not _HASH_PATTERN.fullmatch(path.name):
+                    continue
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.name, stat.st_size))
+        found.sort()
+        return found
+
+    def _enforce_cap(self) -> None:
+        """Scan the shared directory and evict down to the low watermark if over the cap."""
+        with file_lock(self.root / _LOCK_NAME):
+            with self._lock:
+                self._written_since_scan = 0
+            found = self._scan()
+            total = sum(size for _, _, size in found)
+            victims: list[str] = []
+            if total > self.max_bytes:
+                target = int(self.max_bytes * _LOW_WATERMARK)
+                recent_after = time.time() - _EVICT_GRACE_SECONDS
+                with self._lock:
+                    protected = {
+                        chunk_hash
+                        for chunk_hash, entry in self._entries.items()
+                        if entry[1] >= _PROTECTED_HITS
+                    }
+                    for entry in self._entries.values():
+                        entry[1] //= 2
+                # Oldest first; chunks this worker sees hit often only go in a second pass.
+                for second_pass in (False, True):
+                    for mtime, chunk_hash, size in found:
+                        if total <= target:
+                            break
+                        if mtime >= recent_after or chunk_hash in victims:
+                            continue
+                        if chunk_hash in protected and not second_pass:
+                            continue
+                        victims.append(chunk_hash)
+                        total -= size
+                for chunk_hash in victims:
+                    try:
+                        self.path_for(chunk_hash).unlink(missing_ok=True)
+                    except OSError:
+                        pass
+        removed = set(victims)
+        with self._lock:
+            for _, chunk_hash, size in found:
+                if chunk_hash in removed:
+                    self._entries.pop(chunk_hash, None)
+                elif chunk_hash not in self._entries:
+                    self._entries[chunk_hash] = [size, 0, 0.0]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry[0] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    # --- single flight ---
+    def begin_flight(self, chunk_hash: str) -> tuple[asyncio.Future, bool]:
+        """
+        Join this process's fetch for `chunk_hash`. The leader (second value
+        True) must call end_flight() once; followers await the future, which
+        resolves to whether the chunk landed in the cache.
+        """
+        loop = asyncio.get_running_loop()
+        current = self._flights.get(chunk_hash)
+        if current is not None:
+            return current[1], False
+        future = loop.create_future()
+        self._flights[chunk_hash] = (loop, future)
+        return future, True
+
+    async def claim(self, chunk_hash: str, size: int, timeout: float) -> tuple[Optional[ChunkFlight], Optional[Path]]:
+        """
+        (flight, cached_path) for a cache miss. With a flight the caller is the
+        leader: it fetches the chunk and must end the flight. Otherwise the path
+        is the chunk another request (in this or another worker) cached
+        meanwhile, or None when it did not land in time and the caller should
+        fetch without caching. A follower that gives up only detaches; the
+        leader keeps its flight until its own response ends.
+        """
+        flight, leader = self.begin_flight(chunk_hash)
+        if not leader:
+            try:
+                landed = await asyncio.wait_for(asyncio.shield(flight), timeout=timeout)
+            except asyncio.TimeoutError:
+                landed = False
+            return None, self.lookup(chunk_hash, size) if landed else None
+
+        token = await asyncio.to_thread(self._acquire_remote, chunk_hash)
+        if token is not None:
+            if token != _LOCAL_TOKEN:
+                self._remote_tokens[chunk_hash] = token
+            return ChunkFlight(self, chunk_hash), None
+        # Another worker holds the fetch; local followers wait on this request.
+        path = await self._wait_remote(chunk_hash, size, timeout)
+        self.end_flight(chunk_hash, path is not None)
+        return None, path
+
+    def end_flight(self, chunk_hash: str, cached: bool) -> None:
+        """Resolve a flight; safe to call from worker threads."""
+        token = self._remote_tokens.pop(chunk_hash, None)
+        if token is not None:
+            self._release_executor.submit(self._release_remote, chunk_hash, token)
+        current = self._flights.get(chunk_hash)
+        if current is None:
+            return
+        loop, future = current
+
+        def _resolve() -> None:
+            if self._flights.get(chunk_hash) == current:
+                self._flights.pop(chunk_hash, None)
+            if not future.done():
+                future.set_result(bool(cached))
+
+        try:
+            loop.call_soon_threadsafe(_resolve)
+        except RuntimeError:
+            self._flights.pop(chunk_hash, None)
+
+    def _acquire_remote(self, chunk_hash: str) -> Optional[str]:
+        client = cache_client.redis
+        if client is None:
+            return _LOCAL_TOKEN
+        token = uuid.uuid4().hex
+        try:
+            if client.set(f"{_FLIGHT_PREFIX}{chunk_hash}", token, nx=True, px=_FLIGHT_LOCK_MS):
+                return token
+            return None
+        except Exception:
+            return _LOCAL_TOKEN
+
+    def _remote_active(self, chunk_hash: str) -> bool:
+        client = cache_client.redis
+        if client is None:
+            return False
+        try:
+            return bool(client.exists(f"{_FLIGHT_PREFIX}{chunk_hash}"))
+        except Exception:
+            return False
+
+    def _release_remote(self, chunk_hash: str, token: str) -> None:
+        key = f"{_FLIGHT_PREFIX}{chunk_hash}"
+        client = cache_client.redis
+        if client is not None:
+            try:
+                client.eval(_RELEASE_SCRIPT, 1, key, token)
+            except Exception:
+                pass
+        # Wakes the workers waiting in _wait_remote.
+        cache_client.invalidate_keys((key,))
+
+    def _on_filled(self, keys: list[str]) -> None:
+        for key in keys:
+            if not key.startswith(_FLIGHT_PREFIX):
+                continue
+            for loop, event in self._remote_waiters.get(key[len(_FLIGHT_PREFIX) :], ()):
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    continue
+
+    async def _wait_remote(self, chunk_hash: str, size: int, timeout: float) -> Optional[Path]:
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        self._remote_waiters.setdefault(chunk_hash, []).append(waiter)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=min(_POLL_INTERVAL_SECONDS, remaining))
+                    notified = True
+                except asyncio.TimeoutError:
+                    notified = False
+                path = self.lookup(chunk_hash, size)
+                if path is not None:
+                    return path
+                if notified or not await asyncio.to_thread(self._remote_active, chunk_hash):
+                    # The holder finished (or died) without caching the chunk.
+                    return None
+        finally:
+            waiters = self._remote_waiters.get(chunk_hash)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    self._remote_waiters.pop(chunk_hash, None)
+
+
+chunk_disk_cache = ChunkDiskCache(
+    CDN_CHUNK_CACHE_DIR,
+    CDN_CHUNK_CACHE_MAX_BYTES,
+    enabled=CDN_CHUNK_CACHE_ENABLED,
+)
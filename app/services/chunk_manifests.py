@@ -247,6 +247,25 @@ def resolve_chunk_manifest(
     return ChunkManifestMatch(meta=meta, hf_folder=hf_folder, archive_dir=".chunks", archive_cleanup=False)
 
 
+def load_chunk_manifest_version(
+    app_id: str,
+    game_name: str,
+    version: str,
+) -> Optional[tuple[dict, Path]]:
+    """Raw manifest payload of one local version and the directory holding its chunk files."""
+    match = resolve_chunk_manifest(app_id, game_name, version)
+    if not match or match.meta.version != version:
+        return None
+    try:
+        payload = json.loads(match.meta.manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    payload.setdefault("version", version)
+    return payload, _ROOT_DIR / match.meta.folder / match.meta.version
+
+
 def _slug_to_app_id(slug: str) -> str:
     if slug.startswith("steam-"):
         return slug.split("-", 1)[-1]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import StoredChunk
+
+_LOOKUP_BATCH = 1000
+
+
+def _iter_chunks(manifest: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    for entry in manifest.get("files") or []:
+        if not isinstance(entry, dict):
+            continue
+        for chunk in entry.get("chunks") or []:
+            if isinstance(chunk, dict) and chunk.get("hash"):
+                yield entry, chunk
+
+
+def manifest_chunk_hashes(manifest: Optional[Dict[str, Any]]) -> Set[str]:
+    if not manifest:
+        return set()
+    return {str(chunk["hash"]) for _, chunk in _iter_chunks(manifest)}
+
+
+def annotate_manifest_delta(
+    manifest: Dict[str, Any],
+    base_hashes: Optional[Set[str]],
+    base_summary: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Marks chunks whose hash is in `base_hashes` (the chunk hashes of the base
+    build) with `in_base` and adds a `delta` summary, so clients updating from
+    that build only fetch the rest.
+    """
+    if base_hashes is None:
+        return manifest
+    base_summary = base_summary or {}
+    reused_chunks = reused_bytes = new_chunks = new_bytes = 0
+    for _, chunk in _iter_chunks(manifest):
+        size = int(chunk.get("size") or 0)
+        if chunk["hash"] in base_hashes:
+            chunk["in_base"] = True
+            reused_chunks += 1
+            reused_bytes += size
+        else:
+            new_chunks += 1
+            new_bytes += size
+    manifest["delta"] = {
+        "base_version": base_summary.get("version"),
+        "base_content_id": base_summary.get("content_id"),
+        "reused_chunks": reused_chunks,
+        "reused_bytes": reused_bytes,
+        "new_chunks": new_chunks,
+        "new_bytes": new_bytes,
+    }
+    return manifest
+
+
+def _batched(values: Iterable[str]) -> Iterator[list[str]]:
+    batch: list[str] = []
+    for value in values:
+        batch.append(value)
+        if len(batch) >= _LOOKUP_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def known_chunk_hashes(db: Session, hashes: Iterable[str]) -> Set[str]:
+    known: Set[str] = set()
+    for batch in _batched(hashes):
+        known.update(
+            row[0] for row in db.query(StoredChunk.chunk_hash).filter(StoredChunk.chunk_hash.in_(batch))
+        )
+    return known
+
+
+def register_manifest_chunks(db: Session, game_id: str, slug: str, manifest: Dict[str, Any]) -> int:
+    """
+    Points the store at `slug`'s current build: its previous rows are
+    dropped (the source tree was replaced in place) and every chunk not
+    already held by another game is recorded. Returns the rows added.
+    """
+    first_seen: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+    for entry, chunk in _iter_chunks(manifest):
+        first_seen.setdefault(str(chunk["hash"]), (entry, chunk))
+    db.query(StoredChunk).filter(StoredChunk.slug == slug).delete(synchronize_session=False)
+    known = known_chunk_hashes(db, first_seen)
+    content_id = str(manifest.get("content_id") or "")
+    added = 0
+    for chunk_hash, (entry, chunk) in first_seen.items():
+        if chunk_hash in known or "offset" not in chunk:
+            continue
+        db.add(
+            StoredChunk(
+                chunk_hash=chunk_hash,
+                size=int(chunk.get("size") or 0),
+                game_id=game_id,
+                slug=slug,
+                content_id=content_id,
+                file_path=str(entry.get("path") or ""),
+                offset=int(chunk["offset"]),
+                file_size=int(entry.get("size") or 0),
+                file_mtime_ns=entry.get("mtime_ns"),
+            )
+        )
+        added += 1
+    db.commit()
+    return added
+
+
+def find_chunk_source(db: Session, source_dir: str, chunk_hash: str, size: int) -> Optional[Tuple[Path, int]]:
+    """
+    Local (path, offset) holding `chunk_hash` in any game's source tree. The
+    file must still have the size and mtime recorded with the row; otherwise
+    the tree changed after that game's last build and the row is dropped.
+    """
+    row = db.query(StoredChunk).filter(StoredChunk.chunk_hash == chunk_hash).first()
+    if row is None or int(row.size) != size:
+        return None
+    path = Path(source_dir) / row.slug / row.file_path
+    try:
+        st = path.stat()
+    except OSError:
+        st = None
+    if (
+        st is None
+        or row.file_mtime_ns is None
+        or st.st_size != int(row.file_size or 0)
+        or st.st_mtime_ns != int(row.file_mtime_ns)
+    ):
+        db.query(StoredChunk).filter(StoredChunk.chunk_hash == chunk_hash).delete(synchronize_session=False)
+        db.commit()
+        return None
+    return path, int(row.offset)
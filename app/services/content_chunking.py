@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import ctypes
+import hashlib
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import CDC_NATIVE_LIBRARY_PATH
+from .file_hashing import new_hasher
+
+_MASK64 = (1 << 64) - 1
+
+
+def _gear_table() -> Tuple[int, ...]:
+    # Fixed seed: boundaries, and therefore chunk hashes, must be identical
+    # across processes, hosts and releases.
+    return tuple(
+        int.from_bytes(hashlib.sha256(b"otoshi-fastcdc:%d" % value).digest()[:8], "little")
+        for value in range(256)
+    )
+
+
+_GEAR = _gear_table()
+
+
+def _mask(bits: int) -> int:
+    # Gear fingerprints shift left, so the high bits depend on the most bytes.
+    bits = max(1, min(63, bits))
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _load_native_cut() -> Optional[Callable[..., int]]:
+    """`otoshi_fastcdc_cut` from native/c/fastcdc, or None when it is not built."""
+    candidates = [CDC_NATIVE_LIBRARY_PATH.strip()] if CDC_NATIVE_LIBRARY_PATH.strip() else []
+    if sys.platform.startswith("win"):
+        candidates.append("otoshi_fastcdc.dll")
+    elif sys.platform == "darwin":
+        candidates.append("libotoshi_fastcdc.dylib")
+    else:
+        candidates.append("libotoshi_fastcdc.so")
+    for candidate in candidates:
+        try:
+            function = ctypes.CDLL(candidate).otoshi_fastcdc_cut
+        except (OSError, AttributeError):
+            continue
+        function.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.c_size_t,
+            ctypes.c_size_t,
+            ctypes.c_size_t,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.POINTER(ctypes.c_uint64),
+        ]
+        function.restype = ctypes.c_size_t
+        return function
+    return None
+
+
+# ctypes drops the GIL for the call, so hash-pool threads scan files in parallel.
+_NATIVE_CUT = _load_native_cut()
+_NATIVE_GEAR = (ctypes.c_uint64 * 256)(*_GEAR)
+
+
+def native_cut_available() -> bool:
+    return _NATIVE_CUT is not None
+
+
+@dataclass(frozen=True)
+class ChunkParams:
+    min_size: int
+    avg_size: int
+    max_size: int
+
+    @classmethod
+    def for_average(cls, avg_size: int) -> "ChunkParams":
+        avg_size = max(256, int(avg_size))
+        return cls(min_size=avg_size // 4, avg_size=avg_size, max_size=avg_size * 4)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"min_size": self.min_size, "avg_size": self.avg_size, "max_size": self.max_size}
+
+    def masks(self) -> Tuple[int, int]:
+        """(mask before the average size, mask after it)."""
+        bits = self.avg_size.bit_length() - 1
+        return _mask(bits + 2), _mask(bits - 2)
+
+
+def cut_point(data: memoryview, start: int, end: int, params: ChunkParams) -> int:
+    """
+    FastCDC boundary for the chunk starting at `start`: normalized chunking
+    with a stricter mask before the average size and a looser one after it.
+    Returns the exclusive end offset (at most `end`).
+    """
+    remaining = end - start
+    if remaining <= params.min_size:
+        return end
+    limit = start + min(remaining, params.max_size)
+    normal = start + min(remaining, params.avg_size)
+    mask_small, mask_large = params.masks()
+    gear = _GEAR
+    fingerprint = 0
+    index = start + params.min_size
+    while index < normal:
+        fingerprint = ((fingerprint << 1) + gear[data[index]]) & _MASK64
+        index += 1
+        if not fingerprint & mask_small:
+            return index
+    while index < limit:
+        fingerprint = ((fingerprint << 1) + gear[data[index]]) & _MASK64
+        index += 1
+        if not fingerprint & mask_large:
+            return index
+    return limit
+
+
+@dataclass(frozen=True)
+class ContentChunk:
+    offset: int
+    size: int
+    hash: str
+
+
+@dataclass(frozen=True)
+class ContentChunkedFile:
+    size: int
+    digests: Dict[str, str]
+    chunks: Tuple[ContentChunk, ...]
+
+
+def chunk_file(
+    path: Path,
+    params: ChunkParams,
+    algorithms: Iterable[str] = ("sha256",),
+    chunk_algorithm: str = "sha256",
+) -> ContentChunkedFile:
+    """
+    Content-defined chunks of `path` plus whole-file digests, from one
+    streaming read. The read window always holds at least `max_size` bytes
+    past the current chunk start, so boundaries do not depend on buffering.
+    """
+    algorithms = tuple(dict.fromkeys(algorithms))
+    hashers = [new_hasher(algorithm) for algorithm in algorithms]
+    chunks: List[ContentChunk] = []
+    mask_small, mask_large = params.masks()
+    window_size = max(params.max_size * 2, 4 * 1024 * 1024)
+    buffer = bytearray()
+    offset = 0
+    eof = False
+    with path.open("rb") as handle:
+        while True:
+            while not eof and len(buffer) < window_size:
+                block = handle.read(window_size - len(buffer))
+                if not block:
+                    eof = True
+                    break
+                for hasher in hashers:
+                    hasher.update(block)
+                buffer += block
+            if not buffer:
+                break
+            view = memoryview(buffer)
+            native = (ctypes.c_ubyte * len(buffer)).from_buffer(buffer) if _NATIVE_CUT is not None else None
+            address = ctypes.addressof(native) if native is not None else 0
+            position = 0
+            # Only cut where a full max-size lookahead is buffered (or at EOF).
+            while position < len(buffer) and (eof or len(buffer) - position >= params.max_size):
+                if native is not None:
+                    end = position + _NATIVE_CUT(
+                        address + position,
+                        len(buffer) - position,
+                        params.min_size,
+                        params.avg_size,
+                        params.max_size,
+                        mask_small,
+                        mask_large,
+                        _NATIVE_GEAR,
+                    )
+                else:
+                    end = cut_point(view, position, len(buffer), params)
+                chunk_hasher = new_hasher(chunk_algorithm)
+                chunk_hasher.update(view[position:end])
+                chunks.append(ContentChunk(offset=offset + position, size=end - position, hash=chunk_hasher.hexdigest()))
+                position = end
+            # Both exports must be gone before the buffer can shrink.
+            native = None
+            view.release()
+            del buffer[:position]
+            offset += position
+            if eof and not buffer:
+                break
+    return ContentChunkedFile(
+        size=offset,
+        digests={algorithm: hasher.hexdigest() for algorithm, hasher in zip(algorithms, hashers)},
+        chunks=tuple(chunks),
+    )
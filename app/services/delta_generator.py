@@ -1,11 +1,23 @@
 import subprocess
 from pathlib import Path
+from typing import Optional
 
 
 class DeltaGenerator:
-    def generate_patch(self, old_file: Path, new_file: Path, patch_file: Path) -> int:
+    def generate_patch(
+        self,
+        old_file: Path,
+        new_file: Path,
+        patch_file: Path,
+        source_window: Optional[int] = None,
+    ) -> int:
+        command = ["xdelta3", "-e", "-f"]
+        if source_window:
+            # Source bytes xdelta3 can match against (its default is 64 MiB).
+            command.extend(["-B", str(int(source_window))])
+        command.extend(["-s", str(old_file), str(new_file), str(patch_file)])
         result = subprocess.run(
-            ["xdelta3", "-e", "-s", str(old_file), str(new_file), str(patch_file)],
+            command,
             capture_output=True,
             text=True,
             check=False,
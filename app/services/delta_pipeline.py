@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import (
+    DELTA_MAX_PATCH_RATIO,
+    DELTA_MAX_WORKERS,
+    DELTA_MIN_FILE_BYTES,
+    DELTA_PATCH_DIR,
+    DELTA_SOURCE_WINDOW_BYTES,
+)
+from .chunk_manifests import load_chunk_manifest_version
+from .delta_generator import DeltaGenerator
+from .file_hashing import hash_file, sha256_file
+
+
+@dataclass(frozen=True)
+class _ManifestFile:
+    path: str
+    size: int
+    hash: str
+
+
+@dataclass(frozen=True)
+class DeltaJob:
+    path: str
+    old_file: Path
+    new_file: Path
+    old_hash: str
+    new_hash: str
+    old_size: int
+    new_size: int
+
+
+def _manifest_files(manifest: Dict[str, Any]) -> Dict[str, _ManifestFile]:
+    """Files of a game manifest (`files`) or a chunk manifest (`chunks`), by path."""
+    entries = manifest.get("files")
+    if not isinstance(entries, list):
+        entries = manifest.get("chunks")
+    files: Dict[str, _ManifestFile] = {}
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        path = str(entry.get("path") or entry.get("filename") or "").strip().lstrip("/").replace("\\", "/")
+        digest = str(entry.get("hash") or "").strip().lower()
+        if not path or not digest:
+            continue
+        files[path] = _ManifestFile(path=path, size=int(entry.get("size") or 0), hash=digest)
+    return files
+
+
+class DeltaPipeline:
+    """
+    Builds the patch set between two manifest versions: changed files are
+    found from hashes, xdelta3 runs for them on a bounded pool (each job is a
+    child process), and patches are cached under `patch_dir` by
+    (old_hash, new_hash) so any later rollout between the same file contents
+    reuses them. Patches over `max_ratio` of the new file, and files below
+    `min_file_bytes`, ship as full downloads instead. Both inputs are
+    re-hashed before a patch is generated, so a tree that drifted from its
+    manifest never lands in the cache under the manifest's hashes.
+    """
+
+    def __init__(
+        self,
+        patch_dir: Path = Path(DELTA_PATCH_DIR),
+        max_workers: int = DELTA_MAX_WORKERS,
+        max_ratio: float = DELTA_MAX_PATCH_RATIO,
+        min_file_bytes: int = DELTA_MIN_FILE_BYTES,
+        source_window: int = DELTA_SOURCE_WINDOW_BYTES,
+        hash_algorithm: str = "sha256",
+        generator: Optional[DeltaGenerator] = None,
+    ) -> None:
+        self.patch_dir = patch_dir
+        self.max_workers = max(1, int(max_workers))
+        self.max_ratio = max(0.0, float(max_ratio))
+        self.min_file_bytes = max(0, int(min_file_bytes))
+        self.source_window = max(1, int(source_window))
+        self.hash_algorithm = hash_algorithm
+        self.generator = generator or DeltaGenerator()
+
+    # --- content-addressed patch cache ---
+    def _patch_path(self, old_hash: str, new_hash: str) -> Path:
+        return self.patch_dir / "objects" / old_hash[:2] / f"{old_hash}_{new_hash}.xdelta"
+
+    def _read_cached(self, job: DeltaJob) -> Optional[Dict[str, Any]]:
+        meta_path = self._patch_path(job.old_hash, job.new_hash).with_suffix(".json")
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(meta, dict):
+            return None
+        if meta.get("status") == "patch" and not self._patch_path(job.old_hash, job.new_hash).exists():
+            return None
+        return meta
+
+    def _write_cached(self, job: DeltaJob, meta: Dict[str, Any]) -> None:
+        meta_path = self._patch_path(job.old_hash, job.new_hash).with_suffix(".json")
+        temp = meta_path.with_name(f"{meta_path.name}.{uuid.uuid4().hex}.tmp")
+        temp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp, meta_path)
+
+    def _source_mismatch(self, job: DeltaJob) -> Optional[str]:
+        """Description of the first input whose bytes differ from the manifest, if any."""
+        for label, path, size, expected in (
+            ("old", job.old_file, job.old_size, job.old_hash),
+            ("new", job.new_file, job.new_size, job.new_hash),
+        ):
+            if path.stat().st_size != size:
+                return f"{label} file {path} does not match the manifest size"
+            if hash_file(path, (self.hash_algorithm,)).digests[self.hash_algorithm] != expected:
+                return f"{label} file {path} does not match the manifest hash"
+        return None
+
+    def _run_job(self, job: DeltaJob) -> Dict[str, Any]:
+        cached = self._read_cached(job)
+        if cached is not None:
+            return {**cached, "cached": True}
+        try:
+            mismatch = self._source_mismatch(job)
+        except OSError as exc:
+            return {"status": "full", "reason": "patch_failed", "error": str(exc), "cached": False}
+        if mismatch is not None:
+            return {"status": "full", "reason": "source_mismatch", "error": mismatch, "cached": False}
+
+        patch_path = self._patch_path(job.old_hash, job.new_hash)
+        patch_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = patch_path.with_name(f"{patch_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            patch_size = self.generator.generate_patch(
+                job.old_file,
+                job.new_file,
+                temp,
+                source_window=min(self.source_window, max(job.old_size, 1)),
+            )
+            if patch_size > job.new_size * self.max_ratio:
+                meta = {"status": "full", "reason": "patch_too_large", "patch_size": patch_size}
+            else:
+                os.replace(temp, patch_path)
+                meta = {"status": "patch", "patch_size": patch_size, "patch_hash": sha256_file(patch_path)}
+        except (OSError, RuntimeError) as exc:
+            # Not cached: the failure may be environmental (missing file, no xdelta3).
+            return {"status": "full", "reason": "patch_failed", "error": str(exc), "cached": False}
+        finally:
+            temp.unlink(missing_ok=True)
+        self._write_cached(job, meta)
+        return {**meta, "cached": False}
+
+    # --- pipeline ---
+    def plan(
+        self,
+        old_manifest: Dict[str, Any],
+        new_manifest: Dict[str, Any],
+        old_root: Path,
+        new_root: Path,
+    ) -> Tuple[List[Dict[str, Any]], List[DeltaJob]]:
+        """Per-file actions that need no xdelta3 run, plus the delta jobs."""
+        old_files = _manifest_files(old_manifest)
+        new_files = _manifest_files(new_manifest)
+        entries: List[Dict[str, Any]] = []
+        jobs: List[DeltaJob] = []
+        for path, new in new_files.items():
+            old = old_files.get(path)
+            if old is None:
+                entries.append({"path": path, "action": "add", "new_hash": new.hash, "size": new.size})
+            elif old.hash == new.hash:
+                continue
+            elif new.size < self.min_file_bytes:
+                entries.append(
+                    {
+                        "path": path,
+                        "action": "full",
+                        "reason": "below_min_size",
+                        "old_hash": old.hash,
+                        "new_hash": new.hash,
+                        "size": new.size,
+                    }
+                )
+            else:
+                jobs.append(
+                    DeltaJob(
+                        path=path,
+                        old_file=old_root / path,
+                        new_file=new_root / path,
+                        old_hash=old.hash,
+                        new_hash=new.hash,
+                        old_size=old.size,
+                        new_size=new.size,
+                    )
+                )
+        for path, old in old_files.items():
+            if path not in new_files:
+                entries.append({"path": path, "action": "remove", "old_hash": old.hash})
+        return entries, jobs
+
+    def build(
+        self,
+        old_manifest: Dict[str, Any],
+        new_manifest: Dict[str, Any],
+        old_root: Path,
+        new_root: Path,
+        label: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Generates (or reuses) every patch and writes the patch manifest to
+        `patch_dir/manifests`, named by `label` and the two versions.
+        """
+        entries, jobs = self.plan(old_manifest, new_manifest, old_root, new_root)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="delta") as pool:
+            results = list(pool.map(self._run_job, jobs))
+
+        for job, result in zip(jobs, results):
+            entry: Dict[str, Any] = {
+                "path": job.path,
+                "action": result["status"],
+                "old_hash": job.old_hash,
+                "new_hash": job.new_hash,
+                "size": job.new_size,
+            }
+            if result["status"] == "patch":
+                entry["patch"] = {
+                    "path": self._patch_path(job.old_hash, job.new_hash).relative_to(self.patch_dir).as_posix(),
+                    "size": result["patch_size"],
+                    "hash": result["patch_hash"],
+                    "cached": result["cached"],
+                }
+            else:
+                entry["reason"] = result.get("reason")
+            entries.append(entry)
+        entries.sort(key=lambda item: item["path"])
+
+        download_bytes = sum(
+            int(entry["patch"]["size"]) if entry["action"] == "patch" else int(entry.get("size") or 0)
+            for entry in entries
+            if entry["action"] != "remove"
+        )
+        from_version = str(old_manifest.get("version") or "")
+        to_version = str(new_manifest.get("version") or "")
+        patch_manifest = {
+            "from_version": from_version,
+            "to_version": to_version,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "strategy": "chunk_plus_xdelta",
+            "files": entries,
+            "summary": {
+                "patched_files": sum(1 for entry in entries if entry["action"] == "patch"),
+                "full_files": sum(1 for entry in entries if entry["action"] in {"full", "add"}),
+                "removed_files": sum(1 for entry in entries if entry["action"] == "remove"),
+                "reused_patches": sum(1 for result in results if result.get("cached")),
+                "download_bytes": download_bytes,
+                "full_download_bytes": int(new_manifest.get("total_size") or 0)
+                or sum(file.size for file in _manifest_files(new_manifest).values()),
+            },
+        }
+        name = "__".join(_safe_name(part) for part in (label, from_version, to_version) if part)
+        output = self.patch_dir / "manifests" / f"{name}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        temp = output.with_name(f"{output.name}.{uuid.uuid4().hex}.tmp")
+        temp.write_text(json.dumps(patch_manifest, indent=2), encoding="utf-8")
+        os.replace(temp, output)
+        patch_manifest["manifest_path"] = str(output)
+        return patch_manifest
+
+
+def _safe_name(value: str) -> str:
+    return "".join(char if char.isalnum() or char in "._-" else "_" for char in value) or "unknown"
+
+
+def build_chunk_version_patches(
+    app_id: str,
+    game_name: str,
+    from_version: str,
+    to_version: str,
+    pipeline: Optional[DeltaPipeline] = None,
+) -> Optional[Dict[str, Any]]:
+    """Patch manifest between two local chunk-manifest versions of a game."""
+    old = load_chunk_manifest_version(app_id, game_name, from_version)
+    new = load_chunk_manifest_version(app_id, game_name, to_version)
+    if old is None or new is None:
+        return None
+    return (pipeline or DeltaPipeline()).build(old[0], new[0], old[1], new[1], label=app_id or game_name)
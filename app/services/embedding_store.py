@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import heapq
+import math
+import mmap
+import operator
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import AI_EMBEDDING_INDEX_DIR, AI_EMBEDDING_STORE_REFRESH_SECONDS
+from ..models import Game, GameEmbedding
+from .ai_gateway import hash_embedding
+from .vector_store import sync_vector_columns
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional acceleration
+    np = None
+
+_SOURCE = "steam"
+_TOP_K_BLOCK_ROWS = 8192
+# magic, byte order, dimension, row count, watermark (microseconds since epoch, -1 if none), ids length
+_SNAPSHOT_HEADER = struct.Struct("<8scIIqQ")
+_SNAPSHOT_MAGIC = b"OTOEMB01"
+_SNAPSHOT_BYTEORDER = b"L" if sys.byteorder == "little" else b"B"
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _EmbeddingMatrix:
+    """Row-major float64 matrix of one model's vectors with an app_id -> row index."""
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.data = array("d")
+        self.norms = array("d")
+        self.rows: dict[str, int] = {}
+        self.app_ids: list[str] = []
+        self.watermark: Optional[datetime] = None
+        self.refreshed_at = 0.0
+        self.dirty = False
+        self.saved_at = 0.0
+
+    def upsert(self, app_id: str, vector: Iterable[float]) -> None:
+        values = [float(value or 0.0) for value in vector][: self.dimension]
+        if len(values) < self.dimension:
+            values.extend([0.0] * (self.dimension - len(values)))
+        norm = math.sqrt(sum(value * value for value in values))
+        self.dirty = True
+        row = self.rows.get(app_id)
+        if row is None:
+            self.rows[app_id] = len(self.norms)
+            self.app_ids.append(app_id)
+            self.data.extend(values)
+            self.norms.append(norm)
+            return
+        start = row * self.dimension
+        self.data[start : start + self.dimension] = array("d", values)
+        self.norms[row] = norm
+
+    def vector(self, app_id: str) -> Optional[list[float]]:
+        row = self.rows.get(app_id)
+        if row is None:
+            return None
+        start = row * self.dimension
+        return self.data[start : start + self.dimension].tolist()
+
+    def cosine(self, query: list[float], app_ids: list[str]) -> dict[str, float]:
+        query_norm = math.sqrt(sum(value * value for value in query))
+        present = [(app_id, self.rows[app_id]) for app_id in app_ids if app_id in self.rows]
+        if not present or query_norm <= 1e-9:
+            return {app_id: 0.0 for app_id, _ in present}
+
+        dimension = self.dimension
+        if np is not None:
+            matrix = np.frombuffer(self.data, dtype=np.float64).reshape(-1, dimension)
+            indices = np.fromiter((row for _, row in present), dtype=np.int64, count=len(present))
+            dots = matrix[indices] @ np.asarray(query, dtype=np.float64)
+            norms = np.frombuffer(self.norms, dtype=np.float64)[indices]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.where(norms > 1e-9, dots / (norms * query_norm), 0.0)
+            return {app_id: float(score) for (app_id, _), score in zip(present, scores.tolist())}
+
+        data = self.data
+        norms = self.norms
+        scores: dict[str, float] = {}
+        for app_id, row in present:
+            norm = norms[row]
+            if norm <= 1e-9:
+                scores[app_id] = 0.0
+                continue
+            start = row * dimension
+            dot = sum(map(operator.mul, data[start : start + dimension], query))
+            scores[app_id] = dot / (norm * query_norm)
+        return scores
+
+    def top_k(self, query: list[float], limit: int, allowed: Optional[set[str]] = None) -> list[tuple[str, float]]:
+        """
+        Exact nearest rows by cosine similarity. `allowed` restricts the rows
+        searched, so filtering never eats into `limit`.
+        """
+        query_norm = math.sqrt(sum(value * value for value in query))
+        if query_norm <= 1e-9 or limit <= 0:
+            return []
+        if allowed is None:
+            rows: list[int] = list(range(len(self.app_ids)))
+        else:
+            rows = [self.rows[app_id] for app_id in allowed if app_id in self.rows]
+        if not rows:
+            return []
+
+        dimension = self.dimension
+        if np is not None:
+            matrix = np.frombuffer(self.data, dtype=np.float64).reshape(-1, dimension)
+            norms = np.frombuffer(self.norms, dtype=np.float64)
+            vector = np.asarray(query, dtype=np.float64) / query_norm
+            best_rows = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float64)
+            for begin in range(0, len(rows), _TOP_K_BLOCK_ROWS):
+                block = np.asarray(rows[begin : begin + _TOP_K_BLOCK_ROWS], dtype=np.int64)
+                block_norms = norms[block]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    scores = np.where(block_norms > 1e-9, (matrix[block] @ vector) / block_norms, 0.0)
+                best_rows = np.concatenate((best_rows, block))
+                best_scores = np.concatenate((best_scores, scores))
+                if len(best_scores) > limit:
+                    keep = np.argpartition(-best_scores, limit - 1)[:limit]
+                    best_rows, best_scores = best_rows[keep], best_scores[keep]
+            order = np.argsort(-best_scores, kind="stable")
+            return [(self.app_ids[int(best_rows[i])], float(best_scores[i])) for i in order]
+
+        data = self.data
+        norms = self.norms
+
+        def _scored():
+            for row in rows:
+                norm = norms[row]
+                if norm <= 1e-9:
+                    yield 0.0, row
+                    continue
+                start = row * dimension
+                yield sum(map(operator.mul, data[start : start + dimension], query)) / (norm * query_norm), row
+
+        return [(self.app_ids[row], score) for score, row in heapq.nlargest(limit, _scored())]
+
+    def copy(self) -> "_EmbeddingMatrix":
+        """Point-in-time copy of what `save` writes."""
+        copied = _EmbeddingMatrix(self.dimension)
+        copied.data = self.data[:]
+        copied.norms = self.norms[:]
+        copied.app_ids = list(self.app_ids)
+        copied.watermark = self.watermark
+        return copied
+
+    def save(self, path: Path) -> None:
+        ids = "\n".join(self.app_ids).encode("utf-8")
+        watermark = -1
+        if self.watermark is not None:
+            watermark = int((self.watermark - _EPOCH) / timedelta(microseconds=1))
+        header = _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC, _SNAPSHOT_BYTEORDER, self.dimension, len(self.app_ids), watermark, len(ids)
+        )
+        padding = b"\0" * (-(len(header) + len(ids)) % 8)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer: several workers can share the snapshot directory.
+        temp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(temp, "wb") as handle:
+            handle.write(header)
+            handle.write(ids)
+            handle.write(padding)
+            self.data.tofile(handle)
+            self.norms.tofile(handle)
+        os.replace(temp, path)
+
+    def load(self, path: Path) -> bool:
+        """Fill an empty matrix from a snapshot written by `save`."""
+        try:
+            with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, byteorder, dimension, count, watermark, ids_length = _SNAPSHOT_HEADER.unpack_from(mapped, 0)
+                if magic != _SNAPSHOT_MAGIC or byteorder != _SNAPSHOT_BYTEORDER or dimension != self.dimension:
+                    return False
+                offset = _SNAPSHOT_HEADER.size
+                ids = bytes(mapped[offset : offset + ids_length]).decode("utf-8")
+                offset += ids_length + (-(offset + ids_length) % 8)
+                data_end = offset + count * dimension * 8
+                if data_end + count * 8 > len(mapped):
+                    return False
+                view = memoryview(mapped)
+                try:
+                    self.data.frombytes(view[offset:data_end])
+                    self.norms.frombytes(view[data_end : data_end + count * 8])
+                finally:
+                    view.release()
+        except (OSError, ValueError, struct.error, UnicodeDecodeError):
+            return False
+        self.app_ids = ids.split("\n") if count else []
+        self.rows = {app_id: row for row, app_id in enumerate(self.app_ids)}
+        if watermark >= 0:
+            self.watermark = _EPOCH + timedelta(microseconds=watermark)
+        return True
+
+
+class GameEmbeddingStore:
+    """
+    In-memory copy of the `game_embeddings` vectors per hash model. Loaded in
+    one query, refreshed incrementally by `updated_at`, and extended in place
+    when `ensure` persists embeddings that were missing. Scoring is a single
+    pass over contiguous rows instead of a SELECT per candidate.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float = AI_EMBEDDING_STORE_REFRESH_SECONDS,
+        snapshot_dir: str = AI_EMBEDDING_INDEX_DIR,
+    ) -> None:
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._matrices: dict[str, _EmbeddingMatrix] = {}
+
+    @staticmethod
+    def model_name(dimension: int) -> str:
+        return f"hash-{dimension}"
+
+    def _matrix(self, dimension: int) -> _EmbeddingMatrix:
+        model = self.model_name(dimension)
+        with self._lock:
+            matrix = self._matrices.get(model)
+            if matrix is None:
+                matrix = _EmbeddingMatrix(dimension)
+                snapshot = self._snapshot_path(model)
+                if snapshot is not None and snapshot.exists() and not matrix.load(snapshot):
+                    matrix = _EmbeddingMatrix(dimension)
+                self._matrices[model] = matrix
+            return matrix
+
+    def _snapshot_path(self, model: str) -> Optional[Path]:
+        if self.snapshot_dir is None:
+            return None
+        return self.snapshot_dir / f"{model}.{_SOURCE}.bin"
+
+    def persist(self) -> None:
+        """Write changed matrices to their snapshot files."""
+        if self.snapshot_dir is None:
+            return
+        with self._persist_lock:
+            # Copy under the lock, write outside it, so scoring is not blocked on disk.
+            with self._lock:
+                pending = []
+                for model, matrix in self._matrices.items():
+                    if matrix.dirty:
+                        pending.append((model, matrix, matrix.copy()))
+                        matrix.dirty = False
+            for model, matrix, snapshot in pending:
+                path = self._snapshot_path(model)
+                try:
+                    snapshot.save(path)
+                except OSError as exc:
+                    with self._lock:
+                        matrix.dirty = True
+                    print(f"[EmbeddingStore] Failed to write {path}: {exc}")
+                    continue
+                with self._lock:
+                    matrix.saved_at = time.monotonic()
+
+    def refresh(self, db: Session, dimension: int, force: bool = False) -> None:
+        matrix = self._matrix(dimension)
+        now = time.monotonic()
+        if not force and matrix.refreshed_at and now - matrix.refreshed_at < self.refresh_seconds:
+            return
+        query = db.query(GameEmbedding.app_id, GameEmbedding.vector, GameEmbedding.updated_at).filter(
+            GameEmbedding.model == self.model_name(dimension),
+            GameEmbedding.source == _SOURCE,
+        )
+        if matrix.watermark is not None:
+            query = query.filter(GameEmbedding.updated_at >= matrix.watermark)
+        rows = query.all()
+        with self._lock:
+            for app_id, vector, updated_at in rows:
+                if isinstance(vector, list) and len(vector) == dimension and app_id:
+                    matrix.upsert(str(app_id), vector)
+                if updated_at is not None and (matrix.watermark is None or updated_at > matrix.watermark):
+                    matrix.watermark = updated_at
+            matrix.refreshed_at = now
+            should_persist = matrix.dirty and now - matrix.saved_at >= self.refresh_seconds
+        if should_persist:
+            self.persist()
+
+    def ensure(self, db: Session, texts: Mapping[str, str], dimension: int) -> None:
+        """
+        Make sure every app id in `texts` has an embedding, computing missing
+        ones from the given text and persisting them with one flush.
+        """
+        self.refresh(db, dimension)
+        matrix = self._matrix(dimension)
+        with self._lock:
+            missing = [app_id for app_id in texts if app_id and app_id not in matrix.rows]
+        if not missing:
+            return
+
+        model = self.model_name(dimension)
+        existing = {
+            row.app_id: row
+            for row in db.query(GameEmbedding).filter(
+                GameEmbedding.app_id.in_(missing),
+                GameEmbedding.model == model,
+                GameEmbedding.source == _SOURCE,
+            )
+        }
+        game_ids = {
+            slug: game_id
+            for slug, game_id in db.query(Game.slug, Game.id).filter(
+                Game.slug.in_([f"steam-{app_id}" for app_id in missing])
+            )
+        }
+
+        fresh: dict[str, list[float]] = {}
+        written: list[GameEmbedding] = []
+        for app_id in missing:
+            row = existing.get(app_id)
+            if row is not None and isinstance(row.vector, list) and len(row.vector) == dimension:
+                fresh[app_id] = row.vector
+                continue
+            vector = hash_embedding(texts[app_id] or app_id, dimension=dimension)
+            game_id = game_ids.get(f"steam-{app_id}")
+            if row is None:
+                row = GameEmbedding(
+                    game_id=game_id,
+                    app_id=app_id,
+                    model=model,
+                    source=_SOURCE,
+                    vector=vector,
+                    dimension=dimension,
+                )
+                db.add(row)
+            else:
+                row.game_id = game_id or row.game_id
+                row.vector = vector
+                row.dimension = dimension
+            written.append(row)
+            fresh[app_id] = vector
+
+        if written:
+            db.flush()
+            sync_vector_columns(
+                db,
+                table_name="game_embeddings",
+                rows=[(row.id, row.vector) for row in written],
+                dimension=dimension,
+            )
+        with self._lock:
+            for app_id, vector in fresh.items():
+                matrix.upsert(app_id, vector)
+
+    def vectors(self, app_ids: Iterable[str], dimension: int) -> list[list[float]]:
+        matrix = self._matrix(dimension)
+        with self._lock:
+            found = (matrix.vector(app_id) for app_id in app_ids)
+            return [vector for vector in found if vector is not None]
+
+    def similarities(self, query_vector: list[float], app_ids: Iterable[str], dimension: int) -> dict[str, float]:
+        """Cosine similarity of `query_vector` against each known app id."""
+        query = [float(value or 0.0) for value in query_vector][:dimension]
+        query.extend([0.0] * (dimension - len(query)))
+        matrix = self._matrix(dimension)
+        with self._lock:
+            return matrix.cosine(query, list(app_ids))
+
+    def top_k(
+        self,
+        db: Session,
+        query_vector: list[float],
+        dimension: int,
+        limit: int,
+        allowed_appids: Optional[set[str]] = None,
+    ) -> list[tuple[str, float]]:
+        """Most similar app ids (cosine) among `allowed_appids`, best first."""
+        self.refresh(db, dimension)
+        query = [float(value or 0.0) for value in query_vector][:dimension]
+        query.extend([0.0] * (dimension - len(query)))
+        matrix = self._matrix(dimension)
+        with self._lock:
+            return matrix.top_k(query, int(limit), allowed_appids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrices.clear()
+
+
+embedding_store = GameEmbeddingStore()
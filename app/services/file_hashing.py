@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..core.config import HASH_MAX_WORKERS, HASH_PARALLEL_MIN_BYTES
+
+try:
+    import blake3 as _blake3_mod  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _blake3_mod = None
+
+HAS_BLAKE3 = _blake3_mod is not None
+
+# Read buffer, rounded up to a whole number of chunks so chunk digests never
+# straddle two reads.
+_BUFFER_SIZE = 4 * 1024 * 1024
+# Files at least this large are mapped instead of read.
+_MMAP_MIN_BYTES = 64 * 1024 * 1024
+# Bytes of chunks handed to one pool task when a file is split.
+_PARALLEL_TASK_BYTES = 32 * 1024 * 1024
+
+# hashlib and blake3 release the GIL on large updates, so threads hash in
+# parallel; shared so nested scans cannot multiply threads.
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, HASH_MAX_WORKERS),
+    thread_name_prefix="file-hash",
+)
+
+
+@dataclass(frozen=True)
+class FileDigests:
+    size: int
+    digests: Dict[str, str]
+    # Per-chunk hex digests in file order; empty unless chunking was requested.
+    chunks: Tuple[str, ...] = ()
+
+
+def new_hasher(algorithm: str) -> Any:
+    if algorithm == "blake3":
+        if _blake3_mod is None:
+            raise ValueError("blake3 is not installed")
+        return _blake3_mod.blake3()
+    return hashlib.new(algorithm)
+
+
+def _buffer_size(chunk_size: int) -> int:
+    if chunk_size <= 0:
+        return _BUFFER_SIZE
+    return max(1, _BUFFER_SIZE // chunk_size) * chunk_size
+
+
+def _read_full(handle: Any, view: memoryview) -> int:
+    """Fill `view` unless EOF comes first; raw reads may return short."""
+    filled = 0
+    total = len(view)
+    while filled < total:
+        count = handle.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def _chunk_digests(view: memoryview, start: int, end: int, chunk_size: int, algorithm: str) -> List[str]:
+    digests: List[str] = []
+    for offset in range(start, end, chunk_size):
+        hasher = new_hasher(algorithm)
+        hasher.update(view[offset : min(end, offset + chunk_size)])
+        digests.append(hasher.hexdigest())
+    return digests
+
+
+def _hash_stream(
+    path: Path,
+    algorithms: Sequence[str],
+    chunk_size: int,
+    chunk_algorithm: str,
+) -> FileDigests:
+    hashers = [new_hasher(algorithm) for algorithm in algorithms]
+    chunks: List[str] = []
+    size = 0
+    buffer = bytearray(_buffer_size(chunk_size))
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as handle:
+        while True:
+            count = _read_full(handle, view)
+            if not count:
+                break
+            block = view[:count]
+            for hasher in hashers:
+                hasher.update(block)
+            if chunk_size > 0:
+                chunks.extend(_chunk_digests(block, 0, count, chunk_size, chunk_algorithm))
+            size += count
+            if count < len(view):
+                break
+    return FileDigests(
+        size=size,
+        digests={algorithm: hasher.hexdigest() for algorithm, hasher in zip(algorithms, hashers)},
+        chunks=tuple(chunks),
+    )
+
+
+def _hash_mapped(
+    path: Path,
+    algorithms: Sequence[str],
+    chunk_size: int,
+    chunk_algorithm: str,
+    parallel: bool,
+) -> FileDigests:
+    hashers = [new_hasher(algorithm) for algorithm in algorithms]
+    chunks: List[str] = []
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        size = len(mapped)
+        with memoryview(mapped) as view:
+            futures = []
+            split = parallel and chunk_size > 0 and size >= HASH_PARALLEL_MIN_BYTES
+            if split:
+                # Chunk ranges go to the pool while this thread streams the
+                # whole-file digests over the same mapping.
+                step = max(1, _PARALLEL_TASK_BYTES // chunk_size) * chunk_size
+                futures = [
+                    _EXECUTOR.submit(_chunk_digests, view, start, min(size, start + step), chunk_size, chunk_algorithm)
+                    for start in range(0, size, step)
+                ]
+            try:
+                step = _buffer_size(chunk_size)
+                for start in range(0, size, step):
+                    end = min(size, start + step)
+                    for hasher in hashers:
+                        hasher.update(view[start:end])
+                    if chunk_size > 0 and not split:
+                        chunks.extend(_chunk_digests(view, start, end, chunk_size, chunk_algorithm))
+            finally:
+                # The mapping cannot be closed while a task still reads it.
+                wait(futures)
+            for future in futures:
+                chunks.extend(future.result())
+    return FileDigests(
+        size=size,
+        digests={algorithm: hasher.hexdigest() for algorithm, hasher in zip(algorithms, hashers)},
+        chunks=tuple(chunks),
+    )
+
+
+def hash_file(
+    path: Path,
+    algorithms: Iterable[str] = ("sha256",),
+    chunk_size: int = 0,
+    chunk_algorithm: str = "sha256",
+    parallel: bool = True,
+) -> FileDigests:
+    """
+    Whole-file digests for every algorithm in `algorithms` and, when
+    `chunk_size` is set, a `chunk_algorithm` digest per chunk, all from a
+    single read of the file. Large files are memory-mapped and, with
+    `parallel`, their chunk digests are split across the shared hash pool.
+    """
+    algorithms = tuple(dict.fromkeys(algorithms))
+    if path.stat().st_size >= _MMAP_MIN_BYTES:
+        return _hash_mapped(path, algorithms, chunk_size, chunk_algorithm, parallel)
+    return _hash_stream(path, algorithms, chunk_size, chunk_algorithm)
+
+
+def sha256_file(path: Path) -> str:
+    return hash_file(path).digests["sha256"]
+
+
+def verify_chunks(
+    path: Path,
+    expected: Sequence[Optional[str]],
+    chunk_size: int,
+    algorithm: str = "sha256",
+) -> List[int]:
+    """Indexes of chunks whose digest differs from `expected` (or are missing)."""
+    actual = hash_file(path, (), chunk_size=chunk_size, chunk_algorithm=algorithm).chunks
+    mismatched: List[int] = []
+    for index, digest in enumerate(expected):
+        if not digest:
+            continue
+        if index >= len(actual) or actual[index] != str(digest).lower():
+            mismatched.append(index)
+    return mismatched
+
+
+def verify_chunk_ranges(
+    path: Path,
+    expected: Sequence[Tuple[int, int, Optional[str]]],
+    algorithm: str = "sha256",
+) -> List[int]:
+    """Like `verify_chunks` for variable-size chunks given as (offset, size, digest)."""
+    mismatched: List[int] = []
+    with path.open("rb") as handle:
+        for index, (offset, size, digest) in enumerate(expected):
+            if not digest:
+                continue
+            handle.seek(offset)
+            data = handle.read(size)
+            hasher = new_hasher(algorithm)
+            hasher.update(data)
+            if len(data) != size or hasher.hexdigest() != str(digest).lower():
+                mismatched.append(index)
+    return mismatched
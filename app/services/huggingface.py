@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import threading
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote, unquote
 
+import httpx
 import requests
 import time
+from requests.adapters import HTTPAdapter
 
 from ..core.config import (
     HF_CONNECT_TIMEOUT_SECONDS,
     HF_MAX_RETRIES,
     HF_CHUNK_MODE,
     HF_CHUNK_PATH_TEMPLATE,
+    HF_PROXY_COALESCE_MAX_BYTES,
+    HF_PROXY_HTTP2,
+    HF_PROXY_KEEPALIVE_SECONDS,
+    HF_PROXY_MAX_CONNECTIONS,
+    HF_PROXY_MAX_KEEPALIVE,
+    HF_PROXY_STREAM_BLOCK_BYTES,
     HF_REPO_ID,
     HF_REPO_TYPE,
     HF_RETRY_BACKOFF_SECONDS,
@@ -38,6 +49,183 @@ def _encode_path(path: str) -> str:
     return "/".join(segments)
 
 
+_SYNC_SESSION_LOCK = threading.Lock()
+_SYNC_SESSION: Optional[requests.Session] = None
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+# Blocks a coalesced upstream read may run ahead of its slowest reader.
+_SHARED_READ_AHEAD_BLOCKS = 4
+# (url, range) -> upstream transfer shared by concurrent identical chunk requests.
+_INFLIGHT: Dict[Tuple[str, str], "_SharedChunkTransfer"] = {}
+
+
+def _sync_session() -> requests.Session:
+    global _SYNC_SESSION
+    if _SYNC_SESSION is None:
+        with _SYNC_SESSION_LOCK:
+            if _SYNC_SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=max(1, HF_PROXY_MAX_KEEPALIVE),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SYNC_SESSION = session
+    return _SYNC_SESSION
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Process-wide pooled client; created lazily on the serving event loop."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            http2=HF_PROXY_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=max(1, HF_PROXY_MAX_CONNECTIONS),
+                max_keepalive_connections=max(0, HF_PROXY_MAX_KEEPALIVE),
+                keepalive_expiry=max(1.0, HF_PROXY_KEEPALIVE_SECONDS),
+            ),
+            timeout=httpx.Timeout(
+                max(1, HF_TIMEOUT_SECONDS),
+                connect=max(1, HF_CONNECT_TIMEOUT_SECONDS),
+            ),
+            follow_redirects=True,
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_client() -> None:
+    global _ASYNC_CLIENT
+    client = _ASYNC_CLIENT
+    _ASYNC_CLIENT = None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class HuggingFaceChunkStream:
+    """An upstream chunk body plus the headers worth forwarding to the client."""
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        blocks: AsyncIterator[bytes],
+        on_close: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        self.headers = headers
+        self._blocks = blocks
+        self._on_close = on_close
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            async for block in self._blocks:
+                if block:
+                    yield block
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Release the upstream side; safe to call more than once."""
+        on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            await on_close()
+
+
+def _forward_headers(response: httpx.Response) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if response.headers.get("Content-Length"):
+        headers["Content-Length"] = response.headers["Content-Length"]
+    return headers
+
+
+class _SharedChunkTransfer:
+    """
+    One upstream read fanned out to every request for the same (url, range).
+    Blocks are kept until the transfer ends (late joiners start from the
+    first block), so this is only used for chunks up to
+    HF_PROXY_COALESCE_MAX_BYTES. The pump reads at most
+    _SHARED_READ_AHEAD_BLOCKS ahead of the slowest attached reader and is
+    cancelled once every reader has gone.
+    """
+
+    def __init__(self) -> None:
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.blocks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+        self._advanced = asyncio.Event()
+        # reader id -> index of the next block it will take
+        self._positions: Dict[int, int] = {}
+        self._next_reader = 0
+
+    def _notify(self) -> None:
+        changed = self._changed
+        self._changed = asyncio.Event()
+        changed.set()
+
+    def _notify_pump(self) -> None:
+        advanced = self._advanced
+        self._advanced = asyncio.Event()
+        advanced.set()
+
+    def attach(self) -> int:
+        reader = self._next_reader
+        self._next_reader += 1
+        self._positions[reader] = 0
+        return reader
+
+    def detach(self, reader: int) -> None:
+        if self._positions.pop(reader, None) is None:
+            return
+        self._notify_pump()
+        if not self._positions and not self.done and self.task is not None:
+            # Nobody is left to read the rest.
+            self.task.cancel()
+
+    async def wait_for_readers(self) -> None:
+        """Block the pump while the slowest reader is a full read-ahead behind."""
+        while self._positions and len(self.blocks) - min(self._positions.values()) >= _SHARED_READ_AHEAD_BLOCKS:
+            await self._advanced.wait()
+
+    def append(self, block: bytes) -> None:
+        self.blocks.append(block)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _advance(self, reader: int, index: int) -> None:
+        if reader in self._positions:
+            self._positions[reader] = index
+            self._notify_pump()
+
+    async def iter_blocks(self, reader: int) -> AsyncIterator[bytes]:
+        index = 0
+        try:
+            while True:
+                changed = self._changed
+                while index < len(self.blocks):
+                    # The caller is back for more, so everything before `index` is consumed.
+                    self._advance(reader, index)
+                    yield self.blocks[index]
+                    index += 1
+                self._advance(reader, index)
+                if self.done:
+                    if self.error is not None:
+                        raise HuggingFaceChunkError(f"Hugging Face stream failed: {self.error}")
+                    return
+                await changed.wait()
+        finally:
+            self.detach(reader)
+
+
 def _apply_template(template: str, mapping: Dict[str, str]) -> str:
     output = template
     for key, value in mapping.items():
@@ -100,7 +288,7 @@ class HuggingFaceChunkFetcher:
 
         for attempt in range(1, max_retries + 1):
             try:
-                return requests.get(
+                return _sync_session().get(
                     url,
                     headers=headers,
                     stream=True,
@@ -135,7 +323,7 @@ class HuggingFaceChunkFetcher:
         response.close()
         raise HuggingFaceChunkError(f"Hugging Face returned {response.status_code}")
 
-    def get_chunk_response(
+    def _chunk_request_plan(
         self,
         game_id: str,
         slug: str,
@@ -144,10 +332,14 @@ class HuggingFaceChunkFetcher:
         chunk_index: int,
         size: int,
         chunk_size: int,
-    ) -> Optional[requests.Response]:
-        if not self.enabled():
-            return None
-
+        offset: Optional[int] = None,
+    ) -> List[Tuple[str, Optional[str], bool]]:
+        """
+        Upstream attempts for a chunk as (path, range_header, final) tuples;
+        a 404 on a `final` attempt ends the lookup. `offset` is the chunk's
+        position in the file when the manifest records one (content-defined
+        chunks); otherwise chunks are assumed to be `chunk_size` apart.
+        """
         mapping = {
             "game_id": game_id,
             "slug": slug,
@@ -156,6 +348,7 @@ class HuggingFaceChunkFetcher:
             "file_path": _normalize_path(file_path),
         }
 
+        plan: List[Tuple[str, Optional[str], bool]] = []
         mode = HF_CHUNK_MODE.lower().strip()
         normalized_path = mapping["file_path"]
         if mode == "file" or (mode == "auto" and (HF_CHUNK_PATH_TEMPLATE or normalized_path.endswith(".zip"))):
@@ -163,17 +356,168 @@ class HuggingFaceChunkFetcher:
                 chunk_path = self._build_chunk_path(mapping)
             else:
                 chunk_path = normalized_path
-            response = self._request(chunk_path)
-            if response is not None or mode == "file":
-                return response
+            plan.append((chunk_path, None, mode == "file"))
+            if mode == "file":
+                return plan
 
         if mode in ("range", "auto"):
             hf_file_path = self._build_file_path(file_path, mapping)
-            offset = chunk_index * chunk_size
+            if offset is None:
+                offset = chunk_index * chunk_size
             end = offset + size - 1
-            return self._request(hf_file_path, range_header=f"bytes={offset}-{end}")
+            plan.append((hf_file_path, f"bytes={offset}-{end}", True))
+            return plan
 
         raise HuggingFaceChunkError(f"Unsupported HF_CHUNK_MODE: {HF_CHUNK_MODE}")
 
+    def get_chunk_response(
+        self,
+        game_id: str,
+        slug: str,
+        file_id: str,
+        file_path: str,
+        chunk_index: int,
+        size: int,
+        chunk_size: int,
+        offset: Optional[int] = None,
+    ) -> Optional[requests.Response]:
+        if not self.enabled():
+            return None
+
+        plan = self._chunk_request_plan(game_id, slug, file_id, file_path, chunk_index, size, chunk_size, offset)
+        for path, range_header, final in plan:
+            response = self._request(path, range_header=range_header)
+            if response is not None or final:
+                return response
+        return None
+
+    async def _async_request_once(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        client = _async_client()
+        max_retries = max(1, HF_MAX_RETRIES)
+        last_exc: Optional[Exception] = None
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                request = client.build_request("GET", url, headers=headers)
+                return await client.send(request, stream=True)
+            except httpx.HTTPError as exc:
+                last_exc = exc
+                if attempt < max_retries:
+                    backoff = max(0.0, HF_RETRY_BACKOFF_SECONDS) * attempt
+                    if backoff > 0:
+                        await asyncio.sleep(backoff)
+                    continue
+                break
+
+        raise HuggingFaceChunkError(
+            f"Hugging Face request failed after {max_retries} attempts: {last_exc}"
+        )
+
+    async def _async_request(self, path: str, range_header: Optional[str] = None) -> Optional[httpx.Response]:
+        url = f"{self._base_url().rstrip('/')}/{_encode_path(path)}"
+        headers = self._headers(range_header)
+        response = await self._async_request_once(url, headers)
+        if response.status_code in (401, 403) and headers.get("Authorization"):
+            await response.aclose()
+            response = await self._async_request_once(url, self._headers(range_header, use_auth=False))
+        if response.status_code in (200, 206):
+            return response
+        await response.aclose()
+        if response.status_code == 404:
+            return None
+        raise HuggingFaceChunkError(f"Hugging Face returned {response.status_code}")
+
+    async def _async_open_plan(self, plan: List[Tuple[str, Optional[str], bool]]) -> Optional[httpx.Response]:
+        for path, range_header, final in plan:
+            response = await self._async_request(path, range_header=range_header)
+            if response is not None or final:
+                return response
+        return None
+
+    async def _pump_shared(
+        self,
+        key: Tuple[str, str],
+        plan: List[Tuple[str, Optional[str], bool]],
+        shared: _SharedChunkTransfer,
+    ) -> None:
+        response: Optional[httpx.Response] = None
+        try:
+            response = await self._async_open_plan(plan)
+            shared.ready.set_result(_forward_headers(response) if response is not None else None)
+            if response is not None:
+                async for block in response.aiter_bytes(max(4096, HF_PROXY_STREAM_BLOCK_BYTES)):
+                    shared.append(block)
+                    await shared.wait_for_readers()
+            shared.finish()
+        except asyncio.CancelledError as exc:
+            if not shared.ready.done():
+                shared.ready.cancel()
+            shared.finish(exc)
+            raise
+        except Exception as exc:
+            if not shared.ready.done():
+                shared.ready.set_exception(exc)
+            shared.finish(exc)
+        finally:
+            if _INFLIGHT.get(key) is shared:
+                _INFLIGHT.pop(key, None)
+            if response is not None:
+                await response.aclose()
+
+    async def open_chunk_stream(
+        self,
+        game_id: str,
+        slug: str,
+        file_id: str,
+        file_path: str,
+        chunk_index: int,
+        size: int,
+        chunk_size: int,
+        offset: Optional[int] = None,
+    ) -> Optional[HuggingFaceChunkStream]:
+        """
+        Async counterpart of get_chunk_response() on the shared pooled client.
+        The body is pulled from upstream only as fast as the caller consumes
+        it, and concurrent requests for the same small chunk share one
+        upstream transfer, paced by the slowest of them.
+        """
+        if not self.enabled():
+            return None
+
+        plan = self._chunk_request_plan(game_id, slug, file_id, file_path, chunk_index, size, chunk_size, offset)
+        block_size = max(4096, HF_PROXY_STREAM_BLOCK_BYTES)
+
+        if size > HF_PROXY_COALESCE_MAX_BYTES:
+            response = await self._async_open_plan(plan)
+            if response is None:
+                return None
+            return HuggingFaceChunkStream(
+                _forward_headers(response),
+                response.aiter_bytes(block_size),
+                response.aclose,
+            )
+
+        key = ("|".join(path for path, _, _ in plan), "|".join(str(rng) for _, rng, _ in plan))
+        shared = _INFLIGHT.get(key)
+        if shared is None:
+            shared = _SharedChunkTransfer()
+            _INFLIGHT[key] = shared
+            shared.task = asyncio.get_running_loop().create_task(self._pump_shared(key, plan, shared))
+
+        reader = shared.attach()
+        try:
+            headers = await asyncio.shield(shared.ready)
+        except BaseException:
+            shared.detach(reader)
+            raise
+        if headers is None:
+            shared.detach(reader)
+            return None
+
+        async def _detach() -> None:
+            shared.detach(reader)
+
+        return HuggingFaceChunkStream(dict(headers), shared.iter_blocks(reader), _detach)
+
 
 huggingface_fetcher = HuggingFaceChunkFetcher()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from ..core.config import INSTALL_DIGEST_CACHE_DIR
+
+_MAGIC = b"OTODIG01"
+_HEADER = struct.Struct("<8sI")
+# path length, size, mtime_ns, inode, digest count
+_RECORD = struct.Struct("<HQqQB")
+# algorithm name length, digest length
+_DIGEST = struct.Struct("<BB")
+# Files modified this recently are hashed but not cached: a write landing in
+# the same mtime tick would otherwise go unnoticed on the next scan.
+_RACY_WINDOW_NS = 2_000_000_000
+
+# (size, mtime_ns, inode)
+_StatKey = Tuple[int, int, int]
+
+
+def _stat_key(st: os.stat_result) -> _StatKey:
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class InstallDigestCache:
+    """
+    Content digests of one install tree, keyed by relative path and valid
+    while the file's (size, mtime_ns, inode) are unchanged. Persisted as a
+    compact binary sidecar so repeated verify / self-heal scans only hash
+    files that changed since the last run. Safe to share between threads.
+    """
+
+    def __init__(self, root: Path, sidecar: Optional[Path]) -> None:
+        self.root = root
+        self.sidecar = sidecar
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[_StatKey, Dict[str, bytes]]] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def digest(self, path: Path, algorithm: str, compute: Callable[[Path], str]) -> str:
+        """Hex digest of `path`, from the cache when the file is unchanged."""
+        return self.digests(path, (algorithm,), lambda target, _: {algorithm: compute(target)})[algorithm]
+
+    def digests(
+        self,
+        path: Path,
+        algorithms: Sequence[str],
+        compute: Callable[[Path, Tuple[str, ...]], Dict[str, str]],
+    ) -> Dict[str, str]:
+        """
+        Hex digests of `path` for every algorithm; the ones not cached for
+        the file's current stat are produced by a single `compute` call.
+        """
+        rel = self._relative(path)
+        before = _stat_key(path.stat())
+        with self._lock:
+            entry = self._entries.get(rel)
+            cached = entry[1] if entry is not None and entry[0] == before else {}
+            missing = tuple(algorithm for algorithm in algorithms if algorithm not in cached)
+            if not missing:
+                self.hits += 1
+                return {algorithm: cached[algorithm].hex() for algorithm in algorithms}
+            self.misses += 1
+            result = {algorithm: cached[algorithm].hex() for algorithm in algorithms if algorithm in cached}
+
+        computed = compute(path, missing)
+        result.update(computed)
+        try:
+            after = path.stat()
+        except OSError:
+            return result
+        if _stat_key(after) != before or time.time_ns() - after.st_mtime_ns < _RACY_WINDOW_NS:
+            return result
+        with self._lock:
+            entry = self._entries.get(rel)
+            digests = dict(entry[1]) if entry is not None and entry[0] == before else {}
+            for algorithm, value in computed.items():
+                digests[algorithm] = bytes.fromhex(value)
+            self._entries[rel] = (before, digests)
+            self._dirty = True
+        return result
+
+    # --- sidecar ---
+    def load(self) -> bool:
+        if self.sidecar is None:
+            return False
+        try:
+            raw = self.sidecar.read_bytes()
+        except OSError:
+            return False
+        entries: Dict[str, Tuple[_StatKey, Dict[str, bytes]]] = {}
+        try:
+            magic, count = _HEADER.unpack_from(raw, 0)
+            if magic != _MAGIC:
+                return False
+            offset = _HEADER.size
+            for _ in range(count):
+                path_len, size, mtime_ns, inode, digest_count = _RECORD.unpack_from(raw, offset)
+                offset += _RECORD.size
+                rel = raw[offset : offset + path_len].decode("utf-8")
+                offset += path_len
+                digests: Dict[str, bytes] = {}
+                for _ in range(digest_count):
+                    name_len, value_len = _DIGEST.unpack_from(raw, offset)
+                    offset += _DIGEST.size
+                    name = raw[offset : offset + name_len].decode("ascii")
+                    offset += name_len
+                    digests[name] = raw[offset : offset + value_len]
+                    offset += value_len
+                entries[rel] = ((size, mtime_ns, inode), digests)
+        except (struct.error, UnicodeDecodeError) as exc:
+            print(f"[DigestCache] Ignoring unreadable sidecar {self.sidecar}: {exc}")
+            return False
+        with self._lock:
+            self._entries = entries
+            self._dirty = False
+        return True
+
+    def save(self) -> None:
+        """Write the sidecar if anything changed; failures only cost a re-hash."""
+        if self.sidecar is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._entries.items())
+            self._dirty = False
+        parts = [_HEADER.pack(_MAGIC, len(entries))]
+        for rel, ((size, mtime_ns, inode), digests) in entries:
+            encoded = rel.encode("utf-8")
+            parts.append(_RECORD.pack(len(encoded), size, mtime_ns, inode, len(digests)))
+            parts.append(encoded)
+            for name, value in digests.items():
+                parts.append(_DIGEST.pack(len(name), len(value)))
+                parts.append(name.encode("ascii"))
+                parts.append(value)
+        temp = self.sidecar.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.sidecar.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_bytes(b"".join(parts))
+            os.replace(temp, self.sidecar)
+        except OSError as exc:
+            print(f"[DigestCache] Failed to write {self.sidecar}: {exc}")
+            with self._lock:
+                self._dirty = True
+
+
+def _sidecar_path(root: Path) -> Optional[Path]:
+    if not INSTALL_DIGEST_CACHE_DIR:
+        return None
+    key = hashlib.sha1(os.path.normcase(str(root)).encode("utf-8")).hexdigest()
+    return Path(INSTALL_DIGEST_CACHE_DIR) / f"{key}.digests"
+
+
+def load_install_digest_cache(install_root: Path) -> InstallDigestCache:
+    """Digest cache for `install_root`, primed from its sidecar if one exists."""
+    cache = InstallDigestCache(install_root, _sidecar_path(install_root.resolve()))
+    cache.load()
+    return cache
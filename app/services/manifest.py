@@ -1,14 +1,31 @@
 import json
 import math
+import os
+from contextlib import contextmanager
 from hashlib import sha1, sha256
 from pathlib import Path
-from typing import Dict, List, Optional
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
 
-from ..core.config import CDN_FALLBACK_URLS, CDN_PRIMARY_URLS, MANIFEST_CACHE_DIR, MANIFEST_SOURCE_DIR
+from ..core.config import (
+    CDN_FALLBACK_URLS,
+    CDN_PRIMARY_URLS,
+    MANIFEST_CACHE_DIR,
+    MANIFEST_CHUNKING,
+    MANIFEST_SOURCE_DIR,
+)
+from ..core.file_lock import file_lock
+from ..db import SessionLocal
 from ..models import Game
 from ..services.cdn import iter_chunk_bytes
-from ..services.manifest_builder import ManifestBuilder
+from ..services.manifest_builder import (
+    ManifestBuilder,
+    load_manifest_file,
+    read_manifest_chunk_hashes,
+    read_manifest_summary,
+)
 from ..services.chunk_manifests import build_chunk_manifest
+from ..services.chunk_store import annotate_manifest_delta, register_manifest_chunks
 from .native_core import get_native_core
 
 CHUNK_SIZE = 1024 * 1024
@@ -18,6 +35,10 @@ CACHE_DIR = MANIFEST_CACHE_DIR.strip()
 PRIMARY_URLS = [url.strip() for url in CDN_PRIMARY_URLS if url.strip()]
 FALLBACK_URLS = [url.strip() for url in CDN_FALLBACK_URLS if url.strip()]
 
+_BUILD_LOCKS_GUARD = Lock()
+_BUILD_LOCKS: Dict[str, Lock] = {}
+_ACTIVE_BUILDS: Dict[str, ManifestBuilder] = {}
+
 
 def _hash_text(value: str) -> str:
     return sha256(value.encode("utf-8")).hexdigest()
@@ -111,16 +132,19 @@ def _enrich_native_manifest(game: Game, manifest: Dict) -> Dict:
             index = int(chunk.get("index", 0))
             size = int(chunk.get("size", 0))
             url, fallbacks = _build_chunk_urls(game.id, file_id, index, size)
-            chunks.append(
-                {
-                    "index": index,
-                    "hash": chunk.get("hash"),
-                    "size": size,
-                    "url": url,
-                    "fallback_urls": fallbacks,
-                    "compression": chunk.get("compression", "none"),
-                }
-            )
+            enriched = {
+                "index": index,
+                "hash": chunk.get("hash"),
+                "size": size,
+                "url": url,
+                "fallback_urls": fallbacks,
+                "compression": chunk.get("compression", "none"),
+            }
+            if "offset" in chunk:
+                enriched["offset"] = int(chunk["offset"])
+            if chunk.get("in_base"):
+                enriched["in_base"] = True
+            chunks.append(enriched)
 
         files.append(
             {
@@ -145,6 +169,64 @@ def _enrich_native_manifest(game: Game, manifest: Dict) -> Dict:
     return manifest
 
 
+@contextmanager
+def _slug_build_lock(slug: str, cache_dir: Path) -> Iterator[None]:
+    """
+    One builder per slug at a time, across threads and worker processes:
+    they all share the slug's next/output/base files in `cache_dir`.
+    """
+    with _BUILD_LOCKS_GUARD:
+        lock = _BUILD_LOCKS.setdefault(slug, Lock())
+    with lock, file_lock(cache_dir / f"{slug}.lock"):
+        yield
+
+
+def get_manifest_build_progress(slug: str) -> Optional[Dict]:
+    builder = _ACTIVE_BUILDS.get(slug)
+    return builder.progress.snapshot() if builder is not None else None
+
+
+def _register_chunks(game: Game, manifest: Dict) -> None:
+    try:
+        with SessionLocal() as db:
+            added = register_manifest_chunks(db, game.id, game.slug, manifest)
+        print(f"[Manifest] {game.slug}: {added} chunks recorded in the chunk store")
+    except Exception as exc:
+        print(f"[Manifest] Chunk store update failed for {game.slug}: {exc}")
+
+
+def _build_python_manifest(game: Game, source_dir: Path, cache_dir: Path) -> Optional[Dict]:
+    """
+    Incremental build into `<slug>.manifest.ndjson`. When the content changes,
+    the previous build is kept as `<slug>.base.ndjson` and the new manifest
+    marks the chunks it shares with it.
+    """
+    output_path = cache_dir / f"{game.slug}.manifest.ndjson"
+    base_path = cache_dir / f"{game.slug}.base.ndjson"
+    next_path = cache_dir / f"{game.slug}.next.ndjson"
+    with _slug_build_lock(game.slug, cache_dir):
+        previous = read_manifest_summary(output_path) or {}
+        builder = ManifestBuilder(CHUNK_SIZE, chunking=MANIFEST_CHUNKING)
+        _ACTIVE_BUILDS[game.slug] = builder
+        try:
+            summary = builder.build_to_file(game.id, "1.0.0", source_dir, next_path, previous_path=output_path)
+        finally:
+            _ACTIVE_BUILDS.pop(game.slug, None)
+        changed = summary.get("content_id") != previous.get("content_id")
+        if changed and output_path.exists():
+            os.replace(output_path, base_path)
+        os.replace(next_path, output_path)
+        manifest = load_manifest_file(output_path)
+        if manifest is not None and changed:
+            _register_chunks(game, manifest)
+        base_summary = read_manifest_summary(base_path) if manifest is not None else None
+        # Only the base's chunk hashes are needed, not its entries.
+        base_hashes = read_manifest_chunk_hashes(base_path) if base_summary is not None else None
+    if manifest is None:
+        return None
+    return annotate_manifest_delta(manifest, base_hashes, base_summary)
+
+
 def _native_manifest(game: Game) -> Optional[Dict]:
     if not SOURCE_DIR:
         return None
@@ -153,13 +235,14 @@ def _native_manifest(game: Game) -> Optional[Dict]:
     if not source_dir.is_dir():
         return None
 
+    cache_dir = Path(CACHE_DIR)
     core = get_native_core()
     if not core:
-        builder = ManifestBuilder(CHUNK_SIZE)
-        manifest = builder.build_manifest(game.id, "1.0.0", source_dir)
+        manifest = _build_python_manifest(game, source_dir, cache_dir)
+        if manifest is None:
+            return None
         return _enrich_native_manifest(game, manifest)
 
-    cache_dir = Path(CACHE_DIR)
     cache_dir.mkdir(parents=True, exist_ok=True)
     output_path = cache_dir / f"{game.slug}.json"
     core.build_manifest(str(source_dir), str(output_path), CHUNK_SIZE)
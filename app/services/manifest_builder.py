@@ -1,60 +1,423 @@
 import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ..core.config import HASH_MAX_WORKERS
+from .content_chunking import ChunkParams, chunk_file, native_cut_available
+from .file_hashing import hash_file
+
+_WALK_WORKERS = 4
+# Hashed entries kept in flight per worker; results are written in walk order.
+_WINDOW_PER_WORKER = 4
+
+
+@dataclass
+class ManifestBuildProgress:
+    started_at: float = field(default_factory=time.time)
+    files_discovered: int = 0
+    files_done: int = 0
+    files_reused: int = 0
+    bytes_discovered: int = 0
+    bytes_done: int = 0
+    bytes_hashed: int = 0
+    walk_finished: bool = False
+    finished: bool = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(0.0, time.time() - self.started_at)
+        return {
+            "files_discovered": self.files_discovered,
+            "files_done": self.files_done,
+            "files_reused": self.files_reused,
+            "bytes_discovered": self.bytes_discovered,
+            "bytes_done": self.bytes_done,
+            "bytes_hashed": self.bytes_hashed,
+            "walk_finished": self.walk_finished,
+            "finished": self.finished,
+            "elapsed_seconds": round(elapsed, 3),
+            "hash_bytes_per_second": int(self.bytes_hashed / elapsed) if elapsed > 0 else 0,
+        }
+
+
+def _scan_directory(path: str) -> Tuple[List[Tuple[str, os.stat_result]], List[str]]:
+    files: List[Tuple[str, os.stat_result]] = []
+    directories: List[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda item: item.name):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file():
+                        files.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, directories
+
+
+def _file_lines(path: Path) -> Iterator[Dict[str, Any]]:
+    """Parsed NDJSON records of `path`; a torn final line is skipped."""
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+    except OSError:
+        return
+
+
+def load_manifest_file(path: Path) -> Optional[Dict]:
+    """Manifest dict from an NDJSON file written by `ManifestBuilder.build_to_file`."""
+    manifest: Optional[Dict] = None
+    files: List[Dict] = []
+    for record in _file_lines(path):
+        kind = record.get("type")
+        if kind == "header":
+            manifest = dict(record.get("manifest") or {})
+        elif kind == "file" and isinstance(record.get("file"), dict):
+            files.append(record["file"])
+        elif kind == "footer" and manifest is not None:
+            manifest.update(record.get("summary") or {})
+    if manifest is None:
+        return None
+    manifest["files"] = files
+    return manifest
+
+
+def read_manifest_chunk_hashes(path: Path) -> Set[str]:
+    """Every chunk hash of an NDJSON manifest, without loading its entries."""
+    hashes: Set[str] = set()
+    for record in _file_lines(path):
+        entry = record.get("file") if record.get("type") == "file" else None
+        if not isinstance(entry, dict):
+            continue
+        for chunk in entry.get("chunks") or []:
+            if isinstance(chunk, dict) and chunk.get("hash"):
+                hashes.add(str(chunk["hash"]))
+    return hashes
+
+
+def read_manifest_summary(path: Path) -> Optional[Dict]:
+    """Footer fields of a finished NDJSON manifest, read from the file's tail."""
+    try:
+        with path.open("rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            handle.seek(max(0, handle.tell() - 64 * 1024))
+            tail = handle.read()
+    except OSError:
+        return None
+    for line in reversed(tail.splitlines()):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get("type") == "footer":
+            return record.get("summary")
+        return None
+    return None
+
+
+def _walk_order(path: str) -> Tuple[int, Tuple[str, ...]]:
+    """Sort key matching `ManifestBuilder._walk`: by depth, then directory, then name."""
+    parts = Path(path).parts
+    return len(parts), parts
+
+
+class _PreviousEntries:
+    """
+    File entries of an earlier NDJSON build, read alongside the walk. Both
+    follow `_walk` order, so a single forward pass finds every match without
+    holding the previous manifest in memory.
+    """
+
+    def __init__(self, path: Path, compatible: Callable[[Optional[Dict]], bool]) -> None:
+        self._records = _file_lines(path)
+        self._current: Optional[Tuple[Tuple[int, Tuple[str, ...]], Dict]] = None
+        header = next(self._records, None)
+        if header is None or header.get("type") != "header" or not compatible(header.get("manifest")):
+            self.close()
+            return
+        self._advance()
+
+    def _advance(self) -> None:
+        self._current = None
+        for record in self._records:
+            entry = record.get("file") if record.get("type") == "file" else None
+            if isinstance(entry, dict) and entry.get("path") and entry.get("mtime_ns") is not None:
+                self._current = (_walk_order(str(entry["path"])), entry)
+                return
+
+    def get(self, relative: str) -> Optional[Dict]:
+        key = _walk_order(relative)
+        while self._current is not None and self._current[0] < key:
+            self._advance()
+        if self._current is not None and self._current[0] == key:
+            return self._current[1]
+        return None
+
+    def close(self) -> None:
+        self._current = None
+        self._records.close()
 
 
 class ManifestBuilder:
-    def __init__(self, chunk_size: int = 1024 * 1024) -> None:
+    """
+    `chunking="fixed"` cuts files every `chunk_size` bytes; `"cdc"` cuts at
+    content-defined (FastCDC) boundaries averaging `chunk_size`, so an edit
+    only changes the chunks around it and later chunks keep their hashes.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1024 * 1024,
+        workers: Optional[int] = None,
+        chunking: str = "fixed",
+    ) -> None:
+        if chunking not in ("fixed", "cdc"):
+            raise ValueError(f"Unknown chunking mode: {chunking}")
         self.chunk_size = chunk_size
+        self.workers = max(1, workers or HASH_MAX_WORKERS)
+        self.chunking = chunking
+        self.chunk_params = ChunkParams.for_average(chunk_size) if chunking == "cdc" else None
+        self.progress = ManifestBuildProgress()
 
-    def build_manifest(self, game_id: str, version: str, build_directory: Path) -> Dict:
-        files = []
-        total_size = 0
+    def build_manifest(
+        self,
+        game_id: str,
+        version: str,
+        build_directory: Path,
+        previous: Optional[Dict] = None,
+    ) -> Dict:
+        files: List[Dict] = []
+        reusable: Dict[str, Dict] = {}
+        if previous and self._compatible(previous):
+            reusable = {
+                str(entry.get("path")): entry
+                for entry in previous.get("files") or []
+                if isinstance(entry, dict) and entry.get("mtime_ns") is not None
+            }
+        summary = self._build(game_id, version, build_directory, reusable.get, files.append)
+        return {**summary, "files": files}
+
+    def build_to_file(
+        self,
+        game_id: str,
+        version: str,
+        build_directory: Path,
+        output_path: Path,
+        previous_path: Optional[Path] = None,
+    ) -> Dict:
+        """
+        Streams the manifest to `output_path` as NDJSON (header, one line per
+        file, footer) instead of holding it in memory. Entries of the previous
+        output (`previous_path`, default `output_path`), or of an interrupted
+        build's `.partial` file, are reused for files whose size and mtime are
+        unchanged; both are read alongside the walk rather than loaded.
+        Returns the header/footer fields without `files`.
+        """
+        partial_path = output_path.with_name(f"{output_path.name}.partial")
+        resume_path = output_path.with_name(f"{output_path.name}.resume")
+        if partial_path.exists():
+            os.replace(partial_path, resume_path)
+        sources = [
+            _PreviousEntries(resume_path, self._compatible),
+            _PreviousEntries(previous_path or output_path, self._compatible),
+        ]
+
+        def _reuse(relative: str) -> Optional[Dict]:
+            for source in sources:
+                entry = source.get(relative)
+                if entry is not None:
+                    return entry
+            return None
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with partial_path.open("w", encoding="utf-8") as handle:
+
+                def _write(record: Dict) -> None:
+                    handle.write(json.dumps(record, separators=(",", ":")))
+                    handle.write("\n")
 
-        for file_path in build_directory.rglob("*"):
-            if not file_path.is_file():
-                continue
-            file_info = self._process_file(file_path, build_directory)
-            files.append(file_info)
-            total_size += file_info["size"]
+                def _write_header(header: Dict) -> None:
+                    _write({"type": "header", "manifest": header})
+                    handle.flush()
 
+                summary = self._build(
+                    game_id,
+                    version,
+                    build_directory,
+                    _reuse,
+                    lambda entry: _write({"type": "file", "file": entry}),
+                    on_header=_write_header,
+                )
+                _write({"type": "footer", "summary": summary})
+        finally:
+            for source in sources:
+                source.close()
+        os.replace(partial_path, output_path)
+        resume_path.unlink(missing_ok=True)
+        return summary
+
+    def _compatible(self, header: Optional[Dict]) -> bool:
+        """Whether entries built under `header` used this builder's chunking."""
+        return bool(
+            header
+            and int(header.get("chunk_size") or 0) == self.chunk_size
+            and str(header.get("chunking") or "fixed") == self.chunking
+        )
+
+    def _build(
+        self,
+        game_id: str,
+        version: str,
+        build_directory: Path,
+        reuse: Callable[[str], Optional[Dict]],
+        emit: Callable[[Dict], Any],
+        on_header: Optional[Callable[[Dict], Any]] = None,
+    ) -> Dict:
+        progress = self.progress = ManifestBuildProgress()
         build_id = hashlib.sha256(f"{game_id}{version}".encode("utf-8")).hexdigest()[:16]
-        return {
+        header = {
             "game_id": game_id,
             "version": version,
             "build_id": build_id,
-            "total_size": total_size,
-            "compressed_size": total_size,
             "chunk_size": self.chunk_size,
-            "files": files,
+            "chunking": self.chunking,
         }
+        if self.chunk_params is not None:
+            header["chunk_params"] = self.chunk_params.as_dict()
+        if on_header is not None:
+            on_header(header)
 
-    def _process_file(self, file_path: Path, base_path: Path) -> Dict:
-        relative_path = file_path.relative_to(base_path)
-        size = file_path.stat().st_size
-
-        chunks = []
-        with file_path.open("rb") as handle:
-            index = 0
-            while True:
-                chunk_data = handle.read(self.chunk_size)
-                if not chunk_data:
-                    break
-                chunk_hash = hashlib.sha256(chunk_data).hexdigest()
-                chunks.append(
-                    {
-                        "index": index,
-                        "hash": chunk_hash,
-                        "size": len(chunk_data),
-                        "compression": "none",
-                    }
-                )
-                index += 1
+        total_size = 0
+        file_count = 0
+        window: "deque[Union[Dict, Future]]" = deque()
+        limit = self.workers * _WINDOW_PER_WORKER
+        # Identifies the build's content, unlike build_id which only hashes
+        # game id and version.
+        content_hasher = hashlib.sha256(f"{self.chunking}:{self.chunk_size}\n".encode("utf-8"))
+
+        def _emit_next() -> None:
+            nonlocal total_size, file_count
+            item = window.popleft()
+            entry = item.result() if isinstance(item, Future) else item
+            emit(entry)
+            content_hasher.update(f"{entry['path']}\0{entry['hash']}\n".encode("utf-8"))
+            size = int(entry["size"])
+            total_size += size
+            file_count += 1
+            progress.files_done += 1
+            progress.bytes_done += size
+            if isinstance(item, Future):
+                progress.bytes_hashed += size
 
-        file_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        with self._hash_pool() as pool:
+            for path, st in self._walk(build_directory):
+                relative = os.path.relpath(path, build_directory)
+                progress.files_discovered += 1
+                progress.bytes_discovered += st.st_size
+                previous = reuse(relative)
+                if (
+                    previous is not None
+                    and previous.get("size") == st.st_size
+                    and previous.get("mtime_ns") == st.st_mtime_ns
+                ):
+                    progress.files_reused += 1
+                    window.append(previous)
+                else:
+                    window.append(
+                        pool.submit(_file_entry, Path(path), build_directory, st, self.chunk_size, self.chunk_params)
+                    )
+                while window and (
+                    len(window) >= limit or not isinstance(window[0], Future) or window[0].done()
+                ):
+                    _emit_next()
+            progress.walk_finished = True
+            while window:
+                _emit_next()
+
+        progress.finished = True
         return {
-            "path": str(relative_path),
-            "size": size,
-            "hash": file_hash,
-            "chunks": chunks,
+            **header,
+            "total_size": total_size,
+            "compressed_size": total_size,
+            "file_count": file_count,
+            "content_id": content_hasher.hexdigest()[:32],
+        }
+
+    def _hash_pool(self) -> Executor:
+        """
+        Threads normally: hashing and the native CDC scan release the GIL. The
+        pure-Python boundary scan does not (about 5 MB/s per core), so CDC
+        builds without the native scanner use processes instead.
+        """
+        if self.chunk_params is not None and not native_cut_available() and not getattr(sys, "frozen", False):
+            return ProcessPoolExecutor(max_workers=max(1, min(self.workers, os.cpu_count() or 1)))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="manifest-hash")
+
+    def _walk(self, root: Path) -> Iterator[Tuple[str, os.stat_result]]:
+        """Breadth-first walk, listing each level's directories in parallel."""
+        frontier = [str(root)]
+        with ThreadPoolExecutor(max_workers=_WALK_WORKERS, thread_name_prefix="manifest-walk") as pool:
+            while frontier:
+                next_frontier: List[str] = []
+                for files, directories in pool.map(_scan_directory, frontier):
+                    yield from files
+                    next_frontier.extend(directories)
+                frontier = next_frontier
+
+
+def _file_entry(
+    file_path: Path,
+    base_path: Path,
+    st: Optional[os.stat_result],
+    chunk_size: int,
+    chunk_params: Optional[ChunkParams],
+) -> Dict:
+    """Manifest entry for one file; module-level so a process pool can run it."""
+    relative_path = file_path.relative_to(base_path)
+    st = st or file_path.stat()
+    # Whole-file and per-chunk digests come from the same read.
+    if chunk_params is not None:
+        chunked = chunk_file(file_path, chunk_params, ("sha256",))
+        size, file_hash = chunked.size, chunked.digests["sha256"]
+        spans = [(chunk.offset, chunk.size, chunk.hash) for chunk in chunked.chunks]
+    else:
+        hashed = hash_file(file_path, ("sha256",), chunk_size=chunk_size)
+        size, file_hash = hashed.size, hashed.digests["sha256"]
+        spans = [
+            (index * chunk_size, min(chunk_size, size - index * chunk_size), chunk_hash)
+            for index, chunk_hash in enumerate(hashed.chunks)
+        ]
+
+    chunks = [
+        {
+            "index": index,
+            "offset": offset,
+            "hash": chunk_hash,
+            "size": length,
+            "compression": "none",
         }
+        for index, (offset, length, chunk_hash) in enumerate(spans)
+    ]
+    return {
+        "path": str(relative_path),
+        "size": size,
+        "mtime_ns": st.st_mtime_ns,
+        "hash": file_hash,
+        "chunks": chunks,
+    }
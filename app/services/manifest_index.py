@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ..core.config import CDN_MANIFEST_INDEX_MAX_ENTRIES, CDN_MANIFEST_INDEX_TTL_SECONDS
+
+_DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ManifestIndex:
+    game_id: str
+    build_id: str
+    slug: str
+    chunk_size: int
+    manifest: dict[str, Any]
+    files_by_id: dict[str, dict[str, Any]] = field(repr=False)
+
+    def find_file(self, file_id: str) -> Optional[dict[str, Any]]:
+        return self.files_by_id.get(file_id)
+
+    def find_chunk(self, file_entry: dict[str, Any], chunk_index: int) -> Optional[dict[str, Any]]:
+        chunks = file_entry.get("chunks") or []
+        # Chunks are normally stored in index order; fall back to a scan otherwise.
+        if 0 <= chunk_index < len(chunks):
+            candidate = chunks[chunk_index]
+            if isinstance(candidate, dict) and int(candidate.get("index", -1)) == chunk_index:
+                return candidate
+        for candidate in chunks:
+            if isinstance(candidate, dict) and int(candidate.get("index", -1)) == chunk_index:
+                return candidate
+        return None
+
+
+def build_manifest_index(game_id: str, manifest: dict[str, Any]) -> ManifestIndex:
+    files_by_id: dict[str, dict[str, Any]] = {}
+    for entry in manifest.get("files") or []:
+        if not isinstance(entry, dict):
+            continue
+        file_id = entry.get("file_id")
+        # First entry wins, matching the old linear scan.
+        if file_id and file_id not in files_by_id:
+            files_by_id[str(file_id)] = entry
+    return ManifestIndex(
+        game_id=str(game_id),
+        build_id=str(manifest.get("build_id") or ""),
+        slug=str(manifest.get("slug") or ""),
+        chunk_size=int(manifest.get("chunk_size") or _DEFAULT_CHUNK_SIZE),
+        manifest=manifest,
+        files_by_id=files_by_id,
+    )
+
+
+class ManifestIndexCache:
+    """
+    Per-process LRU of parsed, file_id-indexed manifests. Entries are trusted
+    for `ttl_seconds`; after that the shared cache is re-read and the index is
+    only rebuilt when the build_id changed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, ManifestIndex]]" = OrderedDict()
+
+    def get(self, game_id: str) -> Optional[ManifestIndex]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(game_id)
+            if cached is None:
+                return None
+            checked_at, index = cached
+            if now - checked_at > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(game_id)
+            return index
+
+    def put(self, game_id: str, manifest: dict[str, Any]) -> ManifestIndex:
+        build_id = str(manifest.get("build_id") or "")
+        with self._lock:
+            cached = self._entries.get(game_id)
+        if cached is not None and build_id and cached[1].build_id == build_id:
+            index = cached[1]
+        else:
+            index = build_manifest_index(game_id, manifest)
+        with self._lock:
+            self._entries[game_id] = (time.monotonic(), index)
+            self._entries.move_to_end(game_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, game_id: str) -> None:
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+manifest_index_cache = ManifestIndexCache(
+    CDN_MANIFEST_INDEX_MAX_ENTRIES,
+    CDN_MANIFEST_INDEX_TTL_SECONDS,
+)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from ..core.denuvo import DENUVO_APP_IDS
+
+_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+_BYPASS_CATEGORIES_FILE = _DATA_DIR / "bypass_categories.json"
+_ONLINE_FIX_FILE = _DATA_DIR / "online_fix.json"
+_BYPASS_PRIORITY_CATEGORY_ORDER = ("others", "ea", "ubisoft", "rockstar")
+# How long a built index is trusted before data-file mtimes and the hot list
+# are checked again.
+_RECHECK_SECONDS = 10.0
+
+_INDEX_LOCK = threading.Lock()
+_INDEX: Optional["PriorityIndex"] = None
+_INDEX_CHECKED_AT = 0.0
+
+
+def _ranks(ordered: Iterable[str]) -> Mapping[str, int]:
+    return MappingProxyType({app_id: rank for rank, app_id in enumerate(ordered)})
+
+
+@dataclass(frozen=True)
+class PriorityIndex:
+    """
+    Immutable snapshot of catalog priority: Denuvo titles, bypass categories,
+    online-fix titles and the Steam hot list, in that order. A new object (with
+    a new `version`) is built only when one of the sources changes, so callers
+    can share it and key derived data on `version`.
+    """
+
+    version: str
+    ordered: Tuple[str, ...]
+    hot: Tuple[str, ...]
+    ranks: Mapping[str, int] = field(repr=False)
+    hot_ranks: Mapping[str, int] = field(repr=False)
+    members: FrozenSet[str] = field(repr=False)
+
+    @classmethod
+    def build(cls, signature: str, sources: Iterable[Iterable[Any]], hot: Iterable[str]) -> "PriorityIndex":
+        ordered: List[str] = []
+        seen: set[str] = set()
+        for source in sources:
+            for app_id in source:
+                app_str = str(app_id).strip()
+                if not app_str or app_str in seen:
+                    continue
+                seen.add(app_str)
+                ordered.append(app_str)
+        hot_ids = tuple(str(app_id) for app_id in hot)
+        return cls(
+            version=signature,
+            ordered=tuple(ordered),
+            hot=hot_ids,
+            ranks=_ranks(ordered),
+            hot_ranks=_ranks(hot_ids),
+            members=frozenset(ordered),
+        )
+
+    def restrict(self, scope: Optional[Iterable[str]] = None) -> List[str]:
+        """Priority app ids in priority order, optionally limited to `scope`."""
+        if scope is None:
+            return list(self.ordered)
+        scope_set = scope if isinstance(scope, (set, frozenset)) else set(scope)
+        return [app_id for app_id in self.ordered if app_id in scope_set]
+
+    def prioritize(self, appids: List[str]) -> List[str]:
+        """`appids` deduplicated with priority ids first, in priority order."""
+        appid_set = set(appids)
+        prioritized = [app_id for app_id in self.ordered if app_id in appid_set]
+        seen = set(prioritized)
+        for app_id in appids:
+            if app_id not in seen:
+                prioritized.append(app_id)
+                seen.add(app_id)
+        return prioritized
+
+    def prioritize_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ranks = self.ranks
+        priority_items: list[tuple[int, int, Dict[str, Any]]] = []
+        other_items: list[Dict[str, Any]] = []
+        for index, item in enumerate(items):
+            rank = ranks.get(str(item.get("app_id") or ""))
+            if rank is None:
+                other_items.append(item)
+            else:
+                priority_items.append((rank, index, item))
+        priority_items.sort(key=lambda row: (row[0], row[1]))
+        return [item for _, _, item in priority_items] + other_items
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _normalize_bypass_category_id(category_id: Any) -> str:
+    normalized = str(category_id or "").strip().lower()
+    if normalized in {"other", "others"}:
+        return "others"
+    return normalized
+
+
+def _load_bypass_priority_appids() -> List[str]:
+    try:
+        payload = json.loads(_BYPASS_CATEGORIES_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    appids_by_category: Dict[str, List[str]] = {}
+    categories = payload.get("categories") if isinstance(payload, dict) else None
+    if isinstance(categories, list):
+        for category in categories:
+            if not isinstance(category, dict):
+                continue
+            raw_games = category.get("games")
+            if not isinstance(raw_games, list):
+                continue
+            bucket = appids_by_category.setdefault(_normalize_bypass_category_id(category.get("id")), [])
+            for raw_app_id in raw_games:
+                app_id = str(raw_app_id or "").strip()
+                if app_id and app_id.isdigit():
+                    bucket.append(app_id)
+    ordered: List[str] = []
+    for category_id in _BYPASS_PRIORITY_CATEGORY_ORDER:
+        ordered.extend(appids_by_category.get(category_id, []))
+    return ordered
+
+
+def _load_online_fix_priority_appids() -> List[str]:
+    try:
+        payload = json.loads(_ONLINE_FIX_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    if not isinstance(payload, dict):
+        return []
+    return sorted(
+        (str(app_id).strip() for app_id in payload.keys() if str(app_id).strip().isdigit()),
+        key=lambda value: int(value),
+    )
+
+
+def _signature(hot: Tuple[str, ...]) -> str:
+    parts = [
+        str(_mtime(_BYPASS_CATEGORIES_FILE)),
+        str(_mtime(_ONLINE_FIX_FILE)),
+        str(len(DENUVO_APP_IDS)),
+        ",".join(hot),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def get_priority_index() -> PriorityIndex:
+    """Current priority index; rebuilt only after a source has changed."""
+    global _INDEX, _INDEX_CHECKED_AT
+
+    index = _INDEX
+    if index is not None and time.monotonic() - _INDEX_CHECKED_AT < _RECHECK_SECONDS:
+        return index
+
+    from .steam_catalog import get_hot_appids
+
+    with _INDEX_LOCK:
+        index = _INDEX
+        if index is not None and time.monotonic() - _INDEX_CHECKED_AT < _RECHECK_SECONDS:
+            return index
+        hot = tuple(str(app_id) for app_id in get_hot_appids())
+        signature = _signature(hot)
+        if index is None or index.version != signature:
+            index = PriorityIndex.build(
+                signature,
+                (
+                    DENUVO_APP_IDS,
+                    _load_bypass_priority_appids(),
+                    _load_online_fix_priority_appids(),
+                    hot,
+                ),
+                hot,
+            )
+            _INDEX = index
+        _INDEX_CHECKED_AT = time.monotonic()
+        return index
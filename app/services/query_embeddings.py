@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import (
+    AI_QUERY_EMBEDDING_CACHE_SIZE,
+    AI_QUERY_USAGE_FLUSH_SECONDS,
+    AI_QUERY_USAGE_MAX_PENDING,
+)
+from ..db import SessionLocal
+from ..models import QueryEmbeddingCache
+from .ai_gateway import hash_embedding
+from .vector_store import sync_vector_columns
+
+_QUERY_TEXT_MAX_LENGTH = 300
+_LOOKUP_BATCH = 500
+
+
+class _EmbeddingMemo:
+    """Bounded LRU over `hash_embedding`, which is pure, keyed by (text, dimension)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple[str, int], tuple[float, ...]]" = OrderedDict()
+
+    def get(self, text: str, dimension: int) -> list[float]:
+        key = (text, dimension)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return list(cached)
+        vector = hash_embedding(text, dimension=dimension)
+        with self._lock:
+            self._entries[key] = tuple(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class QueryUsageRecorder:
+    """
+    Collects query-embedding usage in memory and writes it to
+    `query_embedding_cache` from a background thread: new queries are inserted
+    (with their pgvector column) and `last_used_at` is bumped for known ones,
+    once per flush interval rather than once per search.
+    """
+
+    def __init__(self, flush_seconds: float, max_pending: int) -> None:
+        self.flush_seconds = max(0.1, float(flush_seconds))
+        self.max_pending = max(1, int(max_pending))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # query_hash -> (query_text, model, dimension, last_used_at)
+        self._pending: "OrderedDict[str, tuple[str, str, int, datetime]]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, query_hash: str, query_text: str, model: str, dimension: int) -> None:
+        with self._lock:
+            self._pending[query_hash] = (query_text, model, dimension, datetime.utcnow())
+            self._pending.move_to_end(query_hash)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-usage", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"[QueryUsage] Flush failed: {exc}")
+
+    def flush(self) -> int:
+        """
+        Write pending usage now; returns the number of queries written. On
+        failure the batch goes back into the pending set (behind any newer
+        usage) for the next flush, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, OrderedDict()
+            if not pending:
+                return 0
+            try:
+                self._write(pending)
+            except Exception:
+                self._requeue(pending)
+                raise
+            return len(pending)
+
+    def _requeue(self, pending: "OrderedDict[str, tuple[str, str, int, datetime]]") -> None:
+        with self._lock:
+            merged = OrderedDict(pending)
+            for query_hash, usage in self._pending.items():
+                merged.pop(query_hash, None)
+                merged[query_hash] = usage
+            while len(merged) > self.max_pending:
+                merged.popitem(last=False)
+            self._pending = merged
+
+    def _write(self, pending: "OrderedDict[str, tuple[str, str, int, datetime]]") -> None:
+        with SessionLocal() as db:
+            existing = {
+                row.query_hash: row
+                for row in db.query(QueryEmbeddingCache).filter(
+                    QueryEmbeddingCache.query_hash.in_(list(pending))
+                )
+            }
+            refreshed: list[QueryEmbeddingCache] = []
+            inserts: list[dict] = []
+            for query_hash, (query_text, model, dimension, last_used_at) in pending.items():
+                row = existing.get(query_hash)
+                if row is not None and isinstance(row.vector, list) and len(row.vector) == dimension:
+                    row.last_used_at = last_used_at
+                    continue
+                values = {
+                    "query_text": query_text[:_QUERY_TEXT_MAX_LENGTH],
+                    "model": model,
+                    "vector": query_embedding_memo.get(query_text, dimension),
+                    "dimension": dimension,
+                    "last_used_at": last_used_at,
+                }
+                if row is None:
+                    inserts.append({"query_hash": query_hash, **values})
+                    continue
+                for key, value in values.items():
+                    setattr(row, key, value)
+                refreshed.append(row)
+            db.flush()
+            # Another worker may insert the same new query concurrently; its row wins.
+            _insert_ignoring_conflicts(db, inserts)
+
+            synced = [(row.id, row.vector, row.dimension) for row in refreshed]
+            inserted_hashes = [values["query_hash"] for values in inserts]
+            for start in range(0, len(inserted_hashes), _LOOKUP_BATCH):
+                synced.extend(
+                    db.query(QueryEmbeddingCache.id, QueryEmbeddingCache.vector, QueryEmbeddingCache.dimension)
+                    .filter(QueryEmbeddingCache.query_hash.in_(inserted_hashes[start : start + _LOOKUP_BATCH]))
+                    .all()
+                )
+            for dimension in {item[2] for item in synced}:
+                sync_vector_columns(
+                    db,
+                    table_name="query_embedding_cache",
+                    rows=[(row_id, vector) for row_id, vector, row_dimension in synced if row_dimension == dimension],
+                    dimension=dimension,
+                )
+            db.commit()
+
+
+def _insert_ignoring_conflicts(db: Session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in {"postgresql", "sqlite"}:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        statement = dialect_insert(QueryEmbeddingCache).on_conflict_do_nothing(index_elements=["query_hash"])
+        for start in range(0, len(rows), _LOOKUP_BATCH):
+            db.execute(statement, rows[start : start + _LOOKUP_BATCH])
+        return
+    for values in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(QueryEmbeddingCache), [values])
+        except IntegrityError:
+            continue
+
+
+query_embedding_memo = _EmbeddingMemo(AI_QUERY_EMBEDDING_CACHE_SIZE)
+query_usage_recorder = QueryUsageRecorder(AI_QUERY_USAGE_FLUSH_SECONDS, AI_QUERY_USAGE_MAX_PENDING)
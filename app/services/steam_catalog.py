@@ -16,7 +16,7 @@ import requests
 import bleach
 
 from ..core.cache import cache_client
-from ..core.denuvo import DENUVO_APP_IDS, DENUVO_APP_ID_SET
+from ..core.denuvo import DENUVO_APP_ID_SET
 from ..core.config import (
     LUA_FILES_DIR,
     LUA_REMOTE_ONLY,
@@ -31,6 +31,7 @@ from ..core.config import (
     STEAM_WEB_API_KEY,
     STEAM_WEB_API_URL,
 )
+from ..services.priority_index import get_priority_index
 from ..services.remote_game_data import get_lua_appids_from_server
 from ..services.settings import normalize_locale as normalize_ui_locale
 
@@ -103,15 +104,6 @@ _LUA_PACK_INDEX_SIGNATURE: Optional[str] = None
 _LUA_PACK_INDEX: Optional[Dict[str, List[str]]] = None
 _LUA_PACK_CLEANED_LEGACY = False
 _CHUNK_MANIFEST_MAP_FILE = Path(__file__).resolve().parents[1] / "data" / "chunk_manifest_map.json"
-_BYPASS_CATEGORIES_FILE = Path(__file__).resolve().parents[1] / "data" / "bypass_categories.json"
-_ONLINE_FIX_FILE = Path(__file__).resolve().parents[1] / "data" / "online_fix.json"
-_BYPASS_PRIORITY_CATEGORY_ORDER = ("others", "ea", "ubisoft", "rockstar")
-_BYPASS_PRIORITY_CACHE_LOCK = threading.Lock()
-_BYPASS_PRIORITY_CACHE_MTIME: Optional[float] = None
-_BYPASS_PRIORITY_APPIDS: List[str] = []
-_ONLINE_FIX_PRIORITY_CACHE_LOCK = threading.Lock()
-_ONLINE_FIX_PRIORITY_CACHE_MTIME: Optional[float] = None
-_ONLINE_FIX_PRIORITY_APPIDS: List[str] = []
 _MANIFEST_NAME_MAP_LOCK = threading.Lock()
 _MANIFEST_NAME_MAP_SIGNATURE: Optional[str] = None
 _MANIFEST_NAME_MAP: Dict[str, str] = {}
@@ -165,147 +157,12 @@ def get_hot_appids() -> List[str]:
     return appids
 
 
-def _normalize_bypass_category_id(category_id: Any) -> str:
-    normalized = str(category_id or "").strip().lower()
-    if normalized in {"other", "others"}:
-        return "others"
-    return normalized
-
-
-def _get_bypass_priority_appids() -> List[str]:
-    global _BYPASS_PRIORITY_CACHE_MTIME
-    global _BYPASS_PRIORITY_APPIDS
-
-    try:
-        mtime = _BYPASS_CATEGORIES_FILE.stat().st_mtime
-    except OSError:
-        return []
-
-    with _BYPASS_PRIORITY_CACHE_LOCK:
-        if _BYPASS_PRIORITY_CACHE_MTIME == mtime:
-            return list(_BYPASS_PRIORITY_APPIDS)
-
-        appids_by_category: Dict[str, List[str]] = {}
-        try:
-            payload = json.loads(_BYPASS_CATEGORIES_FILE.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            _BYPASS_PRIORITY_CACHE_MTIME = mtime
-            _BYPASS_PRIORITY_APPIDS = []
-            return []
-
-        categories = payload.get("categories")
-        if isinstance(categories, list):
-            for category in categories:
-                if not isinstance(category, dict):
-                    continue
-                category_id = _normalize_bypass_category_id(category.get("id"))
-                raw_games = category.get("games")
-                if not isinstance(raw_games, list):
-                    continue
-                bucket = appids_by_category.setdefault(category_id, [])
-                for raw_app_id in raw_games:
-                    app_id = str(raw_app_id or "").strip()
-                    if app_id and app_id.isdigit():
-                        bucket.append(app_id)
-
-        ordered: List[str] = []
-        seen: set[str] = set()
-        for category_id in _BYPASS_PRIORITY_CATEGORY_ORDER:
-            for app_id in appids_by_category.get(category_id, []):
-                if app_id in seen:
-                    continue
-                seen.add(app_id)
-                ordered.append(app_id)
-
-        _BYPASS_PRIORITY_CACHE_MTIME = mtime
-        _BYPASS_PRIORITY_APPIDS = ordered
-        return list(ordered)
-
-
-def _get_online_fix_priority_appids() -> List[str]:
-    global _ONLINE_FIX_PRIORITY_CACHE_MTIME
-    global _ONLINE_FIX_PRIORITY_APPIDS
-
-    try:
-        mtime = _ONLINE_FIX_FILE.stat().st_mtime
-    except OSError:
-        return []
-
-    with _ONLINE_FIX_PRIORITY_CACHE_LOCK:
-        if _ONLINE_FIX_PRIORITY_CACHE_MTIME == mtime:
-            return list(_ONLINE_FIX_PRIORITY_APPIDS)
-
-        try:
-            payload = json.loads(_ONLINE_FIX_FILE.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            _ONLINE_FIX_PRIORITY_CACHE_MTIME = mtime
-            _ONLINE_FIX_PRIORITY_APPIDS = []
-            return []
-
-        ordered = []
-        if isinstance(payload, dict):
-            ordered = sorted(
-                (str(app_id).strip() for app_id in payload.keys() if str(app_id).strip().isdigit()),
-                key=lambda value: int(value),
-            )
-
-        _ONLINE_FIX_PRIORITY_CACHE_MTIME = mtime
-        _ONLINE_FIX_PRIORITY_APPIDS = ordered
-        return list(ordered)
-
-
-def _build_priority_appids() -> List[str]:
-    ordered: List[str] = []
-    seen: set[str] = set()
-    for source in (
-        DENUVO_APP_IDS,
-        _get_bypass_priority_appids(),
-        _get_online_fix_priority_appids(),
-        get_hot_appids(),
-    ):
-        for app_id in source:
-            app_str = str(app_id).strip()
-            if not app_str or app_str in seen:
-                continue
-            seen.add(app_str)
-            ordered.append(app_str)
-    return ordered
-
-
 def prioritize_appids(appids: List[str]) -> List[str]:
-    seen: set[str] = set()
-    prioritized: list[str] = []
-    appid_set = set(appids)
-    for app_id in _build_priority_appids():
-        if app_id in appid_set and app_id not in seen:
-            prioritized.append(app_id)
-            seen.add(app_id)
-    for app_id in appids:
-        if app_id not in seen:
-            prioritized.append(app_id)
-            seen.add(app_id)
-    return prioritized
+    return get_priority_index().prioritize(appids)
 
 
 def prioritize_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    priority_rank = {
-        app_id: rank for rank, app_id in enumerate(_build_priority_appids())
-    }
-    priority_items: list[tuple[int, int, Dict[str, Any]]] = []
-    other_items: list[tuple[int, Dict[str, Any]]] = []
-
-    for index, item in enumerate(items):
-        app_id = str(item.get("app_id") or "")
-        rank = priority_rank.get(app_id)
-        if rank is None:
-            other_items.append((index, item))
-        else:
-            priority_items.append((rank, index, item))
-
-    priority_items.sort(key=lambda row: (row[0], row[1]))
-    ordered_priority = [item for _, _, item in priority_items]
-    ordered_other = [item for _, item in other_items]
-    return ordered_priority + ordered_other
+    return get_priority_index().prioritize_items(items)
 
 
 def _strip_html(value: Optional[str]) -> Optional[str]:
@@ -856,13 +713,13 @@ def _has_lua_files(lua_dir: Path) -> bool:
 
 def _attempt_lua_sync() -> None:
     try:
-        if cache_client.get("lua:sync_attempt"):
-            return
-        if cache_client.get("lua:sync_in_progress"):
+        if cache_client.get_many(("lua:sync_attempt", "lua:sync_in_progress")):
             return
 
-        cache_client.set("lua:sync_in_progress", "1", ttl=STEAM_CATALOG_CACHE_TTL_SECONDS)
-        cache_client.set("lua:sync_attempt", "1", ttl=STEAM_CATALOG_CACHE_TTL_SECONDS)
+        cache_client.set_many(
+            {"lua:sync_in_progress": "1", "lua:sync_attempt": "1"},
+            ttl=STEAM_CATALOG_CACHE_TTL_SECONDS,
+        )
 
         def _run() -> None:
             try:
@@ -1062,8 +919,9 @@ def get_catalog_page(appids: List[str]) -> List[Dict[str, Any]]:
     summaries: List[Dict[str, Any]] = []
     missing: List[str] = []
     cached_map: Dict[str, Dict[str, Any]] = {}
+    cached_payloads = cache_client.get_many_json(f"steam:summary:{appid}" for appid in appids)
     for appid in appids:
-        cached = cache_client.get_json(f"steam:summary:{appid}")
+        cached = cached_payloads.get(f"steam:summary:{appid}")
         if cached:
             cached_map[appid] = cached
         else:
@@ -1088,9 +946,11 @@ def get_catalog_page(appids: List[str]) -> List[Dict[str, Any]]:
                 if not entry or not entry.get("success"):
                     continue
                 summary = _summary_from_payload(appid, entry.get("data") or {})
-                cache_client.set_json(f"steam:summary:{appid}", summary, ttl=STEAM_CACHE_TTL_SECONDS)
                 fetched[appid] = summary
 
+    to_cache: Dict[str, Dict[str, Any]] = {
+        f"steam:summary:{appid}": summary for appid, summary in fetched.items()
+    }
     for appid in appids:
         summary = cached_map.get(appid) or fetched.get(appid)
         if summary:
@@ -1098,9 +958,10 @@ def get_catalog_page(appids: List[str]) -> List[Dict[str, Any]]:
             continue
 
         fallback = _fallback_summary_for_appid(appid)
-        cache_client.set_json(f"steam:summary:{appid}", fallback, ttl=STEAM_CACHE_TTL_SECONDS)
+        to_cache[f"steam:summary:{appid}"] = fallback
         summaries.append(fallback)
 
+    cache_client.set_many_json(to_cache, ttl=STEAM_CACHE_TTL_SECONDS)
     return summaries
 
 
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from ..core.cache import cache_client
+from ..core.config import (
+    STEAM_EXTENDED_DEADLINE_SECONDS,
+    STEAM_EXTENDED_MAX_WORKERS,
+    STEAM_EXTENDED_SECTION_TTL_SECONDS,
+)
+from .steam_extended import (
+    get_steam_achievements,
+    get_steam_dlc,
+    get_steam_player_count,
+    get_steam_reviews_summary,
+)
+from .steam_news_enhanced import fetch_news_enhanced
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "steam:game:extended:v6"
+SECTIONS = ("dlc", "achievements", "news", "player_count", "reviews")
+
+_EMPTY_REVIEWS = {
+    "total_positive": 0,
+    "total_negative": 0,
+    "total_reviews": 0,
+    "review_score": 0,
+    "review_score_desc": "No reviews",
+}
+
+# Shared across requests so concurrent calls cannot multiply threads; a slow
+# sub-source keeps running here after the response has been sent.
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, STEAM_EXTENDED_MAX_WORKERS),
+    thread_name_prefix="steam-extended",
+)
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT: Dict[str, Future] = {}
+
+
+def section_cache_key(app_id: str, section: str, news_count: int = 0) -> str:
+    if section == "news":
+        return f"{CACHE_PREFIX}:{app_id}:news:{news_count}"
+    return f"{CACHE_PREFIX}:{app_id}:{section}"
+
+
+def _section_loader(app_id: str, section: str, news_count: int) -> Callable[[], Any]:
+    if section == "dlc":
+        return lambda: get_steam_dlc(app_id)
+    if section == "achievements":
+        return lambda: get_steam_achievements(app_id)
+    if section == "news":
+        return lambda: fetch_news_enhanced(app_id, news_count)
+    if section == "player_count":
+        return lambda: get_steam_player_count(app_id)
+    return lambda: get_steam_reviews_summary(app_id)
+
+
+def _run_section(cache_key: str, loader: Callable[[], Any]) -> Any:
+    try:
+        value = loader()
+    except Exception as exc:
+        logger.error(f"Extended section {cache_key} failed: {exc}")
+        return None
+    # None means "unknown" (no API key, upstream error); leave it uncached so
+    # the next request retries.
+    if value is not None:
+        cache_client.set_json(cache_key, {"value": value}, ttl=STEAM_EXTENDED_SECTION_TTL_SECONDS)
+    return value
+
+
+def _submit(cache_key: str, loader: Callable[[], Any]) -> Future:
+    """One in-flight fetch per section key, shared by concurrent requests."""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(cache_key)
+        if future is not None:
+            return future
+        future = _EXECUTOR.submit(_run_section, cache_key, loader)
+        _INFLIGHT[cache_key] = future
+
+    def _release(done: Future) -> None:
+        with _INFLIGHT_LOCK:
+            if _INFLIGHT.get(cache_key) is done:
+                del _INFLIGHT[cache_key]
+
+    future.add_done_callback(_release)
+    return future
+
+
+def _assemble(app_id: str, values: Dict[str, Any], pending: list[str]) -> dict:
+    dlc = values.get("dlc") or []
+    achievements = values.get("achievements") or []
+    news = values.get("news") or []
+    response = {
+        "app_id": app_id,
+        "dlc": {"items": dlc, "total": len(dlc)},
+        "achievements": {"items": achievements, "total": len(achievements)},
+        "news": {"items": news, "total": len(news)},
+        "player_count": values.get("player_count"),
+        "reviews": values.get("reviews") or dict(_EMPTY_REVIEWS),
+    }
+    if pending:
+        response["partial"] = True
+        response["pending"] = pending
+    return response
+
+
+def get_game_extended(
+    app_id: str,
+    news_count: int,
+    deadline_seconds: Optional[float] = None,
+) -> dict:
+    """
+    Extended game data (DLC, achievements, news, players, reviews) assembled
+    from independently cached sections. Missing sections are fetched in
+    parallel on a shared executor; whatever is not ready by the deadline is
+    reported under `pending` and still lands in the cache when it finishes.
+    """
+    deadline = STEAM_EXTENDED_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    started = time.monotonic()
+    keys = {section: section_cache_key(app_id, section, news_count) for section in SECTIONS}
+    cached = cache_client.get_many_json(list(keys.values()))
+
+    values: Dict[str, Any] = {}
+    futures: Dict[str, Future] = {}
+    for section, key in keys.items():
+        entry = cached.get(key)
+        if isinstance(entry, dict) and "value" in entry:
+            values[section] = entry["value"]
+        else:
+            futures[section] = _submit(key, _section_loader(app_id, section, news_count))
+
+    if futures:
+        remaining = max(0.0, deadline - (time.monotonic() - started))
+        wait(list(futures.values()), timeout=remaining)
+
+    pending: list[str] = []
+    for section, future in futures.items():
+        if future.done():
+            values[section] = future.result()
+        else:
+            pending.append(section)
+    if pending:
+        logger.warning(f"Extended data for {app_id} returned without {', '.join(pending)}")
+    return _assemble(app_id, values, pending)
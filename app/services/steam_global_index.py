@@ -3,17 +3,20 @@ from __future__ import annotations
 import re
 import json
 import time
+import base64
 import subprocess
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
 from difflib import SequenceMatcher
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
 import requests
-from sqlalchemy import and_, case, desc, func, or_, select
+from sqlalchemy import and_, case, delete, desc, func, insert, or_, select, update
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from threading import Lock
+from threading import Event, Lock
 
 from ..core.config import (
     CROSS_STORE_MAPPING_ENABLED,
@@ -30,6 +33,8 @@ from ..core.config import (
     STEAM_GLOBAL_INDEX_COMPLETION_BATCH,
     STEAM_GLOBAL_INDEX_INGEST_BATCH,
     STEAM_GLOBAL_INDEX_MAX_PREFETCH,
+    STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED,
+    STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REBUILD_SECONDS,
     STEAM_GLOBAL_INDEX_SEARCH_LIMIT,
     STEAM_GO_CRAWLER_BIN,
     STEAM_GO_CRAWLER_ENABLED,
@@ -38,11 +43,13 @@ from ..core.config import (
     STEAM_WEB_API_KEY,
     STEAM_WEB_API_URL,
 )
+from ..core.cache import cache_client
 from ..db import Base, engine
 from ..models import (
     AssetJob,
     CrossStoreMapping,
     IngestCursor,
+    CatalogPriorityRank,
     IngestJob,
     SteamDbEnrichment,
     SteamTitle,
@@ -50,8 +57,27 @@ from ..models import (
     SteamTitleAsset,
     SteamTitleMetadata,
 )
-from ..core.denuvo import DENUVO_APP_ID_SET, DENUVO_APP_IDS
-from .steam_catalog import get_hot_appids, get_lua_appids, get_steam_detail, get_steam_summary
+from ..core.denuvo import DENUVO_APP_ID_SET
+from .catalog_search_engine import (
+    CatalogSearchDoc,
+    catalog_search_alias_rows,
+    catalog_search_full_build_age,
+    catalog_search_watermark,
+    count_new_catalog_search_docs,
+    get_catalog_search_engine,
+    install_catalog_search_docs,
+)
+from .catalog_search_index import (
+    build_title_search_fields,
+    build_title_type_rank,
+    fts_alias_title_ids_subquery,
+    fts_terms_usable,
+    fts_title_match_subquery,
+    is_catalog_fts_ready,
+    title_rowid_column,
+)
+from .priority_index import PriorityIndex, get_priority_index
+from .steam_catalog import get_lua_appids, get_steam_detail, get_steam_summary
 from .steamgriddb import build_steam_fallback_assets, resolve_assets
 
 _NON_ALNUM = re.compile(r"[^a-z0-9]+", re.IGNORECASE)
@@ -70,39 +96,69 @@ _STEAMDB_JSON_PATTERN = re.compile(
 _YEAR_PATTERN = re.compile(r"(19|20)\d{2}")
 _EPIC_CACHE_LOCK = Lock()
 _EPIC_CANDIDATE_CACHE: Dict[str, Any] = {"loaded_at": 0.0, "items": []}
-_BYPASS_CATEGORIES_FILE = Path(__file__).resolve().parents[1] / "data" / "bypass_categories.json"
-_ONLINE_FIX_FILE = Path(__file__).resolve().parents[1] / "data" / "online_fix.json"
+_CATALOG_CURSOR_VERSION = 1
+_CATALOG_COUNT_LOCK = Lock()
+_CATALOG_COUNT_CACHE: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+# Bounds staleness when no Redis invalidation channel reaches other workers.
+_CATALOG_COUNT_TTL_SECONDS = 60.0
+_CATALOG_COUNT_MAX_ENTRIES = 2048
+_CATALOG_COUNTS_CHANGED_KEY = "catalog:counts"
+_SEARCH_ENGINE_CHANGED_KEY = "catalog:search-engine"
+_SEARCH_ENGINE_CHANGED = Event()
+_MANIFEST_NAME_MAP_LOCK = Lock()
+_MANIFEST_NAME_MAP_SIGNATURE: Optional[str] = None
+_MANIFEST_NAME_MAP: Dict[str, str] = {}
+# Only these keys of the metadata payloads are needed to build a catalog item.
+_CATALOG_ITEM_PAYLOAD_KEYS = (
+    "name",
+    "short_description",
+    "header_image",
+    "capsule_image",
+    "background",
+    "required_age",
+    "price",
+    "genres",
+    "release_date",
+    "platforms",
+    "item_type",
+    "type",
+    "denuvo",
+)
 _STEAM_APP_SEED_FILE = Path(__file__).resolve().parents[1] / "data" / "steam_app_seed.json"
-_BYPASS_PRIORITY_CATEGORY_ORDER = ("others", "ea", "ubisoft", "rockstar")
-_BYPASS_PRIORITY_LOCK = Lock()
-_BYPASS_PRIORITY_CACHE_MTIME: Optional[float] = None
-_BYPASS_PRIORITY_APPIDS: List[str] = []
-_ONLINE_FIX_PRIORITY_LOCK = Lock()
-_ONLINE_FIX_PRIORITY_CACHE_MTIME: Optional[float] = None
-_ONLINE_FIX_PRIORITY_APPIDS: List[str] = []
+_PRIORITY_TABLE_LOCK = Lock()
+# (version, monotonic time) of this worker's last confirmed sync.
+_PRIORITY_TABLE_SYNCED: Optional[Tuple[str, float]] = None
+_PRIORITY_TABLE_RECHECK_SECONDS = 60.0
+_PRIORITY_TABLE_KEEP_SECONDS = 1800.0
 _LUA_FALLBACK_SEED_RETRY_ATTEMPTS = 15
 _LUA_FALLBACK_SEED_RETRY_DELAY_SECONDS = 2
-_GAME_LIKE_TITLE_TYPES = ("game", "dlc", "demo", "mod")
-_TOOL_LIKE_TITLE_TYPES = (
-    "application",
-    "tool",
-    "software",
-    "video",
-    "movie",
-    "hardware",
-    "driver",
-    "episode",
-    "series",
-    "guide",
-    "advertising",
-)
-_TOOL_NAME_HINT_PATTERNS = (
-    "% dedicated server%",
-    "% sdk%",
-    "% benchmark%",
-    "% level editor%",
+_SEARCH_NOISE_PATTERNS = (
+    "% soundtrack%",
+    "% dlc%",
+    "% demo%",
+    "% beta%",
     "% test server%",
-    "% mod tools%",
+    "% pack%",
+    "% bundle%",
+    "% set%",
+    "% edition upgrade%",
+    "% costume%",
+    "% mission%",
+    "% bonus%",
+    "% starter%",
+    "% pachislot%",
+)
+_SEARCH_DLC_EXCLUDE_PATTERNS = (
+    "% dlc%",
+    "% soundtrack%",
+    "% season pass%",
+    "% expansion%",
+    "% costume%",
+    "% bonus%",
+    "% mission%",
+    "% set%",
+    "% pack%",
+    "% pachislot%",
 )
 
 
@@ -122,111 +178,78 @@ def _looks_like_generic_epic_badge(url: str) -> bool:
     return any(token in text for token in noisy_tokens)
 
 
-def _normalize_bypass_category_id(value: Any) -> str:
-    normalized = str(value or "").strip().lower()
-    if normalized in {"other", "others"}:
-        return "others"
-    return normalized
-
-
-def _load_bypass_priority_appids() -> List[str]:
-    global _BYPASS_PRIORITY_CACHE_MTIME
-    global _BYPASS_PRIORITY_APPIDS
-
-    try:
-        mtime = _BYPASS_CATEGORIES_FILE.stat().st_mtime
-    except OSError:
-        return []
-
-    with _BYPASS_PRIORITY_LOCK:
-        if _BYPASS_PRIORITY_CACHE_MTIME == mtime:
-            return list(_BYPASS_PRIORITY_APPIDS)
-
-        appids_by_category: Dict[str, List[str]] = {}
-        try:
-            payload = json.loads(_BYPASS_CATEGORIES_FILE.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            _BYPASS_PRIORITY_CACHE_MTIME = mtime
-            _BYPASS_PRIORITY_APPIDS = []
-            return []
-
-        categories = payload.get("categories")
-        if isinstance(categories, list):
-            for category in categories:
-                if not isinstance(category, dict):
-                    continue
-                category_id = _normalize_bypass_category_id(category.get("id"))
-                raw_games = category.get("games")
-                if not isinstance(raw_games, list):
-                    continue
-                bucket = appids_by_category.setdefault(category_id, [])
-                for raw_app_id in raw_games:
-                    app_id = str(raw_app_id or "").strip()
-                    if app_id and app_id.isdigit():
-                        bucket.append(app_id)
-
-        ordered: List[str] = []
-        seen: set[str] = set()
-        for category_id in _BYPASS_PRIORITY_CATEGORY_ORDER:
-            for app_id in appids_by_category.get(category_id, []):
-                if app_id in seen:
-                    continue
-                seen.add(app_id)
-                ordered.append(app_id)
-
-        _BYPASS_PRIORITY_CACHE_MTIME = mtime
-        _BYPASS_PRIORITY_APPIDS = ordered
-        return list(ordered)
-
-
-def _load_online_fix_priority_appids() -> List[str]:
-    global _ONLINE_FIX_PRIORITY_CACHE_MTIME
-    global _ONLINE_FIX_PRIORITY_APPIDS
-
-    try:
-        mtime = _ONLINE_FIX_FILE.stat().st_mtime
-    except OSError:
-        return []
-
-    with _ONLINE_FIX_PRIORITY_LOCK:
-        if _ONLINE_FIX_PRIORITY_CACHE_MTIME == mtime:
-            return list(_ONLINE_FIX_PRIORITY_APPIDS)
-
+def _sync_priority_table(index: PriorityIndex) -> bool:
+    """
+    Mirror the priority index into `catalog_priority_ranks` so catalog queries
+    can rank by joining it (see `_priority_rank_join`) instead of binding every
+    priority id. Rows are keyed by index version, since the table is shared by
+    workers whose indexes can differ for a while. Each worker rechecks its rows
+    periodically, keeps them marked as in use, and prunes versions no worker
+    has used recently. False means the table is unusable.
+    """
+    global _PRIORITY_TABLE_SYNCED
+    synced = _PRIORITY_TABLE_SYNCED
+    if (
+        synced is not None
+        and synced[0] == index.version
+        and time.monotonic() - synced[1] < _PRIORITY_TABLE_RECHECK_SECONDS
+    ):
+        return True
+    with _PRIORITY_TABLE_LOCK:
+        synced = _PRIORITY_TABLE_SYNCED
+        if (
+            synced is not None
+            and synced[0] == index.version
+            and time.monotonic() - synced[1] < _PRIORITY_TABLE_RECHECK_SECONDS
+        ):
+            return True
+        now = datetime.utcnow()
+        keep = timedelta(seconds=_PRIORITY_TABLE_KEEP_SECONDS)
         try:
-            payload = json.loads(_ONLINE_FIX_FILE.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            _ONLINE_FIX_PRIORITY_CACHE_MTIME = mtime
-            _ONLINE_FIX_PRIORITY_APPIDS = []
-            return []
-
-        ordered = []
-        if isinstance(payload, dict):
-            ordered = sorted(
-                (str(app_id).strip() for app_id in payload.keys() if str(app_id).strip().isdigit()),
-                key=lambda value: int(value),
-            )
-
-        _ONLINE_FIX_PRIORITY_CACHE_MTIME = mtime
-        _ONLINE_FIX_PRIORITY_APPIDS = ordered
-        return list(ordered)
+            with engine.begin() as connection:
+                stored = connection.execute(
+                    select(func.count())
+                    .select_from(CatalogPriorityRank)
+                    .where(CatalogPriorityRank.version == index.version)
+                ).scalar()
+                if stored != len(index.ordered):
+                    connection.execute(delete(CatalogPriorityRank).where(CatalogPriorityRank.version == index.version))
+                    if index.ordered:
+                        connection.execute(
+                            insert(CatalogPriorityRank),
+                            [
+                                {"version": index.version, "app_id": app_id, "rank": rank, "synced_at": now}
+                                for rank, app_id in enumerate(index.ordered)
+                            ],
+                        )
+                else:
+                    connection.execute(
+                        update(CatalogPriorityRank)
+                        .where(
+                            CatalogPriorityRank.version == index.version,
+                            CatalogPriorityRank.synced_at < now - keep / 2,
+                        )
+                        .values(synced_at=now)
+                    )
+                connection.execute(
+                    delete(CatalogPriorityRank).where(
+                        CatalogPriorityRank.version != index.version,
+                        CatalogPriorityRank.synced_at < now - keep,
+                    )
+                )
+        except Exception as exc:
+            print(f"[GlobalIndex] Priority table sync failed: {exc}")
+            return False
+        _PRIORITY_TABLE_SYNCED = (index.version, time.monotonic())
+        return True
 
 
-def _build_priority_candidate_appids(scope_set: Optional[set[str]] = None) -> List[str]:
-    candidates: List[str] = []
-    for source in (
-        DENUVO_APP_IDS,
-        _load_bypass_priority_appids(),
-        _load_online_fix_priority_appids(),
-        get_hot_appids(),
-    ):
-        for app_id in source:
-            app_str = str(app_id).strip()
-            if not app_str:
-                continue
-            if scope_set is not None and app_str not in scope_set:
-                continue
-            candidates.append(app_str)
-    return candidates
+def _priority_rank_join(index: PriorityIndex):
+    """Join condition from SteamTitle to the rows of `index`'s version."""
+    return and_(
+        CatalogPriorityRank.app_id == SteamTitle.app_id,
+        CatalogPriorityRank.version == index.version,
+    )
 
 
 def ensure_global_index_schema(force: bool = False) -> None:
@@ -266,6 +289,14 @@ def normalize_title(value: str) -> str:
     return " ".join(cleaned.split())
 
 
+def _assign_title_name(row: SteamTitle, name: str) -> None:
+    normalized_name = normalize_title(name)
+    row.name = name
+    row.normalized_name = normalized_name
+    row.compact_name, row.name_initials = build_title_search_fields(normalized_name)
+    row.type_rank = build_title_type_rank(row.title_type, normalized_name)
+
+
 def _compact_alnum(value: str) -> str:
     return "".join(ch for ch in str(value or "").lower() if ch.isalnum())
 
@@ -278,10 +309,74 @@ def _split_compact_query(value: str) -> Tuple[str, str]:
 
 
 def _build_initials_like_pattern(letters: str) -> str:
+    # Matched against SteamTitle.name_initials: "gta" -> "g%t%a%".
     normalized = "".join(ch for ch in str(letters or "").lower() if ch.isalpha())
     if len(normalized) < 2:
         return ""
-    return " ".join(f"{ch}%" for ch in normalized)
+    return "".join(f"{ch}%" for ch in normalized)
+
+
+def _prefix_range(column, prefix: str):
+    # Range form of `column LIKE 'prefix%'` that a plain btree index can serve
+    # on both SQLite and Postgres regardless of collation.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+
+def _search_candidate_filter(
+    db: Session,
+    *,
+    query: str,
+    normalized: str,
+    compact_query: str,
+    initials_letters: str,
+):
+    """
+    Index-backed candidate predicate for search_catalog. Substring terms go
+    through the FTS5 trigram tables on SQLite or the pg_trgm GIN indexes on
+    Postgres. Terms shorter than a trigram cannot use either, so they keep
+    the plain `ILIKE '%term%'` scan rather than lose mid-word matches.
+    """
+    use_fts = is_catalog_fts_ready(db)
+    conditions = []
+    if query.isdigit():
+        conditions.append(_prefix_range(SteamTitle.app_id, query))
+
+    substring_terms = {
+        "normalized_name": normalized,
+        "compact_name": compact_query,
+        "name_initials": initials_letters,
+    }
+    indexed_terms: Dict[str, str] = {}
+    for column_name, term in substring_terms.items():
+        if not term:
+            continue
+        if fts_terms_usable([term]):
+            indexed_terms[column_name] = term
+        else:
+            conditions.append(getattr(SteamTitle, column_name).ilike(f"%{term}%"))
+
+    if indexed_terms:
+        if use_fts:
+            conditions.append(title_rowid_column().in_(fts_title_match_subquery(indexed_terms)))
+        else:
+            conditions.extend(
+                getattr(SteamTitle, column_name).ilike(f"%{term}%")
+                for column_name, term in indexed_terms.items()
+            )
+
+    if normalized:
+        if use_fts and fts_terms_usable([normalized]):
+            alias_subq = fts_alias_title_ids_subquery(normalized)
+        else:
+            alias_subq = select(SteamTitleAlias.steam_title_id).where(
+                SteamTitleAlias.normalized_alias.ilike(f"%{normalized}%")
+            )
+        conditions.append(SteamTitle.id.in_(alias_subq))
+
+    if not conditions:
+        return SteamTitle.id.is_(None)
+    return or_(*conditions)
 
 
 def _is_placeholder_title_name(name: Any, app_id: Optional[str] = None) -> bool:
@@ -317,18 +412,6 @@ def _pick_best_title_name(app_id: str, *candidates: Any) -> str:
     return f"Steam App {app_id_text}" if app_id_text else ""
 
 
-def _title_type_rank_expr():
-    tool_name_hint = or_(
-        *[SteamTitle.normalized_name.ilike(pattern) for pattern in _TOOL_NAME_HINT_PATTERNS]
-    )
-    return case(
-        (SteamTitle.title_type.in_(_GAME_LIKE_TITLE_TYPES), 0),
-        (SteamTitle.title_type.in_(_TOOL_LIKE_TITLE_TYPES), 3),
-        (tool_name_hint, 3),
-        else_=1,
-    )
-
-
 def _steam_applist_url() -> str:
     return f"{STEAM_WEB_API_URL.rstrip('/')}/ISteamApps/GetAppList/v2/"
 
@@ -1479,23 +1562,39 @@ def fetch_steam_app_list(official_only: bool = False) -> List[Dict[str, Any]]:
 
 
 def _read_manifest_name_map() -> Dict[str, str]:
-    if not _CHUNK_MANIFEST_MAP_FILE.exists():
-        return {}
+    """Parsed app_id -> name map, re-read only when the file changes. Treat as read-only."""
+    global _MANIFEST_NAME_MAP_SIGNATURE, _MANIFEST_NAME_MAP
+
     try:
-        payload = json.loads(_CHUNK_MANIFEST_MAP_FILE.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return {}
-    steam_map = payload.get("steam_app_id") if isinstance(payload, dict) else None
-    if not isinstance(steam_map, dict):
+        stat = _CHUNK_MANIFEST_MAP_FILE.stat()
+    except OSError:
+        with _MANIFEST_NAME_MAP_LOCK:
+            _MANIFEST_NAME_MAP_SIGNATURE = None
+            _MANIFEST_NAME_MAP = {}
         return {}
-    parsed: Dict[str, str] = {}
-    for app_id, entry in steam_map.items():
-        if not isinstance(entry, dict):
-            continue
-        raw_name = str(entry.get("game_name") or entry.get("folder") or "").strip()
-        if raw_name:
-            parsed[str(app_id)] = raw_name
-    return parsed
+    signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    with _MANIFEST_NAME_MAP_LOCK:
+        if _MANIFEST_NAME_MAP_SIGNATURE == signature:
+            return _MANIFEST_NAME_MAP
+
+        parsed: Dict[str, str] = {}
+        try:
+            payload = json.loads(_CHUNK_MANIFEST_MAP_FILE.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            payload = None
+        steam_map = payload.get("steam_app_id") if isinstance(payload, dict) else None
+        if isinstance(steam_map, dict):
+            for app_id, entry in steam_map.items():
+                if not isinstance(entry, dict):
+                    continue
+                raw_name = str(entry.get("game_name") or entry.get("folder") or "").strip()
+                if raw_name:
+                    parsed[str(app_id)] = raw_name
+
+        _MANIFEST_NAME_MAP_SIGNATURE = signature
+        _MANIFEST_NAME_MAP = parsed
+        return _MANIFEST_NAME_MAP
 
 
 def _fallback_apps_from_lua(max_items: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -1611,26 +1710,23 @@ def _ensure_title_row(db: Session, app_id: str, name: str, source: str = "steam_
     row = db.query(SteamTitle).filter(SteamTitle.app_id == str(app_id)).first()
     app_id_text = str(app_id)
     incoming_name = _pick_best_title_name(app_id_text, name)
-    normalized_name = normalize_title(incoming_name)
     if row:
         existing_name = str(row.name or "").strip()
         incoming_placeholder = _is_placeholder_title_name(incoming_name, app_id_text)
         existing_placeholder = _is_placeholder_title_name(existing_name, app_id_text)
         should_update_name = (not incoming_placeholder) or existing_placeholder
         if should_update_name:
-            row.name = incoming_name
-            row.normalized_name = normalized_name
+            _assign_title_name(row, incoming_name)
             _upsert_alias(db, row.id, incoming_name, locale="en", source=source)
         row.source = source
         row.updated_at = datetime.utcnow()
     else:
         row = SteamTitle(
             app_id=app_id_text,
-            name=incoming_name,
-            normalized_name=normalized_name,
             source=source,
             state="active",
         )
+        _assign_title_name(row, incoming_name)
         db.add(row)
         db.flush()
         _upsert_alias(db, row.id, incoming_name, locale="en", source=source)
@@ -1695,6 +1791,7 @@ def refresh_title_from_steam(db: Session, app_id: str) -> Optional[SteamTitle]:
         or ""
     ).strip().lower()
     title.title_type = item_type or title.title_type
+    title.type_rank = build_title_type_rank(title.title_type, title.normalized_name)
     title.release_date = (detail or {}).get("release_date") or (summary or {}).get("release_date")
     title.developer = _pick_first_string((detail or {}).get("developers"))
     title.publisher = _pick_first_string((detail or {}).get("publishers"))
@@ -1834,8 +1931,7 @@ def ingest_global_catalog(
                 try:
                     row = existing.get(app_id)
                     if row:
-                        row.name = name
-                        row.normalized_name = normalize_title(name)
+                        _assign_title_name(row, name)
                         row.state = "active"
                         row.source = source
                         _upsert_alias(db, row.id, name, locale="en", source=source)
@@ -1930,6 +2026,13 @@ def ingest_global_catalog(
         job.failure_count = failed
         job.completed_at = datetime.utcnow()
         db.commit()
+        invalidate_catalog_counts()
+
+        try:
+            refresh_catalog_search_engine(db)
+        except Exception as exc:
+            print(f"Catalog search engine refresh failed: {exc}")
+        notify_catalog_search_changed()
     except Exception as exc:
         db.rollback()
         job.status = "failed"
@@ -1967,15 +2070,99 @@ def _infer_artwork_coverage(source: Optional[str]) -> str:
     return "steam"
 
 
+@lru_cache(maxsize=16384)
+def _fallback_assets_for(app_id: str) -> Dict[str, Optional[str]]:
+    return build_steam_fallback_assets(app_id)
+
+
 def _build_catalog_item(
     title: SteamTitle,
     manifest_name_map: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     metadata = title.metadata_row
-    detail_payload = (metadata.detail_payload if metadata else {}) or {}
-    summary_payload = (metadata.summary_payload if metadata else {}) or {}
-    selected_assets = (title.assets_row.selected_assets if title.assets_row else {}) or {}
-    fallback_assets = build_steam_fallback_assets(title.app_id)
+    assets_row = title.assets_row
+    return _assemble_catalog_item(
+        title,
+        manifest_name_map,
+        detail_payload=(metadata.detail_payload if metadata else {}) or {},
+        summary_payload=(metadata.summary_payload if metadata else {}) or {},
+        short_description=metadata.short_description if metadata else None,
+        selected_assets=(assets_row.selected_assets if assets_row else {}) or {},
+        selected_source=assets_row.selected_source if assets_row else None,
+        assets_version=int(assets_row.version) if assets_row else 1,
+    )
+
+
+def _build_catalog_items(
+    db: Session,
+    titles: List[SteamTitle],
+    manifest_name_map: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build a page of catalog items with two projected queries instead of two lazy
+    loads per row; only the payload keys listed in _CATALOG_ITEM_PAYLOAD_KEYS
+    are pulled out of the metadata JSON.
+    """
+    title_ids = [title.id for title in titles]
+    if not title_ids:
+        return []
+
+    key_count = len(_CATALOG_ITEM_PAYLOAD_KEYS)
+    metadata_rows = db.query(
+        SteamTitleMetadata.steam_title_id,
+        SteamTitleMetadata.short_description,
+        *[SteamTitleMetadata.detail_payload[key] for key in _CATALOG_ITEM_PAYLOAD_KEYS],
+        *[SteamTitleMetadata.summary_payload[key] for key in _CATALOG_ITEM_PAYLOAD_KEYS],
+    ).filter(SteamTitleMetadata.steam_title_id.in_(title_ids))
+    metadata_by_title: Dict[str, Tuple[Dict[str, Any], Dict[str, Any], Optional[str]]] = {}
+    for row in metadata_rows:
+        detail_values = row[2 : 2 + key_count]
+        summary_values = row[2 + key_count :]
+        metadata_by_title[row[0]] = (
+            {key: value for key, value in zip(_CATALOG_ITEM_PAYLOAD_KEYS, detail_values) if value is not None},
+            {key: value for key, value in zip(_CATALOG_ITEM_PAYLOAD_KEYS, summary_values) if value is not None},
+            row[1],
+        )
+
+    assets_rows = db.query(
+        SteamTitleAsset.steam_title_id,
+        SteamTitleAsset.selected_assets,
+        SteamTitleAsset.selected_source,
+        SteamTitleAsset.version,
+    ).filter(SteamTitleAsset.steam_title_id.in_(title_ids))
+    assets_by_title = {row[0]: row for row in assets_rows}
+
+    items: List[Dict[str, Any]] = []
+    for title in titles:
+        detail_payload, summary_payload, short_description = metadata_by_title.get(title.id, ({}, {}, None))
+        assets_row = assets_by_title.get(title.id)
+        items.append(
+            _assemble_catalog_item(
+                title,
+                manifest_name_map,
+                detail_payload=detail_payload,
+                summary_payload=summary_payload,
+                short_description=short_description,
+                selected_assets=(assets_row[1] if assets_row else {}) or {},
+                selected_source=assets_row[2] if assets_row else None,
+                assets_version=int(assets_row[3]) if assets_row else 1,
+            )
+        )
+    return items
+
+
+def _assemble_catalog_item(
+    title: SteamTitle,
+    manifest_name_map: Optional[Dict[str, str]],
+    *,
+    detail_payload: Dict[str, Any],
+    summary_payload: Dict[str, Any],
+    short_description: Optional[str],
+    selected_assets: Dict[str, Any],
+    selected_source: Optional[str],
+    assets_version: int,
+) -> Dict[str, Any]:
+    fallback_assets = _fallback_assets_for(str(title.app_id))
     manifest_name = None
     if manifest_name_map:
         manifest_name = manifest_name_map.get(str(title.app_id))
@@ -2032,7 +2219,7 @@ def _build_catalog_item(
         "short_description": (
             detail_payload.get("short_description")
             or summary_payload.get("short_description")
-            or (metadata.short_description if metadata else None)
+            or short_description
         ),
         "header_image": header,
         "capsule_image": capsule,
@@ -2046,7 +2233,7 @@ def _build_catalog_item(
         "is_dlc": is_dlc,
         "is_base_game": is_base_game,
         "classification_confidence": classification_confidence,
-        "artwork_coverage": _infer_artwork_coverage(title.assets_row.selected_source if title.assets_row else None),
+        "artwork_coverage": _infer_artwork_coverage(selected_source),
         "denuvo": denuvo_flag,
         "artwork": {
             "t0": (
@@ -2062,11 +2249,113 @@ def _build_catalog_item(
             "t2": capsule,
             "t3": header,
             "t4": background,
-            "version": int(title.assets_row.version) if title.assets_row else 1,
+            "version": assets_version,
         },
     }
 
 
+def invalidate_catalog_counts() -> None:
+    """Drop the cached catalog totals in every worker (this one included)."""
+    cache_client.invalidate_keys((_CATALOG_COUNTS_CHANGED_KEY,))
+
+
+def _on_catalog_counts_invalidation(keys: List[str]) -> None:
+    if _CATALOG_COUNTS_CHANGED_KEY in keys:
+        with _CATALOG_COUNT_LOCK:
+            _CATALOG_COUNT_CACHE.clear()
+
+
+cache_client.add_invalidation_listener(_on_catalog_counts_invalidation)
+
+
+def _cached_count(key: str, compute: Callable[[], int]) -> int:
+    now = time.time()
+    with _CATALOG_COUNT_LOCK:
+        cached = _CATALOG_COUNT_CACHE.get(key)
+        if cached and (now - cached[0]) <= _CATALOG_COUNT_TTL_SECONDS:
+            _CATALOG_COUNT_CACHE.move_to_end(key)
+            return cached[1]
+    value = int(compute() or 0)
+    with _CATALOG_COUNT_LOCK:
+        _CATALOG_COUNT_CACHE[key] = (now, value)
+        _CATALOG_COUNT_CACHE.move_to_end(key)
+        while len(_CATALOG_COUNT_CACHE) > _CATALOG_COUNT_MAX_ENTRIES:
+            _CATALOG_COUNT_CACHE.popitem(last=False)
+    return value
+
+
+def encode_catalog_cursor(kind: str, position: int, keyset: Optional[List[Any]] = None) -> str:
+    payload: Dict[str, Any] = {"v": _CATALOG_CURSOR_VERSION, "t": kind, "o": int(position)}
+    if keyset is not None:
+        payload["k"] = [value.isoformat() if isinstance(value, datetime) else value for value in keyset]
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_catalog_cursor(token: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+    """Decode an opaque cursor issued for `kind`; raises ValueError when it does not fit."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode((token + "=" * (-len(token) % 4)).encode("ascii"))
+        payload = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if (
+        not isinstance(payload, dict)
+        or payload.get("v") != _CATALOG_CURSOR_VERSION
+        or payload.get("t") != kind
+        or not isinstance(payload.get("o"), int)
+        or payload["o"] < 0
+    ):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _catalog_sort_columns(sort_value: str) -> List[Tuple[Any, bool]]:
+    """(column, descending) tuples; every sort ends on app_id so the key is unique."""
+    if sort_value in {"recent", "updated", "priority", "top", "top_picks", "hot"}:
+        return [(SteamTitle.type_rank, False), (SteamTitle.updated_at, True), (SteamTitle.app_id, True)]
+    if sort_value == "appid":
+        return [(SteamTitle.type_rank, False), (SteamTitle.app_id, False)]
+    return [(SteamTitle.type_rank, False), (SteamTitle.name, False), (SteamTitle.app_id, False)]
+
+
+def _catalog_order_by(columns: List[Tuple[Any, bool]]) -> List[Any]:
+    return [column.desc() if descending else column.asc() for column, descending in columns]
+
+
+def _catalog_keyset(row: SteamTitle, columns: List[Tuple[Any, bool]]) -> Optional[List[Any]]:
+    values = [getattr(row, column.key) for column, _ in columns]
+    if any(value is None for value in values):
+        return None
+    return values
+
+
+def _catalog_keyset_filter(columns: List[Tuple[Any, bool]], raw_values: Any):
+    if not isinstance(raw_values, list) or len(raw_values) != len(columns):
+        raise ValueError("Invalid cursor")
+    values: List[Any] = []
+    for (column, _), raw in zip(columns, raw_values):
+        if column.key == "updated_at":
+            try:
+                values.append(datetime.fromisoformat(str(raw)))
+            except ValueError as exc:
+                raise ValueError("Invalid cursor") from exc
+        else:
+            values.append(raw)
+
+    # Row-value comparison expanded by hand so mixed sort directions work on
+    # every backend: (a > x) OR (a = x AND b < y) OR ...
+    clauses = []
+    for index, (column, descending) in enumerate(columns):
+        step = column < values[index] if descending else column > values[index]
+        clauses.append(
+            and_(*[columns[prev][0] == values[prev] for prev in range(index)], step)
+        )
+    return or_(*clauses)
+
+
 def list_catalog(
     db: Session,
     limit: int,
@@ -2075,70 +2364,116 @@ def list_catalog(
     scope: str = "all",
     library_appids: Optional[Iterable[str]] = None,
 ) -> Tuple[int, List[Dict[str, Any]]]:
+    total, items, _ = list_catalog_page(
+        db,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        scope=scope,
+        library_appids=library_appids,
+    )
+    return total, items
+
+
+def list_catalog_page(
+    db: Session,
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    scope: str = "all",
+    library_appids: Optional[Iterable[str]] = None,
+) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+    """
+    Catalog page plus an opaque cursor for the next one. A cursor continues by
+    keyset on the sort tuple, so deep pages cost the same as the first.
+    """
+    sort_value = (sort or "name").lower()
+    cursor_kind = f"list:{sort_value}:{scope}"
+    cursor_state = decode_catalog_cursor(cursor, cursor_kind)
+
     def _run():
         manifest_name_map = _read_manifest_name_map()
-        type_rank = _title_type_rank_expr()
         query = db.query(SteamTitle)
         scope_set: Optional[set[str]] = None
+        count_key = f"list:{scope}"
         if scope in {"library", "owned"}:
             appids = [str(value) for value in (library_appids or []) if str(value).strip()]
             if not appids:
-                return 0, []
+                return 0, [], None
             scope_set = set(appids)
             query = query.filter(SteamTitle.app_id.in_(appids))
+            count_key = f"list:{scope}:{len(appids)}:{appids[0]}:{appids[-1]}"
 
-        sort_value = (sort or "name").lower()
-        if sort_value in {"priority", "top", "top_picks", "hot"}:
-            total = query.count()
-            if total <= 0:
-                return 0, []
-
-            candidates = _build_priority_candidate_appids(scope_set)
-            candidate_unique: list[str] = []
-            if candidates:
-                seen_candidates: set[str] = set()
-                for app_id in candidates:
-                    if app_id in seen_candidates:
-                        continue
-                    seen_candidates.add(app_id)
-                    candidate_unique.append(app_id)
+        total = _cached_count(count_key, query.count)
+        if total <= 0:
+            return 0, [], None
+
+        page_limit = max(1, limit)
+        position = int(cursor_state["o"]) if cursor_state else max(0, offset)
+        keyset = cursor_state.get("k") if cursor_state else None
+        columns = _catalog_sort_columns(sort_value)
+        order_by = _catalog_order_by(columns)
+        priority_set: set[str] = set()
 
+        if sort_value in {"priority", "top", "top_picks", "hot"}:
+            priority_index = get_priority_index()
             priority_ids: list[str] = []
-            if candidate_unique:
-                # Only keep candidates that exist in current scope.
+            ranked_by_table = bool(priority_index.ordered) and _sync_priority_table(priority_index)
+            if ranked_by_table:
+                # Only keep candidates that exist in current scope, in priority order.
                 existing_rows = (
-                    query.filter(SteamTitle.app_id.in_(candidate_unique))
+                    query.join(CatalogPriorityRank, _priority_rank_join(priority_index))
                     .with_entities(SteamTitle.app_id)
+                    .order_by(CatalogPriorityRank.rank.asc())
                     .all()
                 )
-                existing = {row[0] for row in existing_rows if row and row[0]}
-                seen: set[str] = set()
-                for app_id in candidate_unique:
-                    if app_id in existing and app_id not in seen:
-                        priority_ids.append(app_id)
-                        seen.add(app_id)
+                priority_ids = [row[0] for row in existing_rows if row and row[0]]
+            elif priority_index.ordered:
+                candidate_unique = priority_index.restrict(scope_set)
+                if candidate_unique:
+                    existing_rows = (
+                        query.filter(SteamTitle.app_id.in_(candidate_unique))
+                        .with_entities(SteamTitle.app_id)
+                        .all()
+                    )
+                    existing = {row[0] for row in existing_rows if row and row[0]}
+                    priority_ids = [app_id for app_id in candidate_unique if app_id in existing]
 
             priority_total = len(priority_ids)
+            priority_set = set(priority_ids)
             page_rows: list[SteamTitle] = []
-            remaining_limit = max(1, limit)
-            offset_value = max(0, offset)
+            remaining_limit = page_limit
 
             def rest_query():
                 if not priority_ids:
                     return query
+                if ranked_by_table:
+                    return query.outerjoin(
+                        CatalogPriorityRank, _priority_rank_join(priority_index)
+                    ).filter(CatalogPriorityRank.app_id.is_(None))
                 return query.filter(~SteamTitle.app_id.in_(priority_ids))
 
-            if offset_value >= priority_total:
-                rest_offset = offset_value - priority_total
+            if keyset is not None:
                 page_rows = (
                     rest_query()
-                    .order_by(type_rank.asc(), desc(SteamTitle.updated_at), SteamTitle.name.asc())
+                    .filter(_catalog_keyset_filter(columns, keyset))
+                    .order_by(*order_by)
+                    .limit(remaining_limit)
+                    .all()
+                )
+            elif position >= priority_total:
+                rest_offset = position - priority_total
+                page_rows = (
+                    rest_query()
+                    .order_by(*order_by)
                     .offset(rest_offset)
                     .limit(remaining_limit)
                     .all()
                 )
             else:
-                slice_ids = priority_ids[offset_value : offset_value + remaining_limit]
+                slice_ids = priority_ids[position : position + remaining_limit]
                 if slice_ids:
                     fetched = query.filter(SteamTitle.app_id.in_(slice_ids)).all()
                     row_by_id = {row.app_id: row for row in fetched}
@@ -2149,28 +2484,202 @@ def list_catalog(
                 if remaining_limit > 0:
                     rest_rows = (
                         rest_query()
-                        .order_by(type_rank.asc(), desc(SteamTitle.updated_at), SteamTitle.name.asc())
+                        .order_by(*order_by)
                         .offset(0)
                         .limit(remaining_limit)
                         .all()
                     )
                     page_rows.extend(rest_rows)
-
-            return total, [_build_catalog_item(row, manifest_name_map) for row in page_rows]
-        if sort_value in {"recent", "updated"}:
-            query = query.order_by(type_rank.asc(), desc(SteamTitle.updated_at), SteamTitle.name.asc())
-        elif sort_value == "appid":
-            query = query.order_by(type_rank.asc(), SteamTitle.app_id.asc())
         else:
-            query = query.order_by(type_rank.asc(), SteamTitle.name.asc())
+            ordered_query = query.order_by(*order_by)
+            if keyset is not None:
+                ordered_query = ordered_query.filter(_catalog_keyset_filter(columns, keyset))
+            else:
+                ordered_query = ordered_query.offset(position)
+            page_rows = ordered_query.limit(page_limit).all()
 
-        total = query.count()
-        rows = query.offset(max(0, offset)).limit(max(1, limit)).all()
-        return total, [_build_catalog_item(row, manifest_name_map) for row in rows]
+        next_cursor: Optional[str] = None
+        if len(page_rows) >= page_limit:
+            last_row = page_rows[-1]
+            next_keyset = None if last_row.app_id in priority_set else _catalog_keyset(last_row, columns)
+            next_cursor = encode_catalog_cursor(cursor_kind, position + len(page_rows), next_keyset)
+        return total, _build_catalog_items(db, page_rows, manifest_name_map), next_cursor
 
     return _with_schema_retry(_run)
 
 
+def _pattern_hint(pattern: str) -> str:
+    return pattern.strip("%")
+
+
+_SEARCH_NOISE_HINTS = tuple(_pattern_hint(pattern) for pattern in _SEARCH_NOISE_PATTERNS)
+_SEARCH_DLC_EXCLUDE_HINTS = tuple(_pattern_hint(pattern) for pattern in _SEARCH_DLC_EXCLUDE_PATTERNS)
+
+
+def _catalog_search_doc(
+    app_id: str,
+    title_name: Optional[str],
+    normalized_name: Optional[str],
+    title_type: Optional[str],
+    updated_at: Optional[datetime],
+    aliases: Iterable[str],
+) -> CatalogSearchDoc:
+    name = str(normalized_name or "")
+    kind = str(title_type or "").strip().lower()
+    return CatalogSearchDoc(
+        app_id=str(app_id),
+        normalized_name=name,
+        aliases=tuple(sorted({alias for alias in aliases if alias})),
+        type_rank=build_title_type_rank(kind, name),
+        noise=1 if any(hint in name for hint in _SEARCH_NOISE_HINTS) else 0,
+        is_dlc=kind == "dlc" or any(hint in name for hint in _SEARCH_DLC_EXCLUDE_HINTS),
+        updated_ts=updated_at.timestamp() if updated_at else 0.0,
+        name=str(title_name or ""),
+    )
+
+
+def _load_catalog_search_docs(
+    db: Session,
+    updated_after: Optional[datetime] = None,
+) -> Tuple[List[CatalogSearchDoc], Optional[datetime]]:
+    """
+    Docs for every title, or with `updated_after` only for titles updated
+    since, or whose aliases were. The returned watermark covers both tables.
+    """
+    title_query = db.query(
+        SteamTitle.id,
+        SteamTitle.app_id,
+        SteamTitle.name,
+        SteamTitle.normalized_name,
+        SteamTitle.title_type,
+        SteamTitle.updated_at,
+    )
+    if updated_after is not None:
+        alias_changed = select(SteamTitleAlias.steam_title_id).where(SteamTitleAlias.updated_at > updated_after)
+        title_query = title_query.filter(
+            or_(SteamTitle.updated_at > updated_after, SteamTitle.id.in_(alias_changed))
+        )
+    title_rows = title_query.all()
+    if not title_rows:
+        return [], updated_after
+
+    watermark = updated_after
+
+    def _advance(value: Optional[datetime]) -> None:
+        nonlocal watermark
+        if value is not None and (watermark is None or value > watermark):
+            watermark = value
+
+    aliases_by_title: Dict[str, List[str]] = {}
+    alias_query = db.query(
+        SteamTitleAlias.steam_title_id,
+        SteamTitleAlias.normalized_alias,
+        SteamTitleAlias.updated_at,
+    )
+    if updated_after is None:
+        alias_batches = [alias_query.all()]
+    else:
+        title_ids = [row.id for row in title_rows]
+        alias_batches = [
+            alias_query.filter(SteamTitleAlias.steam_title_id.in_(title_ids[start : start + 500])).all()
+            for start in range(0, len(title_ids), 500)
+        ]
+    for batch in alias_batches:
+        for steam_title_id, normalized_alias, alias_updated_at in batch:
+            _advance(alias_updated_at)
+            if normalized_alias:
+                aliases_by_title.setdefault(steam_title_id, []).append(normalized_alias)
+
+    docs: List[CatalogSearchDoc] = []
+    for row in title_rows:
+        docs.append(
+            _catalog_search_doc(
+                row.app_id,
+                row.name,
+                row.normalized_name,
+                row.title_type,
+                row.updated_at,
+                aliases_by_title.get(row.id, ()),
+            )
+        )
+        _advance(row.updated_at)
+    return docs, watermark
+
+
+def _catalog_search_row_counts(db: Session) -> Tuple[int, int]:
+    return (
+        int(db.query(func.count(SteamTitle.id)).scalar() or 0),
+        int(db.query(func.count(SteamTitleAlias.id)).scalar() or 0),
+    )
+
+
+def warm_catalog_search_engine(db: Session) -> int:
+    """Build the in-process search engine from the full title table."""
+    if not STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED:
+        return 0
+    ensure_global_index_schema()
+    _, alias_rows = _catalog_search_row_counts(db)
+    docs, watermark = _load_catalog_search_docs(db)
+    return install_catalog_search_docs(docs, watermark=watermark, replace=True, alias_rows=alias_rows).size
+
+
+def refresh_catalog_search_engine(db: Session) -> int:
+    """
+    Fold titles changed since the last build into the engine. Deleted titles
+    and aliases leave no row to find, so when the table no longer matches the
+    engine's doc count (or alias rows went down), or the last full build is
+    older than STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REBUILD_SECONDS, the engine
+    is rebuilt instead. Nothing is recompiled when nothing changed.
+    """
+    if not STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED:
+        return 0
+    watermark = catalog_search_watermark()
+    engine = get_catalog_search_engine()
+    if (
+        engine is None
+        or watermark is None
+        or catalog_search_full_build_age() >= STEAM_GLOBAL_INDEX_SEARCH_ENGINE_REBUILD_SECONDS
+    ):
+        return warm_catalog_search_engine(db)
+    title_rows, alias_rows = _catalog_search_row_counts(db)
+    docs, next_watermark = _load_catalog_search_docs(db, updated_after=watermark)
+    known_alias_rows = catalog_search_alias_rows()
+    if engine.size + count_new_catalog_search_docs(doc.app_id for doc in docs) != title_rows or (
+        known_alias_rows is not None and alias_rows < known_alias_rows
+    ):
+        return warm_catalog_search_engine(db)
+    if docs:
+        install_catalog_search_docs(docs, watermark=next_watermark, replace=False, alias_rows=alias_rows)
+    return len(docs)
+
+
+def notify_catalog_search_changed() -> None:
+    """Ask the search engine of every worker (this one included) to refresh soon."""
+    cache_client.invalidate_keys((_SEARCH_ENGINE_CHANGED_KEY,))
+
+
+def _on_search_engine_invalidation(keys: List[str]) -> None:
+    if _SEARCH_ENGINE_CHANGED_KEY in keys:
+        _SEARCH_ENGINE_CHANGED.set()
+
+
+cache_client.add_invalidation_listener(_on_search_engine_invalidation)
+
+
+def wait_for_catalog_search_change(timeout: float) -> bool:
+    """Block until another worker reports a catalog change or `timeout` passes."""
+    changed = _SEARCH_ENGINE_CHANGED.wait(max(0.0, timeout))
+    _SEARCH_ENGINE_CHANGED.clear()
+    return changed
+
+
+def _search_priority_index(rank_mode: str) -> Optional[PriorityIndex]:
+    if rank_mode not in {"hot", "priority", "top"}:
+        return None
+    index = get_priority_index()
+    return index if index.ordered else None
+
+
 def search_catalog(
     db: Session,
     q: str,
@@ -2182,7 +2691,7 @@ def search_catalog(
 ) -> Tuple[int, List[Dict[str, Any]]]:
     def _run():
         manifest_name_map = _read_manifest_name_map()
-        type_rank = _title_type_rank_expr()
+        type_rank = SteamTitle.type_rank
         query = (q or "").strip()
         if not query:
             return 0, []
@@ -2201,33 +2710,39 @@ def search_catalog(
             if exact:
                 return 1, [_build_catalog_item(exact, manifest_name_map)]
 
+        rank_mode = str(ranking_mode or "").strip().lower()
+        priority_index = _search_priority_index(rank_mode)
+        engine = get_catalog_search_engine() if STEAM_GLOBAL_INDEX_SEARCH_ENGINE_ENABLED else None
+        # Substrings too short for a trigram stay on SQL's plain ILIKE scan.
+        if engine is not None and engine.size and not must_have_artwork and fts_terms_usable([normalized]):
+            total, page_ids = engine.search(
+                query,
+                window=max(0, offset) + max_limit,
+                include_dlc=include_dlc,
+                priority=priority_index.members if priority_index else frozenset(),
+                order="recent" if rank_mode in {"recent", "updated"} else "relevance",
+            )
+            page_ids = page_ids[max(0, offset) :]
+            if not page_ids:
+                return total, []
+            rows_by_app_id = {
+                row.app_id: row
+                for row in base.filter(SteamTitle.app_id.in_(page_ids)).all()
+            }
+            page_rows = [rows_by_app_id[app_id] for app_id in page_ids if app_id in rows_by_app_id]
+            return total, _build_catalog_items(db, page_rows, manifest_name_map)
+
         alias_subq = select(SteamTitleAlias.steam_title_id).where(
             SteamTitleAlias.normalized_alias.ilike(f"%{normalized}%")
         )
 
         lowered_query = query.lower()
-        noise_patterns = [
-            "% soundtrack%",
-            "% dlc%",
-            "% demo%",
-            "% beta%",
-            "% test server%",
-            "% pack%",
-            "% bundle%",
-            "% set%",
-            "% edition upgrade%",
-            "% costume%",
-            "% mission%",
-            "% bonus%",
-            "% starter%",
-            "% pachislot%",
-        ]
         name_length = func.length(SteamTitle.normalized_name)
         noise_penalty = case(
-            *[(SteamTitle.normalized_name.ilike(pattern), 1) for pattern in noise_patterns],
+            *[(SteamTitle.normalized_name.ilike(pattern), 1) for pattern in _SEARCH_NOISE_PATTERNS],
             else_=0,
         )
-        compact_name = func.replace(SteamTitle.normalized_name, " ", "")
+        compact_name = SteamTitle.compact_name
 
         relevance_conditions = [
             (SteamTitle.app_id == query, 900),
@@ -2251,8 +2766,8 @@ def search_catalog(
         if initials_pattern:
             relevance_conditions.extend(
                 [
-                    (SteamTitle.normalized_name.ilike(initials_pattern), 730),
-                    (SteamTitle.normalized_name.ilike(f"% {initials_pattern}"), 720),
+                    (SteamTitle.name_initials.ilike(initials_pattern), 730),
+                    (SteamTitle.name_initials.ilike(f"_%{initials_pattern}"), 720),
                 ]
             )
             if digits_only:
@@ -2260,14 +2775,14 @@ def search_catalog(
                     [
                         (
                             and_(
-                                SteamTitle.normalized_name.ilike(initials_pattern),
+                                SteamTitle.name_initials.ilike(initials_pattern),
                                 SteamTitle.normalized_name.ilike(f"%{digits_only}%"),
                             ),
                             740,
                         ),
                         (
                             and_(
-                                SteamTitle.normalized_name.ilike(f"% {initials_pattern}"),
+                                SteamTitle.name_initials.ilike(f"_%{initials_pattern}"),
                                 SteamTitle.normalized_name.ilike(f"%{digits_only}%"),
                             ),
                             735,
@@ -2276,41 +2791,24 @@ def search_catalog(
                 )
         relevance_score = case(*relevance_conditions, else_=0)
 
-        match_conditions = [
-            SteamTitle.normalized_name.ilike(f"%{normalized}%"),
-            SteamTitle.app_id.ilike(f"{query}%"),
-            SteamTitle.id.in_(alias_subq),
-        ]
-        if compact_query and compact_query != normalized:
-            match_conditions.append(compact_name.ilike(f"%{compact_query}%"))
-        if initials_pattern:
-            initials_match = or_(
-                SteamTitle.normalized_name.ilike(initials_pattern),
-                SteamTitle.normalized_name.ilike(f"% {initials_pattern}"),
+        rows_query = base.filter(
+            _search_candidate_filter(
+                db,
+                query=query,
+                normalized=normalized,
+                compact_query=compact_query,
+                initials_letters=letters_only if initials_pattern else "",
             )
-            if digits_only:
-                initials_match = or_(
-                    and_(SteamTitle.normalized_name.ilike(initials_pattern), SteamTitle.normalized_name.ilike(f"%{digits_only}%")),
-                    and_(SteamTitle.normalized_name.ilike(f"% {initials_pattern}"), SteamTitle.normalized_name.ilike(f"%{digits_only}%")),
-                )
-            match_conditions.append(initials_match)
-
-        rows_query = base.filter(or_(*match_conditions))
+        )
 
         if include_dlc is False:
             rows_query = rows_query.filter(
                 ~or_(
                     SteamTitle.title_type == "dlc",
-                    SteamTitle.normalized_name.ilike("% dlc%"),
-                    SteamTitle.normalized_name.ilike("% soundtrack%"),
-                    SteamTitle.normalized_name.ilike("% season pass%"),
-                    SteamTitle.normalized_name.ilike("% expansion%"),
-                    SteamTitle.normalized_name.ilike("% costume%"),
-                    SteamTitle.normalized_name.ilike("% bonus%"),
-                    SteamTitle.normalized_name.ilike("% mission%"),
-                    SteamTitle.normalized_name.ilike("% set%"),
-                    SteamTitle.normalized_name.ilike("% pack%"),
-                    SteamTitle.normalized_name.ilike("% pachislot%"),
+                    *[
+                        SteamTitle.normalized_name.ilike(pattern)
+                        for pattern in _SEARCH_DLC_EXCLUDE_PATTERNS
+                    ],
                 )
             )
 
@@ -2320,25 +2818,18 @@ def search_catalog(
             )
             rows_query = rows_query.filter(SteamTitle.id.in_(artwork_subq))
 
-        rank_mode = str(ranking_mode or "").strip().lower()
-        priority_ids: List[str] = []
-        if rank_mode in {"hot", "priority", "top"}:
-            seen: set[str] = set()
-            for app_id in _build_priority_candidate_appids():
-                app_str = str(app_id).strip()
-                if not app_str:
-                    continue
-                if app_str not in seen:
-                    priority_ids.append(app_str)
-                    seen.add(app_str)
-        priority_rank = case(
-            (SteamTitle.app_id.in_(priority_ids), 1),
-            else_=0,
-        )
+        priority_order = []
+        if priority_index is not None:
+            if _sync_priority_table(priority_index):
+                rows_query = rows_query.outerjoin(CatalogPriorityRank, _priority_rank_join(priority_index))
+                priority_rank = case((CatalogPriorityRank.app_id.isnot(None), 1), else_=0)
+            else:
+                priority_rank = case((SteamTitle.app_id.in_(list(priority_index.ordered)), 1), else_=0)
+            priority_order.append(priority_rank.desc())
 
         if rank_mode in {"recent", "updated"}:
             rows_query = rows_query.order_by(
-                priority_rank.desc(),
+                *priority_order,
                 SteamTitle.updated_at.desc(),
                 relevance_score.desc(),
                 type_rank.asc(),
@@ -2348,7 +2839,7 @@ def search_catalog(
             )
         else:
             rows_query = rows_query.order_by(
-                priority_rank.desc(),
+                *priority_order,
                 relevance_score.desc(),
                 type_rank.asc(),
                 noise_penalty.asc(),
@@ -2357,9 +2848,12 @@ def search_catalog(
                 SteamTitle.name.asc(),
             )
 
-        total = rows_query.count()
+        total = _cached_count(
+            f"search:{normalized}:{compact_query}:{include_dlc}:{bool(must_have_artwork)}",
+            rows_query.count,
+        )
         rows = rows_query.offset(max(0, offset)).limit(max_limit).all()
-        return total, [_build_catalog_item(row, manifest_name_map) for row in rows]
+        return total, _build_catalog_items(db, rows, manifest_name_map)
 
     return _with_schema_retry(_run)
 
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Optional
+from typing import Mapping, Optional
 
 from ..core.cache import cache_client
 from ..core.config import STEAM_CATALOG_CACHE_TTL_SECONDS
 from ..services.native_core import get_native_core
-from .steam_catalog import get_catalog_page, get_hot_appids, search_store
+from .priority_index import get_priority_index
+from .steam_catalog import get_catalog_page, search_store
 
 MAX_CANDIDATES = 200
 MAX_NUMERIC_CANDIDATES = 60
@@ -148,7 +149,7 @@ def _token_score(query: str, candidate: str) -> float:
     return 60.0 + ratio * 20.0
 
 
-def score_candidate(query: str, item: dict, hot_rank: dict[str, int]) -> float:
+def score_candidate(query: str, item: dict, hot_rank: Mapping[str, int]) -> float:
     name = str(item.get("name") or "").strip()
     app_id = str(item.get("app_id") or "")
     if not name and not app_id:
@@ -283,8 +284,7 @@ def search_catalog(
             if app_id:
                 candidates[app_id] = detail
 
-    hot_ids = get_hot_appids()
-    hot_rank = {appid: index for index, appid in enumerate(hot_ids)}
+    hot_rank = get_priority_index().hot_ranks
     scored = []
     for app_id, item in candidates.items():
         score = score_candidate(trimmed, item, hot_rank)
@@ -306,7 +306,7 @@ def search_catalog(
 
 
 def get_popular_catalog(limit: int, offset: int) -> dict:
-    hot_ids = get_hot_appids()
+    hot_ids = list(get_priority_index().hot)
     total = len(hot_ids)
     if not hot_ids:
         return {"total": 0, "items": []}
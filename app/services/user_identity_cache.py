@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from ..core.cache import cache_client
+from ..core.config import AUTH_USER_CACHE_MAX_ENTRIES, AUTH_USER_CACHE_TTL_SECONDS
+from ..models import User
+
+_USER_KEY_PREFIX = "auth:user:"
+_SESSION_KEY_PREFIX = "session:"
+_ALL_USERS = "*"
+# Session.info key holding user ids to invalidate once the transaction commits.
+_PENDING_INFO_KEY = "user_identity_invalidations"
+
+
+def _snapshot(user: User) -> User:
+    """Detached copy of the user's column values, safe to share across sessions."""
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    copy = User(**values)
+    make_transient_to_detached(copy)
+    return copy
+
+
+class UserIdentityCache:
+    """
+    Per-process cache of authenticated users keyed by user id. An entry is only
+    served for the exact access token it was validated with, so session
+    rotation naturally misses; logout, session changes and any committed ORM
+    update of the user drop it in every worker via the cache invalidation
+    channel.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, str, User]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def session_token(self, user_id: str) -> Optional[str]:
+        """The access token last validated for `user_id`, while still fresh."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def get(self, user_id: str, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, cached_token, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            if cached_token != token:
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def attach(self, db: Session, user_id: str, token: str) -> Optional[User]:
+        """Cached user merged into `db` without a SELECT, or None on a miss."""
+        snapshot = self.get(user_id, token)
+        if snapshot is None:
+            return None
+        return db.merge(snapshot, load=False)
+
+    def put(self, user: User, token: str) -> None:
+        if not self.enabled or user is None or not user.id:
+            return
+        snapshot = _snapshot(user)
+        with self._lock:
+            self._entries[str(user.id)] = (time.monotonic() + self.ttl_seconds, token, snapshot)
+            self._entries.move_to_end(str(user.id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _on_invalidated(self, keys: list[str]) -> None:
+        for key in keys:
+            if key == f"{_USER_KEY_PREFIX}{_ALL_USERS}":
+                self.clear()
+                continue
+            for prefix in (_USER_KEY_PREFIX, _SESSION_KEY_PREFIX):
+                if key.startswith(prefix):
+                    self.discard(key[len(prefix) :])
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop `user_id` ("*" for everyone) in every worker. Call after commit."""
+    cache_client.invalidate_keys((f"{_USER_KEY_PREFIX}{user_id}",))
+
+
+user_identity_cache = UserIdentityCache(AUTH_USER_CACHE_TTL_SECONDS, AUTH_USER_CACHE_MAX_ENTRIES)
+cache_client.add_invalidation_listener(user_identity_cache._on_invalidated)
+
+
+def _pending_invalidations(session: Session) -> set[str]:
+    return session.info.setdefault(_PENDING_INFO_KEY, set())
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    # Role, membership, wallet and profile changes all flow through here.
+    # This runs at flush: dropping the entry now would let a concurrent
+    # request re-cache the still-committed row, so wait for the commit.
+    if not target.id:
+        return
+    session = object_session(target)
+    if session is None:
+        invalidate_user(str(target.id))
+        return
+    _pending_invalidations(session).add(str(target.id))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_user_write(orm_execute_state) -> None:
+    # Bulk query(User).update()/delete() and session.execute(update(User))
+    # skip the mapper events and do not say which rows they touched.
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and mapper is not None and mapper.class_ is User:
+        _pending_invalidations(orm_execute_state.session).add(_ALL_USERS)
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_user_invalidations(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_INFO_KEY, None)
+    if not user_ids:
+        return
+    if _ALL_USERS in user_ids:
+        invalidate_user(_ALL_USERS)
+        return
+    for user_id in user_ids:
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_user_invalidations(session: Session, previous_transaction) -> None:
+    # Only a rollback of the outermost transaction discards every pending write.
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_INFO_KEY, None)
@@ -11,11 +11,8 @@ import json
 import os
 import uuid
 
-
-try:
-    import blake3 as _blake3_mod  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    _blake3_mod = None
+from .file_hashing import HAS_BLAKE3, hash_file, verify_chunk_ranges, verify_chunks
+from .install_digest_cache import InstallDigestCache, load_install_digest_cache
 
 
 def _utc_now_iso() -> str:
@@ -35,25 +32,8 @@ def _safe_workers(requested: Optional[int]) -> int:
     return max(1, min(64, int(requested)))
 
 
-def _hash_file(path: Path, algorithm: str) -> str:
-    if algorithm == "blake3" and _blake3_mod is not None:
-        hasher = _blake3_mod.blake3()
-        with path.open("rb") as handle:
-            while True:
-                chunk = handle.read(1024 * 1024)
-                if not chunk:
-                    break
-                hasher.update(chunk)
-        return hasher.hexdigest()
-
-    digest = sha256()
-    with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(1024 * 1024)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+def _hash_many(path: Path, algorithms: tuple[str, ...]) -> dict[str, str]:
+    return hash_file(path, algorithms).digests
 
 
 @dataclass
@@ -184,7 +164,11 @@ class V2RuntimeStore:
             return dict(report) if report else None
 
 
-def _scan_manifest_entry(install_root: Path, entry: dict[str, Any]) -> dict[str, Any]:
+def _scan_manifest_entry(
+    install_root: Path,
+    entry: dict[str, Any],
+    digest_cache: InstallDigestCache,
+) -> dict[str, Any]:
     rel = str(entry.get("path") or "").replace("\\", "/").lstrip("/")
     expected_size = int(entry.get("size") or 0)
     expected_sha256 = str(entry.get("hash") or "").strip().lower()
@@ -218,18 +202,23 @@ def _scan_manifest_entry(install_root: Path, entry: dict[str, Any]) -> dict[str,
         payload["reason"] = "size_mismatch"
         return payload
 
+    algorithms = tuple(
+        algorithm
+        for algorithm, wanted in (("sha256", bool(expected_sha256)), ("blake3", HAS_BLAKE3))
+        if wanted
+    )
     try:
+        digests = digest_cache.digests(target, algorithms, _hash_many) if algorithms else {}
+        payload["fast_hash_blake3"] = digests.get("blake3")
         if expected_sha256:
-            payload["actual_sha256"] = _hash_file(target, "sha256")
+            payload["actual_sha256"] = digests["sha256"]
             if payload["actual_sha256"].lower() != expected_sha256:
                 payload["status"] = "corrupt"
                 payload["reason"] = "hash_mismatch"
-                payload["fast_hash_blake3"] = (
-                    _hash_file(target, "blake3") if _blake3_mod is not None else None
-                )
+                corrupt_chunks = _corrupt_chunks(target, entry)
+                if corrupt_chunks is not None:
+                    payload["corrupt_chunks"] = corrupt_chunks
                 return payload
-        if _blake3_mod is not None:
-            payload["fast_hash_blake3"] = _hash_file(target, "blake3")
     except OSError:
         payload["status"] = "error"
         payload["reason"] = "read_failed"
@@ -240,6 +229,29 @@ def _scan_manifest_entry(install_root: Path, entry: dict[str, Any]) -> dict[str,
     return payload
 
 
+def _corrupt_chunks(target: Path, entry: dict[str, Any]) -> Optional[list[int]]:
+    """Chunk indexes of a mismatched file that differ from the manifest, if it lists chunks."""
+    chunks = entry.get("chunks")
+    if not isinstance(chunks, list) or not chunks:
+        return None
+    ordered = sorted(
+        (chunk for chunk in chunks if isinstance(chunk, dict)),
+        key=lambda chunk: int(chunk.get("index") or 0),
+    )
+    expected = [str(chunk.get("hash") or "").strip().lower() or None for chunk in ordered]
+    if ordered and all(chunk.get("offset") is not None for chunk in ordered):
+        # Content-defined chunks vary in size; check each recorded range.
+        ranges = [
+            (int(chunk["offset"]), int(chunk.get("size") or 0), digest)
+            for chunk, digest in zip(ordered, expected)
+        ]
+        return verify_chunk_ranges(target, ranges)
+    chunk_size = int(ordered[0].get("size") or 0) if ordered else 0
+    if chunk_size <= 0:
+        return None
+    return verify_chunks(target, expected, chunk_size)
+
+
 def _iter_manifest_files(manifest: dict[str, Any]) -> Iterable[dict[str, Any]]:
     files = manifest.get("files")
     if not isinstance(files, list):
@@ -292,9 +304,20 @@ def run_self_heal_scan(
             "hot_fix_queue": [str(item.get("path")) for item in files],
         }
 
-    engine = "usn_delta" if usn_delta_eligible and os.name == "nt" else "full_scan"
+    # Without a USN journal, the persisted digest cache makes the scan
+    # incremental: only files whose stat changed since the last run are hashed.
+    digest_cache = load_install_digest_cache(install_root)
+    if usn_delta_eligible and os.name == "nt":
+        engine = "usn_delta"
+    elif len(digest_cache):
+        engine = "digest_cache"
+    else:
+        engine = "full_scan"
     with ThreadPoolExecutor(max_workers=workers) as executor:
-        results = list(executor.map(lambda item: _scan_manifest_entry(install_root, item), files))
+        results = list(
+            executor.map(lambda item: _scan_manifest_entry(install_root, item, digest_cache), files)
+        )
+    digest_cache.save()
 
     total_files = len(results)
     verified_files = sum(1 for item in results if item["status"] == "ok")
@@ -324,9 +347,10 @@ def run_self_heal_scan(
         },
         "files": results,
         "hot_fix_queue": hot_fix_queue,
+        "digest_cache": {"hits": digest_cache.hits, "misses": digest_cache.misses},
         "scan_hash_policy": {
             "canonical_integrity": "sha256",
-            "fast_local_scan": "blake3" if _blake3_mod is not None else "sha256",
+            "fast_local_scan": "blake3" if HAS_BLAKE3 else "sha256",
         },
     }
 
@@ -346,18 +370,24 @@ def build_repair_plan_from_report(
         str(item.get("path")): item
         for item in _iter_manifest_files(manifest)
     }
+    corrupt_chunks = {
+        str(item.get("path")): item["corrupt_chunks"]
+        for item in files
+        if isinstance(item, dict) and isinstance(item.get("corrupt_chunks"), list)
+    }
 
     queue = []
     for rel_path in sorted(to_repair_paths):
         entry = manifest_index.get(rel_path, {})
-        queue.append(
-            {
-                "path": rel_path,
-                "expected_size": int(entry.get("size") or 0),
-                "expected_sha256": str(entry.get("hash") or "") or None,
-                "strategy": "chunk_refetch",
-            }
-        )
+        item = {
+            "path": rel_path,
+            "expected_size": int(entry.get("size") or 0),
+            "expected_sha256": str(entry.get("hash") or "") or None,
+            "strategy": "chunk_refetch",
+        }
+        if rel_path in corrupt_chunks:
+            item["chunks"] = corrupt_chunks[rel_path]
+        queue.append(item)
 
     strategy = "no_op" if not queue else "targeted_hot_fix"
     return {
@@ -12,6 +12,11 @@ _STATUS_LOCK = threading.Lock()
 _STATUS_CACHE: dict[str, tuple[float, bool]] = {}
 _STATUS_TTL_SECONDS = 60.0
 _ALLOWED_TABLES = {"game_embeddings", "query_embedding_cache"}
+_SYNC_BATCH_ROWS = 1000
+# Scopes up to this size are searched exactly through the app_id index.
+_SCOPED_EXACT_MAX_APPIDS = 5000
+# ivfflat.probes per widening round; None keeps the server setting.
+_IVFFLAT_PROBE_STEPS = (None, 32, 128)
 
 
 def _resolve_bind(db_or_connection):
@@ -45,8 +50,9 @@ def _to_float_vector(values: Iterable[float], dimension: int) -> list[float]:
 
 def vector_to_literal(values: Iterable[float], dimension: int) -> str:
     safe_values = _to_float_vector(values, max(1, int(dimension or 1)))
-    rendered = ",".join(f"{value:.8f}" if math.isfinite(value) else "0.00000000" for value in safe_values)
-    return f"[{rendered}]"
+    if not all(map(math.isfinite, safe_values)):
+        safe_values = [value if math.isfinite(value) else 0.0 for value in safe_values]
+    return "[" + ",".join(["%.8f"] * len(safe_values)) % tuple(safe_values) + "]"
 
 
 def is_pgvector_ready(db: Session) -> bool:
@@ -105,24 +111,84 @@ def sync_vector_column(
     vector: Iterable[float],
     dimension: int,
 ) -> None:
-    if not row_id:
-        return
+    sync_vector_columns(db, table_name=table_name, rows=[(row_id, vector)], dimension=dimension)
+
+
+def sync_vector_columns(
+    db: Session,
+    *,
+    table_name: str,
+    rows: Iterable[tuple[str | None, Iterable[float]]],
+    dimension: int,
+) -> None:
+    """
+    Copy JSON vectors into the pgvector column. Rows are sent in batches of
+    `_SYNC_BATCH_ROWS` as two arrays and applied by one UPDATE ... FROM unnest
+    per batch instead of one statement per row.
+    """
     table = str(table_name or "").strip().lower()
     if table not in _ALLOWED_TABLES:
         return
-    if not is_pgvector_ready(db):
+    pending = [(row_id, vector) for row_id, vector in rows if row_id]
+    if not pending or not is_pgvector_ready(db):
         return
-    literal = vector_to_literal(vector, dimension=max(1, int(dimension or 1)))
+    safe_dimension = max(1, int(dimension or 1))
+    statement = text(
+        f"""
+        UPDATE {table} AS target
+        SET vector_v = CAST(source.vector_value AS vector)
+        FROM unnest(CAST(:row_ids AS text[]), CAST(:vector_values AS text[])) AS source(row_id, vector_value)
+        WHERE target.id = source.row_id
+        """
+    )
     try:
-        db.execute(
-            text(f"UPDATE {table} SET vector_v = CAST(:vector_value AS vector) WHERE id = :row_id"),
-            {"vector_value": literal, "row_id": row_id},
-        )
+        # A savepoint, so a failed UPDATE does not abort the caller's
+        # Postgres transaction along with it.
+        with db.begin_nested():
+            for begin in range(0, len(pending), _SYNC_BATCH_ROWS):
+                batch = pending[begin : begin + _SYNC_BATCH_ROWS]
+                db.execute(
+                    statement,
+                    {
+                        "row_ids": [str(row_id) for row_id, _ in batch],
+                        "vector_values": [vector_to_literal(vector, safe_dimension) for _, vector in batch],
+                    },
+                )
     except Exception:
         # Keep search/reco flows running even if vector column update fails.
         return
 
 
+def _semantic_search_in_process(
+    db: Session,
+    *,
+    query_vector: Iterable[float],
+    model: str,
+    source: str,
+    limit: int,
+    dimension: int,
+    allowed_appids: set[str] | None,
+) -> list[tuple[str, float]]:
+    # SQLite/desktop builds have no pgvector; search the in-memory embedding matrix instead.
+    from .embedding_store import embedding_store
+
+    safe_dimension = max(1, int(dimension or 1))
+    if source != "steam" or model != embedding_store.model_name(safe_dimension):
+        return []
+    safe_limit = max(1, min(2000, int(limit or 200)))
+    try:
+        hits = embedding_store.top_k(
+            db,
+            _to_float_vector(query_vector, safe_dimension),
+            safe_dimension,
+            safe_limit,
+            allowed_appids,
+        )
+    except Exception:
+        return []
+    return [(app_id, max(0.0, min(100.0, (similarity + 1.0) * 50.0))) for app_id, similarity in hits]
+
+
 def semantic_search_game_embeddings(
     db: Session,
     *,
@@ -134,30 +200,50 @@ def semantic_search_game_embeddings(
     allowed_appids: set[str] | None = None,
 ) -> list[tuple[str, float]]:
     if not is_pgvector_ready(db):
-        return []
+        return _semantic_search_in_process(
+            db,
+            query_vector=query_vector,
+            model=model,
+            source=source,
+            limit=limit,
+            dimension=dimension,
+            allowed_appids=allowed_appids,
+        )
 
+    if allowed_appids is not None and not allowed_appids:
+        return []
     query_literal = vector_to_literal(query_vector, max(1, int(dimension or 1)))
     safe_limit = max(1, min(2000, int(limit or 200)))
+    params: dict = {
+        "query_vector": query_literal,
+        "model": model,
+        "source": source,
+        "limit": safe_limit,
+    }
+    scope_clause = ""
+    if allowed_appids is not None:
+        scope_clause = "AND app_id = ANY(CAST(:allowed_appids AS text[]))"
+        params["allowed_appids"] = sorted(allowed_appids)
+    statement = text(
+        f"""
+        SELECT app_id, (1 - (vector_v <=> CAST(:query_vector AS vector))) AS similarity
+        FROM game_embeddings
+        WHERE model = :model
+          AND source = :source
+          AND vector_v IS NOT NULL
+          {scope_clause}
+        ORDER BY vector_v <=> CAST(:query_vector AS vector)
+        LIMIT :limit
+        """
+    )
+
     try:
-        rows = db.execute(
-            text(
-                """
-                SELECT app_id, (1 - (vector_v <=> CAST(:query_vector AS vector))) AS similarity
-                FROM game_embeddings
-                WHERE model = :model
-                  AND source = :source
-                  AND vector_v IS NOT NULL
-                ORDER BY vector_v <=> CAST(:query_vector AS vector)
-                LIMIT :limit
-                """
-            ),
-            {
-                "query_vector": query_literal,
-                "model": model,
-                "source": source,
-                "limit": safe_limit,
-            },
-        ).all()
+        if allowed_appids is not None and len(allowed_appids) <= _SCOPED_EXACT_MAX_APPIDS:
+            # Small scopes: filter through the app_id index first, then rank
+            # exactly, so the ANN index can never drop in-scope rows.
+            rows = db.execute(_SCOPED_EXACT_STATEMENT, params).all()
+        else:
+            rows = _widening_ann_search(db, statement, params, safe_limit)
     except Exception:
         return []
 
@@ -166,8 +252,6 @@ def semantic_search_game_embeddings(
         app_id = str(getattr(row, "app_id", "") or "").strip()
         if not app_id:
             continue
-        if allowed_appids is not None and app_id not in allowed_appids:
-            continue
         similarity_raw = getattr(row, "similarity", 0.0)
         try:
             similarity = float(similarity_raw or 0.0)
@@ -176,3 +260,42 @@ def semantic_search_game_embeddings(
         score = max(0.0, min(100.0, (similarity + 1.0) * 50.0))
         hits.append((app_id, score))
     return hits
+
+
+_SCOPED_EXACT_STATEMENT = text(
+    """
+    WITH scoped AS MATERIALIZED (
+        SELECT app_id, vector_v
+        FROM game_embeddings
+        WHERE app_id = ANY(CAST(:allowed_appids AS text[]))
+          AND model = :model
+          AND source = :source
+          AND vector_v IS NOT NULL
+    )
+    SELECT app_id, (1 - (vector_v <=> CAST(:query_vector AS vector))) AS similarity
+    FROM scoped
+    ORDER BY vector_v <=> CAST(:query_vector AS vector)
+    LIMIT :limit
+    """
+)
+
+
+def _widening_ann_search(db: Session, statement, params: dict, limit: int) -> list:
+    """
+    Filtered ivfflat scans can come back short because the filter runs on the
+    probed lists only; retry with more probes until `limit` rows are found.
+    The probes setting is transaction-local and restored afterwards.
+    """
+    previous = db.execute(text("SELECT current_setting('ivfflat.probes', true)")).scalar()
+    rows: list = []
+    try:
+        for probes in _IVFFLAT_PROBE_STEPS:
+            if probes is not None:
+                db.execute(text("SELECT set_config('ivfflat.probes', :probes, true)"), {"probes": str(probes)})
+            rows = db.execute(statement, params).all()
+            if len(rows) >= limit:
+                break
+    finally:
+        if previous:
+            db.execute(text("SELECT set_config('ivfflat.probes', :probes, true)"), {"probes": str(previous)})
+    return rows
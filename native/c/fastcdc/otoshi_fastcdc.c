@@ -0,0 +1,48 @@
+#include <stddef.h>
+#include <stdint.h>
+
+#if defined(_WIN32)
+#define OTOSHI_EXPORT __declspec(dllexport)
+#else
+#define OTOSHI_EXPORT
+#endif
+
+/*
+ * FastCDC boundary for a chunk starting at data[0], matching
+ * app/services/content_chunking.py `cut_point`: the gear table and masks come
+ * from the caller so both implementations always cut at the same offsets.
+ * Returns the chunk length (at most `len`).
+ */
+OTOSHI_EXPORT size_t otoshi_fastcdc_cut(
+    const uint8_t *data,
+    size_t len,
+    size_t min_size,
+    size_t avg_size,
+    size_t max_size,
+    uint64_t mask_small,
+    uint64_t mask_large,
+    const uint64_t *gear
+) {
+    if (data == NULL || gear == NULL || len <= min_size) {
+        return len;
+    }
+    size_t limit = len < max_size ? len : max_size;
+    size_t normal = len < avg_size ? len : avg_size;
+    uint64_t fingerprint = 0;
+    size_t i = min_size;
+    while (i < normal) {
+        fingerprint = (fingerprint << 1) + gear[data[i]];
+        ++i;
+        if ((fingerprint & mask_small) == 0) {
+            return i;
+        }
+    }
+    while (i < limit) {
+        fingerprint = (fingerprint << 1) + gear[data[i]];
+        ++i;
+        if ((fingerprint & mask_large) == 0) {
+            return i;
+        }
+    }
+    return limit;
+}
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Measure middleware cost, not 429s.
+os.environ.setdefault("RATE_LIMIT_DEFAULT_PER_MINUTE", str(10**9))
+
+from app.core.rate_limit import rate_limiter, route_template  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.middleware import (  # noqa: E402
+    AuthMiddleware,
+    ObservabilityMiddleware,
+    RateLimitMiddleware,
+)
+from app.middleware.auth import decode_request_token  # noqa: E402
+from app.services.ai_observability import record_http_request, should_track_request  # noqa: E402
+
+
+class _LegacyAuth(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        auth_header = request.headers.get("Authorization", "")
+        if auth_header.startswith("Bearer "):
+            request.scope.pop("state", None)
+            decode_request_token(request.scope, auth_header.split(" ", 1)[1])
+        return await call_next(request)
+
+
+class _LegacyRateLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        key = f"{client_ip}:{request.method}:{route_template(request.scope)}"
+        await rate_limiter.hit(key, 10**9, window_seconds=60)
+        return await call_next(request)
+
+
+class _LegacyObservability(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        path = str(request.url.path or "")
+        if not should_track_request(path):
+            return await call_next(request)
+        started = time.perf_counter()
+        response = await call_next(request)
+        record_http_request(
+            path=path,
+            method=request.method,
+            status_code=response.status_code,
+            latency_ms=(time.perf_counter() - started) * 1000.0,
+            query_params=dict(request.query_params),
+        )
+        return response
+
+
+def _build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "ok"}
+
+    if legacy:
+        app.add_middleware(_LegacyAuth)
+        app.add_middleware(_LegacyRateLimit)
+        app.add_middleware(_LegacyObservability)
+    else:
+        app.add_middleware(AuthMiddleware)
+        app.add_middleware(RateLimitMiddleware)
+        app.add_middleware(ObservabilityMiddleware)
+    return app
+
+
+async def _measure(app: FastAPI, requests: int, concurrency: int, token: str) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    samples: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/health", headers=headers)
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                started = time.perf_counter()
+                response = await client.get("/health", headers=headers)
+                samples.append((time.perf_counter() - started) * 1e6)
+                response.raise_for_status()
+
+        per_worker = max(1, requests // concurrency)
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<10} n={len(samples):<6} mean={statistics.fmean(samples):8.1f}us "
+        f"p50={statistics.median(samples):8.1f}us p99={p99:8.1f}us"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Per-request overhead of the auth/rate-limit/observability stack on /health."
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    token = create_access_token("bench-user")
+    for label, legacy in (("before", True), ("after", False)):
+        samples = asyncio.run(_measure(_build_app(legacy), args.requests, args.concurrency, token))
+        _report(label, samples)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())